@@ -1,22 +1,289 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, g
 import os
 import subprocess
 import time
+import math
 import logging
-from wireguard.manager import WireGuardManager
+import threading
+import zlib
+from wireguard.shards import ShardSet
+from wireguard.export import iter_ndjson, iter_zip, client_config_files, render_qr, qr_available, QR_FORMATS
+from wireguard.registry import PeerRecord, peer_view
+from wireguard.stats import TrafficSampler
+from wireguard.events import EventBroker, StatusDeltaTracker, ChangeWatcher
+from wireguard.leader import LeaderElection
+from wireguard.metrics import REGISTRY, REQUEST_SECONDS, CONTENT_TYPE
+from wireguard.expiry import format_time
+from wireguard.health import HealthMonitor
+from wireguard.jobs import JobQueue, IdempotencyConflict, FINISHED as JOB_FINISHED
+from wireguard.responses import (FastJSONProvider, BodyCache, COMPRESSIBLE_TYPES, MIN_COMPRESS_SIZE,
+                                 available_encodings, compress)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 app = Flask(__name__)
+# orjson이 있으면 jsonify 직렬화에 사용
+app.json = FastJSONProvider(app)
 
-# WireGuard 매니저 초기화 (오류 처리 포함)
-try:
-    wg_manager = WireGuardManager()
-    logging.info("WireGuard 매니저가 성공적으로 초기화되었습니다.")
-except Exception as e:
-    logging.error(f"WireGuard 매니저 초기화 실패: {str(e)}")
-    wg_manager = None
+# 한 번의 일괄 생성 요청에서 허용하는 최대 피어 수
+MAX_BULK_PEERS = 1000
+
+# ttl / idle_timeout 상한(초, 10년)
+MAX_TTL = 10 * 365 * 86400
+
+# /api/peers 페이지 크기 상한과 선택 가능한 필드
+MAX_PEERS_PAGE_SIZE = 1000
+PEER_FIELDS = PeerRecord.FIELDS + PeerRecord.EXTRA_FIELDS
+
+# 작업 결과 대기 시간 상한(초)과 멱등성 키를 사용한 동기 생성 요청의 대기 시간(초)
+MAX_JOB_WAIT = 60
+JOB_WAIT = float(os.environ.get("WG_JOB_WAIT", "30"))
+
+# WireGuard 매니저와 백그라운드 서비스 (init_services에서 최초 1회 초기화)
+# shards: 인터페이스(샤드) 전체, wg_manager: 기본 샤드
+shards = None
+wg_manager = None
+
+# 대시보드 실시간 이벤트 (SSE)
+event_broker = EventBroker()
+status_tracker = None
+# 다른 워커의 피어/작업 변경을 이 워커의 SSE 구독자에게 전달 (구독자가 있을 때만 확인)
+change_watcher = None
+# 마지막으로 발행한 끝난 작업 (finished_at, id)
+_job_cursor = (0.0, "")
+
+# 호스트당 하나만 실행할 백그라운드 작업(wg 상태 수집, 만료 스케줄러, 작업 대기열 확인) 담당 워커 선출
+leader_election = None
+
+# 피어 생성/삭제/키 교체 비동기 작업 대기열 (워커 프로세스 간 공유)
+job_queue = None
+
+# 준비 상태 확인 (백그라운드에서 WG_HEALTH_INTERVAL초마다 실행, 요청은 마지막 결과만 조회)
+health_monitor = None
+
+# 로드밸런서 상태 확인 경로 (초기화 대기와 공유 상태 갱신 없이 바로 응답)
+PROBE_ENDPOINTS = frozenset(("liveness", "readiness", "health_check"))
+
+# 피어별 트래픽 샘플러 (백그라운드에서 WG_STATS_INTERVAL초마다 수집)
+# 수집 결과의 변경분은 모든 SSE 구독자에게 한 번에 전달됨
+traffic_sampler = None
+
+# 저장소/설정 파일 버전별 직렬화 응답 본문 캐시 (압축 결과 포함, 워커 프로세스 단위)
+response_cache = BodyCache(max_bytes=int(os.environ.get("WG_RESPONSE_CACHE_MB", "32")) * 1024 * 1024)
+
+_services_lock = threading.Lock()
+_services_initialized = False
+_startup_lock = threading.Lock()
+_startup_thread = None
+
+def init_services():
+    """WireGuard 매니저와 백그라운드 서비스 초기화 (최초 1회, 오류 처리 포함)"""
+    global shards, wg_manager, status_tracker, traffic_sampler, job_queue, health_monitor, _services_initialized
+    global change_watcher, leader_election, _job_cursor
+    
+    with _services_lock:
+        if _services_initialized:
+            return wg_manager
+        
+        started = time.perf_counter()
+        try:
+            # WG_SHARDS(또는 ~/wireguard-manager/shards.json)가 있으면 여러 인터페이스 사용
+            shard_set = ShardSet.from_environment()
+            manager = shard_set.primary
+            logging.info("WireGuard 매니저가 성공적으로 초기화되었습니다.")
+        except Exception as e:
+            logging.error(f"WireGuard 매니저 초기화 실패: {str(e)}")
+            shard_set = None
+            manager = None
+        
+        if manager:
+            # 리더로 선출되기 전까지는 다른 워커가 수집한 상태를 읽고 만료 처리는 하지 않음
+            shard_set.set_leader(False)
+            
+            def on_elected():
+                shard_set.set_leader(True)
+                if job_queue:
+                    job_queue.set_polling(True)
+            
+            leader_election = LeaderElection(
+                os.path.join(manager.app_dir, "leader.lock"),
+                on_elected=on_elected,
+                retry_interval=float(os.environ.get("WG_LEADER_RETRY", "5"))
+            )
+            leader_election.start()
+            shard_set.add_listener(event_broker.publish)
+            status_tracker = StatusDeltaTracker(event_broker, resolve_name=shard_set.get_peer_name)
+            traffic_sampler = TrafficSampler(
+                manager.status_collector,
+                interval=float(os.environ.get("WG_STATS_INTERVAL", "10")),
+                capacity=int(os.environ.get("WG_STATS_SAMPLES", "360")),
+                on_sample=status_tracker
+            )
+            traffic_sampler.start()
+            try:
+                # 작업 완료 이벤트는 처리한 워커와 관계없이 change_watcher가 발행
+                job_queue = JobQueue(
+                    os.path.join(manager.app_dir, "jobs.db"),
+                    get_manager=shard_set.get,
+                    batch_size=int(os.environ.get("WG_JOB_BATCH", "100")),
+                    retention=float(os.environ.get("WG_JOB_RETENTION", "86400"))
+                )
+                # 리더가 아니면 이 워커가 제출한 작업만 바로 처리
+                job_queue.polling = leader_election.is_leader
+                job_queue.start()
+                _job_cursor = (time.time(), "")
+            except Exception as e:
+                logging.error(f"작업 대기열 초기화 실패: {str(e)}")
+                job_queue = None
+            change_watcher = ChangeWatcher(
+                event_broker,
+                [shard_set.refresh] + ([_publish_finished_jobs] if job_queue else []),
+                interval=float(os.environ.get("WG_EVENT_POLL", "1"))
+            )
+            change_watcher.start()
+            health_monitor = HealthMonitor(
+                shard_set,
+                interval=float(os.environ.get("WG_HEALTH_INTERVAL", "10")),
+                min_free_addresses=int(os.environ.get("WG_HEALTH_MIN_FREE", "10"))
+            )
+            health_monitor.start()
+            _register_gauges(shard_set)
+        
+        shards = shard_set
+        wg_manager = manager
+        _services_initialized = True
+        logging.info(f"서비스 초기화 완료 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return wg_manager
+
+def _publish_finished_jobs():
+    """다른 워커를 포함해 새로 끝난 작업을 SSE로 발행 (change_watcher 스레드에서만 호출)"""
+    global _job_cursor
+    # 구독자가 없던 동안 끝난 작업은 새 구독자에게 다시 보내지 않음
+    floor = time.time() - 10
+    if _job_cursor[0] < floor:
+        _job_cursor = (floor, "")
+    jobs, _job_cursor = job_queue.finished_after(_job_cursor)
+    for job in jobs:
+        event_broker.publish("job", _job_view(job))
+
+def _register_gauges(shard_set):
+    """상태 게이지 등록 (값은 /metrics 수집 시에만 계산, 샤드별 값은 interface 레이블)"""
+    def per_shard(value):
+        return lambda: [((manager.interface,), value(manager)) for manager in shard_set]
+    
+    manager = shard_set.primary
+    REGISTRY.gauge("wg_peers", "등록된 피어 수",
+                   per_shard(lambda m: m.get_peer_count()), labelnames=("interface",))
+    REGISTRY.gauge("wg_address_pool_allocated", "할당된 피어 주소 수",
+                   per_shard(lambda m: m.address_pool.allocated_count), labelnames=("interface",))
+    REGISTRY.gauge("wg_address_pool_capacity", "피어 주소 풀 크기",
+                   per_shard(lambda m: m.address_pool.capacity), labelnames=("interface",))
+    REGISTRY.gauge("wg_status_cache_hit_ratio", "wg show 상태 캐시 적중률",
+                   lambda: manager.status_collector.hit_ratio)
+    REGISTRY.callback_counter("wg_status_cache_requests_total", "wg show 상태 캐시 조회 수",
+                              lambda: [(("hit",), manager.status_collector.hits),
+                                       (("miss",), manager.status_collector.misses)],
+                              labelnames=("result",))
+    REGISTRY.gauge("wg_keypair_pool_size", "미리 생성된 키페어 수",
+                   per_shard(lambda m: len(m.keypair_pool)), labelnames=("interface",))
+    REGISTRY.gauge("wg_leader", "백그라운드 작업 리더 워커 여부 (1: 리더)",
+                   lambda: int(bool(leader_election and leader_election.is_leader)))
+    REGISTRY.gauge("wg_event_subscribers", "실시간 이벤트(SSE) 구독자 수",
+                   lambda: event_broker.subscriber_count)
+    REGISTRY.callback_counter("wg_response_cache_requests_total", "직렬화 응답 캐시 조회 수",
+                              lambda: [(("hit",), response_cache.hits), (("miss",), response_cache.misses)],
+                              labelnames=("result",))
+    REGISTRY.gauge("wg_response_cache_bytes", "직렬화 응답 캐시 크기 (압축 결과 포함)",
+                   lambda: response_cache.size)
+    if health_monitor:
+        def health_checks():
+            snapshot = health_monitor.snapshot()
+            return [((check["name"], check["interface"] or ""), int(check["ok"]))
+                    for check in (snapshot["checks"] if snapshot else [])]
+        REGISTRY.gauge("wg_ready", "준비 상태 (1: 준비됨)",
+                       lambda: int(bool((health_monitor.snapshot() or {}).get("ready"))))
+        REGISTRY.gauge("wg_health_check", "상태 확인 항목별 결과 (1: 정상)",
+                       health_checks, labelnames=("check", "interface"))
+    if job_queue:
+        REGISTRY.gauge("wg_jobs", "상태별 작업 수",
+                       lambda: [((status,), job_queue.count(status)) for status in ("queued", "running")],
+                       labelnames=("status",))
+
+@app.before_request
+def start_request_timer():
+    """요청 처리 시간 측정 시작"""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """경로 템플릿별 요청 처리 시간 기록 (스트리밍 응답은 헤더 반환까지)"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Accept-Encoding에 따라 응답 압축 (버전 캐시 본문이면 압축 결과도 재사용)"""
+    cached = g.pop('cached_body', None)
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+    
+    body = cached.data if cached is not None else response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+    response.set_data(response_cache.encoded(cached, encoding) if cached is not None else compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # 인코딩마다 본문 바이트가 다르므로 ETag는 약한 비교용으로 변경
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def _cached_json(key, build):
+    """
+    버전 키로 캐시한 JSON 응답
+    
+    key에 저장소/설정 파일 버전을 포함하므로 데이터가 바뀌기 전까지는
+    build()와 직렬화, 압축을 다시 하지 않습니다.
+    """
+    entry = response_cache.get(key, lambda: (app.json.dumps_bytes(build()), app.json.mimetype))
+    g.cached_body = entry
+    return Response(entry.data, mimetype=entry.mimetype)
+
+@app.before_request
+def ensure_services():
+    """첫 요청 전에 초기화가 끝나지 않았으면 완료될 때까지 대기"""
+    if request.endpoint in PROBE_ENDPOINTS:
+        return
+    if not _services_initialized:
+        init_services()
+    # 다른 워커 프로세스가 변경한 피어/주소 풀 반영 (변경이 없으면 버전 확인만 수행)
+    if shards:
+        try:
+            shards.refresh()
+        except Exception as e:
+            logging.warning(f"공유 상태 갱신 실패: {str(e)}")
+
+def start_background_init():
+    """초기화를 백그라운드 스레드에서 시작 (이미 시작했으면 무시)"""
+    global _startup_thread
+    with _startup_lock:
+        if _services_initialized or _startup_thread is not None:
+            return
+        _startup_thread = threading.Thread(target=init_services, name="startup", daemon=True)
+        _startup_thread.start()
+
+# 임포트 직후 바로 요청을 받을 수 있도록 초기화는 백그라운드에서 시작
+if os.environ.get("WG_EAGER_INIT", "1") == "1":
+    start_background_init()
 
 @app.route('/')
 def index():
@@ -35,6 +302,232 @@ def index():
                              manager_status="오류",
                              config_path="N/A")
 
+def _requested_interface(payload=None):
+    return request.args.get('interface') or (payload or {}).get('interface')
+
+def _target_manager(payload=None):
+    """요청의 interface 값에 해당하는 샤드 (없으면 기본 샤드, 모르는 인터페이스면 None)"""
+    interface = _requested_interface(payload)
+    if not interface:
+        return wg_manager
+    return shards.get(interface)
+
+def _unknown_interface(payload=None):
+    return jsonify({
+        "success": False,
+        "message": f"알 수 없는 인터페이스입니다: {_requested_interface(payload)}"
+    }), 404
+
+def _place(payload, count):
+    """
+    새 피어를 만들 샤드 선택
+    
+    interface를 지정하면 해당 샤드, 아니면 배치 정책(shard_key 사용 가능)으로 선택합니다.
+    """
+    if _requested_interface(payload):
+        return _target_manager(payload)
+    return shards.place(count, shard_key=request.args.get('shard_key') or payload.get('shard_key'))
+
+def _expiry_args(payload):
+    """
+    요청에서 만료 정책 읽기 (쿼리 문자열 또는 JSON 본문)
+    
+    - ttl: 지금부터 만료까지 시간(초)
+    - expires_at: 만료 시각 ("%Y-%m-%d %H:%M:%S", ttl과 함께 쓰면 ttl 우선)
+    - idle_timeout: 최근 핸드셰이크 이후 허용할 무연결 시간(초)
+    
+    Returns:
+        (expires_at, idle_timeout) 튜플 (값이 잘못되면 ValueError)
+    """
+    ttl = request.args.get('ttl', payload.get('ttl'))
+    expires_at = request.args.get('expires_at', payload.get('expires_at'))
+    idle_timeout = request.args.get('idle_timeout', payload.get('idle_timeout'))
+    
+    if ttl is not None:
+        ttl = float(ttl)
+        # nan/inf와 시각으로 표현할 수 없는 큰 값은 거절
+        if not math.isfinite(ttl) or not 0 < ttl <= MAX_TTL:
+            raise ValueError(f"ttl은 0보다 크고 {MAX_TTL} 이하여야 합니다.")
+        expires_at = format_time(time.time() + ttl)
+    if idle_timeout is not None:
+        try:
+            idle_timeout = int(idle_timeout)
+        except OverflowError:
+            raise ValueError("idle_timeout이 너무 큽니다.")
+        if idle_timeout > MAX_TTL:
+            raise ValueError(f"idle_timeout은 {MAX_TTL} 이하여야 합니다.")
+    return expires_at, idle_timeout
+
+def _json_payload():
+    """요청 JSON 본문 (본문이 없으면 빈 딕셔너리, JSON 객체가 아니거나 파싱할 수 없으면 None)"""
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return None if request.is_json and request.get_data() else {}
+    return payload if isinstance(payload, dict) else None
+
+def _invalid_payload():
+    return jsonify({
+        "success": False,
+        "message": "요청 본문은 JSON 객체여야 합니다."
+    }), 400
+
+def _idempotency_key(payload):
+    """Idempotency-Key 헤더 또는 idempotency_key 필드 (없으면 None)"""
+    key = request.headers.get('Idempotency-Key') or payload.get('idempotency_key')
+    if key is not None and not (isinstance(key, str) and 0 < len(key) <= 200):
+        raise ValueError("멱등성 키는 1~200자 문자열이어야 합니다.")
+    return key
+
+def _job_view(job):
+    """작업 응답 형식 (시각은 "%Y-%m-%d %H:%M:%S")"""
+    view = dict(job)
+    for field in ("created_at", "started_at", "finished_at"):
+        if view[field] is not None:
+            view[field] = format_time(view[field])
+    return view
+
+def _job_request(kind, payload, count=None):
+    """
+    작업 요청 검증 후 (인터페이스, 작업 인자, 멱등성 비교용 원래 요청) 반환
+    
+    Raises:
+        ValueError: 요청 형식이 올바르지 않을 때
+        LookupError: 인터페이스나 피어를 찾을 수 없을 때
+    """
+    if kind == 'create':
+        if count is None:
+            count = int(payload.get('count', 1))
+        if not 1 <= count <= MAX_BULK_PEERS:
+            raise ValueError(f"count는 1 이상 {MAX_BULK_PEERS} 이하여야 합니다.")
+        expires_at, idle_timeout = _expiry_args(payload)
+        manager = _place(payload, count)
+        if manager is None:
+            raise LookupError(f"알 수 없는 인터페이스입니다: {_requested_interface(payload)}")
+        routing_policy = payload.get('routing_policy')
+        if routing_policy is not None and not manager.routing_policies.exists(routing_policy):
+            raise ValueError(f"라우팅 정책을 찾을 수 없습니다: {routing_policy}")
+        spec = {field: payload.get(field) for field in
+                ('interface', 'shard_key', 'ttl', 'expires_at', 'idle_timeout', 'group', 'routing_policy')}
+        spec['count'] = count
+        params = {"count": count, "expires_at": expires_at, "idle_timeout": idle_timeout,
+                  "group": payload.get('group'), "routing_policy": routing_policy}
+        return manager.interface, params, spec
+    
+    if kind == 'rotate' and (payload.get('group') is not None or payload.get('all') is not None):
+        return _rotate_request(payload)
+    
+    if kind in ('revoke', 'rotate'):
+        names = payload.get('names')
+        if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+            raise ValueError("names는 피어 이름 목록이어야 합니다.")
+        if len(names) > MAX_BULK_PEERS:
+            raise ValueError(f"names는 {MAX_BULK_PEERS}개 이하여야 합니다.")
+        if _requested_interface(payload):
+            manager = _target_manager(payload)
+            if manager is None:
+                raise LookupError(f"알 수 없는 인터페이스입니다: {_requested_interface(payload)}")
+        else:
+            found = {shard.interface: shard for shard in map(shards.find, names) if shard is not None}
+            if not found:
+                raise LookupError(f"피어를 찾을 수 없습니다: {', '.join(names[:10])}")
+            if len(found) > 1:
+                raise ValueError("여러 인터페이스의 피어는 interface별로 나눠 제출해야 합니다.")
+            manager = next(iter(found.values()))
+        if kind == 'rotate':
+            options = _rotate_options(payload)
+            return (manager.interface, dict(names=names, **options),
+                    dict(names=names, interface=payload.get('interface'), **options))
+        return manager.interface, {"names": names}, dict(names=names, interface=payload.get('interface'))
+    
+    raise ValueError(f"지원하지 않는 작업입니다: {kind}")
+
+def _rotate_options(payload):
+    """키 교체 옵션 (preshared_key: true 새로 발급, false 제거, 생략 시 기존 PSK만 갱신 / grace: 초)"""
+    preshared_key = payload.get('preshared_key')
+    if preshared_key is not None and not isinstance(preshared_key, bool):
+        raise ValueError("preshared_key는 true 또는 false여야 합니다.")
+    grace = payload.get('grace')
+    if grace is not None:
+        if isinstance(grace, bool) or not isinstance(grace, int) or grace < 0:
+            raise ValueError("grace는 0 이상의 정수(초)여야 합니다.")
+    return {"preshared_key": preshared_key, "grace": grace}
+
+def _rotate_request(payload):
+    """그룹 또는 인터페이스 전체 키 교체 작업 (대상 피어는 실행 시점에 결정)"""
+    group, rotate_all = payload.get('group'), payload.get('all')
+    if payload.get('names') is not None or (group is not None and rotate_all is not None):
+        raise ValueError("names, group, all 중 하나만 지정해야 합니다.")
+    if group is not None and (not isinstance(group, str) or not group):
+        raise ValueError("group은 비어 있지 않은 문자열이어야 합니다.")
+    if rotate_all is not None and rotate_all is not True:
+        raise ValueError("all은 true여야 합니다.")
+    if _requested_interface(payload):
+        manager = _target_manager(payload)
+        if manager is None:
+            raise LookupError(f"알 수 없는 인터페이스입니다: {_requested_interface(payload)}")
+    elif len(shards) > 1:
+        raise ValueError("샤드가 여러 개이면 group/all 키 교체에 interface가 필요합니다.")
+    else:
+        manager = shards.primary
+    options = _rotate_options(payload)
+    target = {"group": group} if group is not None else {"all": True}
+    return (manager.interface, dict(target, **options),
+            dict(target, interface=manager.interface, **options))
+
+def _job_response(job, created):
+    """새 작업이면 202, 같은 멱등성 키로 다시 제출한 작업이면 200"""
+    response = jsonify({
+        "success": True,
+        "job": _job_view(job),
+        "message": "작업이 등록되었습니다." if created else "같은 멱등성 키로 등록된 작업입니다."
+    })
+    response.status_code = 202 if created else 200
+    response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return response
+
+def _create_with_key(key, payload, count):
+    """
+    멱등성 키가 있는 생성 요청을 작업으로 처리하고 결과를 기다림
+    
+    같은 키로 다시 요청하면 피어를 새로 만들지 않고 처음 만든 피어를 반환합니다.
+    
+    Returns:
+        (매니저, peer_configs, None) 또는 (None, None, 오류/대기 응답)
+    """
+    if job_queue is None:
+        # 작업 대기열 없이는 같은 키의 재시도를 구분할 수 없으므로 중복 생성 대신 거절
+        return None, None, (jsonify({
+            "success": False,
+            "message": "작업 대기열을 사용할 수 없어 멱등성 키가 있는 요청을 처리할 수 없습니다."
+        }), 503)
+    try:
+        interface, params, spec = _job_request('create', payload, count)
+        job, created = job_queue.submit('create', interface, params, idempotency_key=key, spec=spec)
+    except (TypeError, ValueError) as e:
+        return None, None, (jsonify({"success": False, "message": str(e)}), 400)
+    except LookupError as e:
+        return None, None, (jsonify({"success": False, "message": str(e)}), 404)
+    except IdempotencyConflict as e:
+        return None, None, (jsonify({"success": False, "message": str(e)}), 409)
+    
+    job = job_queue.wait(job['id'], JOB_WAIT)
+    if job['status'] not in JOB_FINISHED:
+        # 제한 시간 안에 끝나지 않으면 작업 정보를 돌려주고 /api/jobs/<id>로 확인
+        return None, None, _job_response(job, created)
+    if job['status'] == 'failed':
+        return None, None, (jsonify({"success": False, "message": job['error'], "job": _job_view(job)}), 500)
+    
+    manager = shards.get(job['interface'])
+    peer_configs = []
+    for peer in job['result']['peers']:
+        peer_info = manager.get_peer(peer['name'])
+        if peer_info is not None:
+            peer_configs.append({"peer_info": peer_info, "client_config": manager.get_client_config(peer['name'])})
+    if not peer_configs:
+        return None, None, (jsonify({"success": False, "message": "작업으로 만든 피어가 이미 삭제되었습니다.",
+                                     "job": _job_view(job)}), 410)
+    return manager, peer_configs, None
+
 @app.route('/api/generate_peer', methods=['POST'])
 def generate_peer():
     """새로운 WireGuard 피어 생성"""
@@ -44,21 +537,53 @@ def generate_peer():
             "message": "WireGuard 매니저가 초기화되지 않았습니다."
         }), 500
     
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
     try:
-        peer_config = wg_manager.generate_new_peer()
+        expires_at, idle_timeout = _expiry_args(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": f"만료 설정이 올바르지 않습니다: {str(e)}"
+        }), 400
+    
+    try:
+        key = _idempotency_key(payload)
+        if key:
+            manager, peer_configs, error = _create_with_key(key, payload, 1)
+            if error:
+                return error
+            peer_config = peer_configs[0]
+        else:
+            manager = _place(payload, 1)
+            if manager is None:
+                return _unknown_interface(payload)
+            peer_config = manager.generate_new_peer(
+                expires_at=expires_at,
+                idle_timeout=idle_timeout,
+                group=payload.get('group'),
+                routing_policy=payload.get('routing_policy')
+            )
         
         # 추가 정보 포함
         response_data = {
             "success": True,
             "peer_config": peer_config,
+            "interface": manager.interface,
             "message": "새로운 피어가 성공적으로 생성되었습니다.",
-            "config_file_path": wg_manager.get_config_file_path(),
-            "total_peers": len(wg_manager.get_peers())
+            "config_file_path": manager.get_config_file_path(),
+            "total_peers": manager.get_peer_count()
         }
         
         logging.info(f"피어 생성 성공: {peer_config['peer_info']['name']}")
         return jsonify(response_data)
         
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
     except Exception as e:
         error_msg = f"피어 생성 실패: {str(e)}"
         logging.error(error_msg)
@@ -67,6 +592,97 @@ def generate_peer():
             "message": error_msg
         }), 500
 
+@app.route('/api/generate_peers', methods=['POST'])
+def generate_peers():
+    """여러 WireGuard 피어 일괄 생성 (format: json, ndjson, zip)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    output_format = request.args.get('format', payload.get('format', 'json'))
+    
+    try:
+        count = int(request.args.get('count', payload.get('count', 1)))
+    except (TypeError, ValueError):
+        return jsonify({
+            "success": False,
+            "message": "count는 정수여야 합니다."
+        }), 400
+    
+    if not 1 <= count <= MAX_BULK_PEERS:
+        return jsonify({
+            "success": False,
+            "message": f"count는 1 이상 {MAX_BULK_PEERS} 이하여야 합니다."
+        }), 400
+    
+    if output_format not in ('json', 'ndjson', 'zip'):
+        return jsonify({
+            "success": False,
+            "message": f"지원하지 않는 형식입니다: {output_format}"
+        }), 400
+    
+    try:
+        expires_at, idle_timeout = _expiry_args(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": f"만료 설정이 올바르지 않습니다: {str(e)}"
+        }), 400
+    
+    try:
+        key = _idempotency_key(payload)
+        if key:
+            manager, peer_configs, error = _create_with_key(key, payload, count)
+            if error:
+                return error
+        else:
+            manager = _place(payload, count)
+            if manager is None:
+                return _unknown_interface(payload)
+            peer_configs = manager.generate_new_peers(
+                count,
+                expires_at=expires_at,
+                idle_timeout=idle_timeout,
+                group=payload.get('group'),
+                routing_policy=payload.get('routing_policy')
+            )
+        logging.info(f"피어 일괄 생성 성공: {len(peer_configs)}개")
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        error_msg = f"피어 일괄 생성 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    if output_format == 'ndjson':
+        return Response(stream_with_context(iter_ndjson(peer_configs)),
+                        mimetype='application/x-ndjson')
+    
+    if output_format == 'zip':
+        return Response(stream_with_context(iter_zip(client_config_files(peer_configs))),
+                        mimetype='application/zip',
+                        headers={"Content-Disposition": "attachment; filename=peers.zip"})
+    
+    return jsonify({
+        "success": True,
+        "peer_configs": peer_configs,
+        "interface": manager.interface,
+        "message": f"{len(peer_configs)}개의 피어가 성공적으로 생성되었습니다.",
+        "config_file_path": manager.get_config_file_path(),
+        "total_peers": manager.get_peer_count()
+    })
+
 @app.route('/api/vpn_status')
 def vpn_status():
     """WireGuard VPN 상태 확인"""
@@ -77,14 +693,25 @@ def vpn_status():
         }), 500
     
     try:
-        status_output = wg_manager.get_vpn_status()
+        status = wg_manager.get_vpn_status_details()
+        # 상태 수집기는 모든 인터페이스를 보여주므로 다른 샤드 피어 이름도 채움
+        if len(shards) > 1:
+            for peer in status["peers"]:
+                if peer["name"] is None:
+                    peer["name"] = shards.get_peer_name(peer["public_key"])
         
         return jsonify({
             "success": True,
-            "status_output": status_output,
+            "status_output": status["status_output"],
+            "status": {
+                "available": status["available"],
+                "collected_at": status["collected_at"],
+                "interfaces": status["interfaces"],
+                "peers": status["peers"]
+            },
             "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
             "config_file_path": wg_manager.get_config_file_path(),
-            "total_peers": len(wg_manager.get_peers())
+            "total_peers": shards.get_peer_count()
         })
         
     except Exception as e:
@@ -97,21 +724,79 @@ def vpn_status():
 
 @app.route('/api/peers')
 def get_peers():
-    """등록된 피어 목록 조회"""
+    """
+    등록된 피어 목록 조회
+    
+    Query:
+        cursor: 이전 응답의 next_cursor
+        limit: 페이지 크기 (최대 MAX_PEERS_PAGE_SIZE)
+        fields: 포함할 필드 (쉼표 구분, 예: name,ip,created_at)
+        prefix: 이름 접두사
+        created_after / created_before: 생성 시각 범위 ("%Y-%m-%d %H:%M:%S")
+        interface: 조회할 샤드 (없으면 기본 샤드)
+    """
     if not wg_manager:
         return jsonify({
             "success": False,
             "message": "WireGuard 매니저가 초기화되지 않았습니다."
         }), 500
     
+    manager = _target_manager()
+    if manager is None:
+        return _unknown_interface()
+    
     try:
-        peers = wg_manager.get_peers()
-        return jsonify({
-            "success": True,
-            "peers": peers,
-            "total_count": len(peers),
-            "config_file_path": wg_manager.get_config_file_path()
-        })
+        cursor = request.args.get('cursor', type=int)
+        limit = request.args.get('limit', type=int)
+        if limit is not None and not 1 <= limit <= MAX_PEERS_PAGE_SIZE:
+            return jsonify({
+                "success": False,
+                "message": f"limit은 1 이상 {MAX_PEERS_PAGE_SIZE} 이하여야 합니다."
+            }), 400
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in PEER_FIELDS]
+            if unknown:
+                return jsonify({
+                    "success": False,
+                    "message": f"알 수 없는 필드입니다: {', '.join(unknown)}"
+                }), 400
+        
+        # 피어 목록 버전 + 쿼리로 ETag 생성 (변경이 없으면 직렬화 없이 304)
+        version = manager.get_peers_version()
+        query_hash = zlib.crc32(request.query_string) & 0xffffffff
+        etag = f"{version}-{query_hash:08x}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        def build():
+            peers, next_cursor = manager.query_peers(
+                cursor=cursor,
+                limit=limit,
+                fields=fields,
+                name_prefix=request.args.get('prefix'),
+                created_after=request.args.get('created_after'),
+                created_before=request.args.get('created_before')
+            )
+            return {
+                "success": True,
+                "peers": peers,
+                "interface": manager.interface,
+                "total_count": manager.get_peer_count(),
+                "next_cursor": next_cursor,
+                "config_file_path": manager.get_config_file_path()
+            }
+        
+        # 같은 버전의 같은 쿼리는 캐시된 본문(과 압축 결과)을 그대로 반환
+        response = _cached_json(("peers", manager.interface, version, request.query_string), build)
+        response.set_etag(etag)
+        # 브라우저가 항상 ETag로 재검증하도록 설정
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         error_msg = f"피어 목록 조회 실패: {str(e)}"
@@ -121,9 +806,73 @@ def get_peers():
             "message": error_msg
         }), 500
 
-@app.route('/api/export_config')
-def export_config():
-    """설정 파일 내용 내보내기"""
+@app.route('/api/peers/lookup')
+def lookup_peer():
+    """공개키 또는 IP로 피어 조회"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    public_key = request.args.get('public_key')
+    ip = request.args.get('ip')
+    manager = None
+    peer = None
+    if public_key:
+        manager = shards.find_by_public_key(public_key)
+        if manager:
+            peer = manager.get_peer_by_public_key(public_key)
+    elif ip:
+        for shard in shards:
+            peer = shard.get_peer_by_ip(ip)
+            if peer is not None:
+                manager = shard
+                break
+    else:
+        return jsonify({
+            "success": False,
+            "message": "public_key 또는 ip 파라미터가 필요합니다."
+        }), 400
+    
+    if peer is None:
+        return jsonify({
+            "success": False,
+            "message": "피어를 찾을 수 없습니다."
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "peer": peer,
+        "interface": manager.interface
+    })
+
+@app.route('/api/peers/<name>', methods=['GET'])
+def get_peer(name):
+    """이름으로 피어 조회"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    manager = shards.find(name)
+    peer = manager.get_peer(name) if manager else None
+    if peer is None:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "peer": peer,
+        "interface": manager.interface
+    })
+
+@app.route('/api/peers/<name>', methods=['DELETE'])
+def revoke_peer(name):
+    """피어 삭제 (폐기)"""
     if not wg_manager:
         return jsonify({
             "success": False,
@@ -131,49 +880,684 @@ def export_config():
         }), 500
     
     try:
-        config_content = wg_manager.export_config()
+        manager = shards.find(name)
+        if manager is None:
+            raise KeyError(name)
+        peer = manager.revoke_peer(name)
+        logging.info(f"피어 삭제 성공: {name}")
         return jsonify({
             "success": True,
-            "config_content": config_content,
-            "config_file_path": wg_manager.get_config_file_path()
+            "peer": peer,
+            "interface": manager.interface,
+            "message": f"피어 {name}이(가) 삭제되었습니다.",
+            "total_peers": manager.get_peer_count()
         })
         
+    except KeyError:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
     except Exception as e:
-        error_msg = f"설정 파일 내보내기 실패: {str(e)}"
+        error_msg = f"피어 삭제 실패: {str(e)}"
         logging.error(error_msg)
         return jsonify({
             "success": False,
             "message": error_msg
         }), 500
 
-@app.route('/api/health')
-def health_check():
-    """애플리케이션 상태 확인"""
+@app.route('/api/peers/<name>', methods=['PATCH'])
+def update_peer(name):
+    """피어 그룹/라우팅 정책 변경 (group, routing_policy, null이면 해제)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    manager = shards.find(name)
+    if manager is None:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    
     try:
-        health_info = {
-            "success": True,
-            "status": "healthy",
-            "manager_initialized": wg_manager is not None,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        if wg_manager:
-            health_info.update({
-                "config_file_exists": os.path.exists(wg_manager.get_config_file_path()),
-                "config_file_path": wg_manager.get_config_file_path(),
-                "total_peers": len(wg_manager.get_peers())
-            })
+        peer = manager.update_peer_routing(name, payload)
+    except KeyError:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        error_msg = f"피어 변경 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "peer": {key: value for key, value in peer_view(peer).items() if key != 'private_key'},
+        "routing_policy": manager.routing_policies.policy_name(peer)
+    })
+
+@app.route('/api/peers/<name>/traffic')
+def peer_traffic(name):
+    """피어별 송수신량 시계열 조회"""
+    if not wg_manager or not traffic_sampler:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    manager = shards.find(name)
+    peer = manager.get_peer(name) if manager else None
+    if peer is None:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "name": name,
+        "interval": traffic_sampler.interval,
+        "samples": traffic_sampler.get_series(peer['public_key']) or []
+    })
+
+@app.route('/api/peers/<name>/config')
+def peer_config(name):
+    """
+    피어 클라이언트 설정 파일(.conf) 다운로드
+    
+    Query:
+        previous: 1이면 키 교체 전 설정 (유예 기간 안에서만)
+    """
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    previous = request.args.get('previous') in ('1', 'true')
+    headers = {
+        "Content-Disposition": f"attachment; filename={name}.conf",
+        "Cache-Control": "no-store"
+    }
+    manager = shards.find(name)
+    if previous:
+        found = manager.get_previous_client_config(name) if manager else None
+        if found is None:
+            return jsonify({
+                "success": False,
+                "message": f"이전 키 설정이 없거나 유예 기간이 지났습니다: {name}"
+            }), 404
+        client_config, grace_until = found
+        headers["X-Grace-Until"] = grace_until
+    else:
+        try:
+            client_config = manager.get_client_config(name) if manager else None
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "message": str(e)
+            }), 409
+        if client_config is None:
+            return jsonify({
+                "success": False,
+                "message": f"피어를 찾을 수 없습니다: {name}"
+            }), 404
+    
+    # 개인키가 포함되므로 캐시하지 않음
+    return Response(client_config,
+                    mimetype='text/plain',
+                    headers=headers)
+
+@app.route('/api/peers/<name>/rotate', methods=['POST'])
+def rotate_peer(name):
+    """
+    피어 키 즉시 교체 (새 클라이언트 설정 반환)
+    
+    Body:
+        preshared_key: true 새로 발급, false 제거 (생략 시 기존 PSK만 갱신)
+        grace: 이전 키 설정을 내려받을 수 있는 시간(초)
+    """
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    manager = shards.find(name)
+    if manager is None:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    
+    timings = {}
+    try:
+        options = _rotate_options(payload)
+        peer = manager.rotate_peers([name], timings=timings, **options)[0]
+        client_config = manager.get_client_config(name)
+    except KeyError:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        error_msg = f"키 교체 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    response = jsonify({
+        "success": True,
+        "interface": manager.interface,
+        "name": name,
+        "public_key": peer['public_key'],
+        "preshared_key": bool(peer.get('preshared_key')),
+        "grace_until": (peer.get('previous_key') or {}).get('grace_until'),
+        "config": client_config,
+        "timings": {key: round(value, 4) if isinstance(value, float) else value
+                    for key, value in timings.items()}
+    })
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@app.route('/api/peers/<name>/qr')
+def peer_qr(name):
+    """피어 클라이언트 설정 QR 코드 (format: png, svg)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    if not qr_available():
+        return jsonify({
+            "success": False,
+            "message": "QR 코드를 만들려면 qrcode 패키지가 필요합니다."
+        }), 501
+    
+    image_format = request.args.get('format', 'png')
+    if image_format not in QR_FORMATS:
+        return jsonify({
+            "success": False,
+            "message": f"지원하지 않는 형식입니다: {image_format}"
+        }), 400
+    
+    try:
+        manager = shards.find(name)
+        client_config = manager.get_client_config(name) if manager else None
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 409
+    if client_config is None:
+        return jsonify({
+            "success": False,
+            "message": f"피어를 찾을 수 없습니다: {name}"
+        }), 404
+    
+    try:
+        image = render_qr(client_config, image_format)
+    except Exception as e:
+        error_msg = f"QR 코드 생성 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    return Response(image, mimetype=QR_FORMATS[image_format], headers={"Cache-Control": "no-store"})
+
+@app.route('/api/export_configs', methods=['GET', 'POST'])
+def export_client_configs():
+    """
+    클라이언트 설정 zip 아카이브 스트리밍 다운로드
+    
+    names(쉼표 구분 또는 JSON 배열)와 prefix로 대상을 고르며, 없으면 전체 피어를 내보냅니다.
+    각 설정은 아카이브를 내려보내는 동안 하나씩 만들어집니다.
+    interface를 지정하면 해당 샤드만 내보냅니다.
+    """
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    manager = _target_manager(payload)
+    if manager is None:
+        return _unknown_interface(payload)
+    names = payload.get('names')
+    if names is None and request.args.get('names'):
+        names = [name for name in request.args['names'].split(',') if name]
+    if names is not None and not isinstance(names, list):
+        return jsonify({
+            "success": False,
+            "message": "names는 피어 이름 목록이어야 합니다."
+        }), 400
+    name_prefix = request.args.get('prefix', payload.get('prefix')) or None
+    
+    files = manager.iter_client_configs(names=names, name_prefix=name_prefix)
+    return Response(stream_with_context(iter_zip(files)),
+                    mimetype='application/zip',
+                    headers={
+                        "Content-Disposition": "attachment; filename=client-configs.zip",
+                        "Cache-Control": "no-store"
+                    })
+
+@app.route('/api/reconcile', methods=['GET', 'POST'])
+def reconcile():
+    """
+    저장소, 설정 파일, 인터페이스의 피어 차이 확인 (GET) 또는 복구 (POST)
+    
+    limit: 항목별로 응답에 포함할 최대 개수 (기본 100, 개수 집계는 항상 전체 기준)
+    interface: 대상 샤드 (없으면 기본 샤드)
+    """
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    manager = _target_manager()
+    if manager is None:
+        return _unknown_interface()
+    
+    limit = min(max(request.args.get('limit', 100, type=int), 0), MAX_PEERS_PAGE_SIZE)
+    repair = request.method == 'POST'
+    try:
+        drift, actions = manager.reconcile(repair=repair)
+    except Exception as e:
+        error_msg = f"피어 상태 비교 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "interface": manager.interface,
+        "drift": drift.to_dict(sample_limit=limit),
+        "actions": actions,
+        "total_peers": manager.get_peer_count()
+    })
+
+@app.route('/api/traffic/top')
+def top_talkers():
+    """최근 송수신량이 가장 많은 피어 조회"""
+    if not wg_manager or not traffic_sampler:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    count = min(max(request.args.get('n', 10, type=int), 1), 100)
+    window = request.args.get('window', 300, type=float)
+    
+    talkers = []
+    for public_key, rx_bytes, tx_bytes in traffic_sampler.top_talkers(count, window):
+        talkers.append({
+            "name": shards.get_peer_name(public_key),
+            "public_key": public_key,
+            "rx_bytes": rx_bytes,
+            "tx_bytes": tx_bytes
+        })
+    
+    return jsonify({
+        "success": True,
+        "window": window,
+        "talkers": talkers
+    })
+
+@app.route('/api/policies')
+def list_policies():
+    """라우팅 정책과 그룹 지정 조회 (allowed_ips: VPN 대역을 포함해 합친 결과)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    routing_policies = wg_manager.routing_policies
+    policies, groups = routing_policies.list()
+    network = wg_manager.address_pool.network
+    for name, policy in policies.items():
+        policy["allowed_ips"] = routing_policies.resolve({"routing_policy": name}, network)[0]
+    
+    return jsonify({
+        "success": True,
+        "version": routing_policies.version,
+        "policies": policies,
+        "groups": groups
+    })
+
+@app.route('/api/policies/<name>', methods=['PUT'])
+def put_policy(name):
+    """
+    라우팅 정책 생성/변경
+    
+    Body:
+        mode: full 또는 split
+        networks: split 터널 대역 목록 (겹치거나 인접한 대역은 합쳐서 저장)
+        dns: DNS 서버 목록 (없으면 8.8.8.8, 8.8.4.4)
+    """
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    networks = payload.get('networks') or []
+    dns = payload.get('dns')
+    if not isinstance(networks, list) or (dns is not None and not isinstance(dns, list)):
+        return jsonify({
+            "success": False,
+            "message": "networks와 dns는 목록이어야 합니다."
+        }), 400
+    
+    try:
+        policy = wg_manager.routing_policies.put(name, payload.get('mode', 'split'), networks, dns)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": f"라우팅 정책이 올바르지 않습니다: {str(e)}"
+        }), 400
+    except Exception as e:
+        error_msg = f"라우팅 정책 저장 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "name": name,
+        "policy": policy,
+        "version": wg_manager.routing_policies.version
+    })
+
+@app.route('/api/policies/<name>', methods=['DELETE'])
+def delete_policy(name):
+    """라우팅 정책 삭제 (이 정책을 지정한 피어는 그룹 정책 또는 full 적용)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    try:
+        wg_manager.routing_policies.delete(name)
+    except KeyError:
+        return jsonify({
+            "success": False,
+            "message": f"라우팅 정책을 찾을 수 없습니다: {name}"
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 409
+    
+    return jsonify({
+        "success": True,
+        "message": f"라우팅 정책 {name}이(가) 삭제되었습니다."
+    })
+
+@app.route('/api/groups/<group>/policy', methods=['PUT', 'DELETE'])
+def group_policy(group):
+    """그룹 라우팅 정책 지정 (PUT {"policy": 이름}) 또는 해제 (DELETE)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    name = None
+    if request.method == 'PUT':
+        payload = _json_payload()
+        if payload is None:
+            return _invalid_payload()
+        name = payload.get('policy')
+        if not name:
+            return jsonify({
+                "success": False,
+                "message": "policy가 필요합니다."
+            }), 400
+    
+    try:
+        wg_manager.routing_policies.set_group(group, name)
+    except KeyError:
+        return jsonify({
+            "success": False,
+            "message": f"라우팅 정책을 찾을 수 없습니다: {name}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "group": group,
+        "policy": name
+    })
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    피어 작업 비동기 제출 (즉시 작업 ID 반환)
+    
+    Body:
+        kind: create (count, interface, shard_key, ttl, expires_at, idle_timeout)
+              revoke (names, interface)
+              rotate (names 또는 group 또는 all, interface, preshared_key, grace)
+        idempotency_key: 멱등성 키 (Idempotency-Key 헤더도 가능)
+    """
+    if not wg_manager or not job_queue:
+        return jsonify({
+            "success": False,
+            "message": "작업 대기열이 초기화되지 않았습니다."
+        }), 500
+    
+    payload = _json_payload()
+    if payload is None:
+        return _invalid_payload()
+    try:
+        key = _idempotency_key(payload)
+        interface, params, spec = _job_request(payload.get('kind'), payload)
+        job, created = job_queue.submit(payload['kind'], interface, params, idempotency_key=key, spec=spec)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except LookupError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 404
+    except IdempotencyConflict as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 409
+    except Exception as e:
+        error_msg = f"작업 등록 실패: {str(e)}"
+        logging.error(error_msg)
+        return jsonify({
+            "success": False,
+            "message": error_msg
+        }), 500
+    
+    return _job_response(job, created)
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """작업 상태/결과 조회 (wait: 끝날 때까지 최대 대기 시간(초), 실시간 알림은 /api/events의 job 이벤트)"""
+    if not job_queue:
+        return jsonify({
+            "success": False,
+            "message": "작업 대기열이 초기화되지 않았습니다."
+        }), 500
+    
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT)
+    job = job_queue.wait(job_id, wait) if wait else job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": f"작업을 찾을 수 없습니다: {job_id}"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "job": _job_view(job)
+    })
+
+@app.route('/api/shards')
+def list_shards():
+    """샤드(인터페이스)별 주소 대역, 포트, 피어 수와 배치 정책 조회"""
+    if not shards:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "placement": shards.placement,
+        "shards": shards.summary(),
+        "total_peers": shards.get_peer_count()
+    })
+
+@app.route('/api/events')
+def events():
+    """피어 추가/삭제 및 상태 변경 실시간 스트림 (Server-Sent Events)"""
+    if not wg_manager or not status_tracker:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    subscriber = event_broker.subscribe()
+    initial = [("status", status_tracker.snapshot())]
+    return Response(stream_with_context(event_broker.stream(subscriber, initial)),
+                    mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 메트릭 (워커 프로세스 단위)"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route('/api/export_config')
+def export_config():
+    """설정 파일 내용 내보내기 (interface: 대상 샤드, 없으면 기본 샤드)"""
+    if not wg_manager:
+        return jsonify({
+            "success": False,
+            "message": "WireGuard 매니저가 초기화되지 않았습니다."
+        }), 500
+    
+    manager = _target_manager()
+    if manager is None:
+        return _unknown_interface()
+    
+    try:
+        def build():
+            return {
+                "success": True,
+                "interface": manager.interface,
+                "config_content": manager.export_config(),
+                "config_file_path": manager.get_config_file_path()
+            }
         
-        return jsonify(health_info)
+        # 설정 파일 버전(mtime/inode/크기)이 같으면 캐시된 본문 반환
+        version = manager.get_config_version()
+        if version is None:
+            return jsonify(build())
+        return _cached_json(("config", manager.interface, version), build)
         
     except Exception as e:
+        error_msg = f"설정 파일 내보내기 실패: {str(e)}"
+        logging.error(error_msg)
         return jsonify({
             "success": False,
-            "status": "error",
-            "message": str(e),
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            "message": error_msg
         }), 500
 
+@app.route('/api/live')
+def liveness():
+    """생존 확인 (프로세스가 요청을 처리할 수 있으면 항상 200, 상태 확인 없음)"""
+    return jsonify({"success": True, "status": "alive"})
+
+def _readiness():
+    """마지막 준비 상태 확인 결과와 HTTP 상태 코드 (초기화 전이면 초기화 시작)"""
+    if not _services_initialized:
+        start_background_init()
+        return {"ready": False, "status": "starting", "checks": []}, 503
+    if not health_monitor:
+        return {"ready": False, "status": "not_ready", "checks": [],
+                "message": "WireGuard 매니저가 초기화되지 않았습니다."}, 503
+    snapshot = health_monitor.snapshot()
+    if snapshot is None:
+        return {"ready": False, "status": "starting", "checks": []}, 503
+    return snapshot, 200 if snapshot["ready"] else 503
+
+@app.route('/api/ready')
+def readiness():
+    """준비 상태 확인 (백그라운드 확인 결과 반환, 준비되지 않았으면 503)"""
+    snapshot, status_code = _readiness()
+    return jsonify(dict(snapshot, success=status_code == 200)), status_code
+
+@app.route('/api/health')
+def health_check():
+    """애플리케이션 상태 확인 (준비 상태 확인 결과 요약, 준비되지 않았으면 503)"""
+    snapshot, status_code = _readiness()
+    health_info = {
+        "success": status_code == 200,
+        "status": snapshot["status"],
+        "ready": snapshot["ready"],
+        "manager_initialized": wg_manager is not None,
+        "failed_checks": [check for check in snapshot["checks"] if not check["ok"]],
+        "checked_at": snapshot.get("checked_at"),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if wg_manager:
+        health_info.update({
+            "config_file_path": wg_manager.get_config_file_path(),
+            "total_peers": shards.get_peer_count(),
+            "shards": len(shards)
+        })
+    return jsonify(health_info), status_code
+
 @app.errorhandler(404)
 def not_found_error(error):
     """404 에러 핸들러"""
@@ -207,9 +1591,10 @@ if __name__ == '__main__':
         logging.info("🚀 WireGuard VPN 관리자 시작")
         logging.info("=" * 50)
         
+        init_services()
         if wg_manager:
             logging.info(f"📁 설정 파일 경로: {wg_manager.get_config_file_path()}")
-            logging.info(f"👥 등록된 피어 수: {len(wg_manager.get_peers())}")
+            logging.info(f"👥 등록된 피어 수: {wg_manager.get_peer_count()}")
         else:
             logging.warning("⚠️  WireGuard 매니저 초기화 실패")
         
@@ -0,0 +1,286 @@
+"""
+WireGuardManager / HTTP API 성능 벤치마크
+
+피어 수(기본 100, 1000, 10000)별로 새 임시 홈 디렉토리와 별도 프로세스에서
+다음을 측정하고 결과를 JSON으로 출력합니다. `wg`/`sudo`는 스텁으로 대체하며,
+`wg show all dump`는 등록된 피어 수만큼의 가짜 상태를 반환합니다.
+
+- 피어 일괄 생성 처리량 (목표 피어 수까지 채우는 동안)
+- 목표 피어 수에서 피어 1개 생성 지연 시간
+- 상태 조회 지연 시간 (캐시 미스 / 캐시 적중)
+- get_peers, query_peers, export_config 지연 시간
+- 주요 HTTP 경로 지연 시간 (Flask 테스트 클라이언트)
+- 메모리 사용량 (RSS)
+
+사용법:
+    python benchmarks/bench_manager.py [--sizes 100,1000,10000] [--repeat 50] [--output result.json]
+    python benchmarks/bench_manager.py --compare baseline.json result.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# wg show all dump를 흉내 내는 스텁 (WG_BENCH_DUMP 파일 내용 출력)
+WG_STUB = """
+if [ "$1 $2 $3" = "show all dump" ]; then
+  [ -f "$WG_BENCH_DUMP" ] && cat "$WG_BENCH_DUMP"
+fi
+exit 0
+"""
+
+# 일괄 생성 한 번에 만들 최대 피어 수
+FILL_BATCH = 1000
+
+
+def write_stub(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n" + body + "\n")
+    os.chmod(path, 0o755)
+
+
+def summarize(samples_ms):
+    """지연 시간 목록 요약 (밀리초)"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": ordered[-1]
+    }
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def rss_kb():
+    """현재 RSS (KiB, /proc이 없으면 None)"""
+    try:
+        with open("/proc/self/statm", encoding='utf-8') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def write_dump(path, peers):
+    """등록된 피어로 가짜 wg show all dump 출력 생성"""
+    now = int(time.time())
+    lines = ["wg0\t(hidden)\tSERVER_PUBLIC_KEY=\t51820\toff"]
+    for index, peer in enumerate(peers):
+        lines.append(
+            f"wg0\t{peer['public_key']}\t(none)\t198.51.100.{index % 250 + 1}:51820\t"
+            f"{peer['ip']}/32\t{now - index % 600}\t{index * 1000}\t{index * 500}\t25"
+        )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run_child(size, repeat):
+    """현재 프로세스에서 피어 size개 기준 측정 (HOME/PATH는 부모가 설정)"""
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    started = time.perf_counter()
+    import application
+    application.init_services()
+    manager = application.wg_manager
+    init_ms = (time.perf_counter() - started) * 1000
+    rss_before = rss_kb()
+
+    # 목표 피어 수까지 일괄 생성
+    fill_started = time.perf_counter()
+    remaining = size
+    while remaining > 0:
+        batch = min(FILL_BATCH, remaining)
+        manager.generate_new_peers(batch)
+        remaining -= batch
+    fill_s = time.perf_counter() - fill_started
+    rss_after_fill = rss_kb()
+
+    # 목표 피어 수에서 단건 생성
+    create = timed(manager.generate_new_peer, repeat)
+
+    # 상태 조회 (모든 피어가 dump에 나타나는 상황)
+    write_dump(os.environ["WG_BENCH_DUMP"], manager.get_peers())
+
+    def status_cold():
+        manager.status_collector.invalidate()
+        manager.get_vpn_status_details()
+
+    status = {
+        "cold": timed(status_cold, repeat),
+        "cached": timed(manager.get_vpn_status_details, repeat)
+    }
+
+    operations = {
+        "get_peers": timed(manager.get_peers, repeat),
+        "query_peers_page_100": timed(lambda: manager.query_peers(limit=100), repeat),
+        "export_config": timed(manager.export_config, repeat)
+    }
+
+    client = application.app.test_client()
+
+    def request(method, path):
+        def call():
+            response = client.open(path, method=method)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {path}: {response.status_code}")
+        return call
+
+    http = {
+        "GET /api/peers?limit=100": timed(request("GET", "/api/peers?limit=100"), repeat),
+        "GET /api/peers/<name>": timed(request("GET", "/api/peers/peer_1"), repeat),
+        "GET /api/vpn_status": timed(request("GET", "/api/vpn_status"), repeat),
+        "GET /api/export_config": timed(request("GET", "/api/export_config"), repeat),
+        "POST /api/generate_peer": timed(request("POST", "/api/generate_peer"), repeat)
+    }
+
+    import resource
+    return {
+        "peers": size,
+        "init_ms": init_ms,
+        "fill": {
+            "seconds": fill_s,
+            "peers_per_s": size / fill_s if fill_s else None
+        },
+        "create_peer": create,
+        "create_peer_per_s": 1000 / create["mean_ms"] if create["mean_ms"] else None,
+        "status": status,
+        "operations": operations,
+        "http": http,
+        "memory": {
+            "rss_before_fill_kb": rss_before,
+            "rss_after_fill_kb": rss_after_fill,
+            "rss_per_peer_bytes": (
+                (rss_after_fill - rss_before) * 1024 / size
+                if rss_before is not None and rss_after_fill is not None else None
+            ),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        }
+    }
+
+
+def run_size(size, repeat):
+    """피어 수 하나를 새 임시 디렉토리와 별도 프로세스에서 측정"""
+    with tempfile.TemporaryDirectory() as home:
+        stub_dir = os.path.join(home, "bin")
+        os.makedirs(stub_dir)
+        write_stub(stub_dir, "wg", WG_STUB)
+        write_stub(stub_dir, "sudo", 'exec "$@"')
+        write_stub(stub_dir, "curl", "exit 7")
+
+        env = dict(os.environ)
+        env.update({
+            "HOME": home,
+            "PATH": stub_dir + os.pathsep + env.get("PATH", ""),
+            "PYTHONPATH": ROOT,
+            "WG_BENCH_DUMP": os.path.join(home, "dump.txt"),
+            "WG_NETWORK": "10.64.0.0/16",
+            "WG_ENDPOINT": "203.0.113.1",
+            "WG_EAGER_INIT": "0",
+            # 측정 중 백그라운드 수집이 끼어들지 않도록
+            "WG_STATS_INTERVAL": "3600"
+        })
+
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(size), "--repeat", str(repeat)],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=3600
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, path + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(baseline_path, current_path):
+    """두 결과 파일의 p50 지연 시간과 처리량 비교 (current / baseline)"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {run["peers"]: run for run in json.load(f)["sizes"]}
+    with open(current_path, encoding='utf-8') as f:
+        current = {run["peers"]: run for run in json.load(f)["sizes"]}
+
+    report = {}
+    for size in sorted(set(baseline) & set(current)):
+        base = dict(_flatten(baseline[size]))
+        rows = {}
+        for path, value in _flatten(current[size]):
+            if not (path.endswith("p50_ms") or path.endswith("per_s")) or not base.get(path):
+                continue
+            rows[path] = {"baseline": base[path], "current": value, "ratio": value / base[path]}
+        report[str(size)] = rows
+    return {"benchmark": "manager_compare", "baseline": baseline_path, "current": current_path, "sizes": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WireGuardManager / HTTP API 성능 벤치마크")
+    parser.add_argument("--sizes", default="100,1000,10000", help="쉼표로 구분한 피어 수 목록")
+    parser.add_argument("--repeat", type=int, default=50, help="항목별 반복 횟수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (없으면 표준 출력만)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="두 결과 파일 비교")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(args.child, args.repeat)))
+        return
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    summary = {
+        "benchmark": "manager",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": [run_size(size, args.repeat) for size in sizes]
+    }
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+피어 키 일괄 교체 벤치마크
+
+새 임시 홈 디렉토리와 별도 프로세스에서 피어를 채운 뒤, 키 생성 워커 수별로
+전체 피어 키 교체(rotate_peers)를 실행하고 단계별 소요 시간을 JSON으로 출력합니다.
+`wg`/`sudo`는 스텁으로 대체합니다.
+
+- keygen_s: 키페어 생성 (워커 프로세스 병렬)
+- commit_s: 설정 파일 기록 + 저장소 갱신
+- sync_s: WireGuard 동기화
+
+사용법:
+    python benchmarks/bench_rotation.py [--peers 10000] [--workers 1,4] [--preshared-key] [--output result.json]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 일괄 생성 한 번에 만들 최대 피어 수
+FILL_BATCH = 1000
+
+
+def write_stub(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n" + body + "\n")
+    os.chmod(path, 0o755)
+
+
+def run_child(peers, workers, preshared_key):
+    """현재 프로세스에서 측정 (HOME/PATH는 부모가 설정)"""
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from wireguard.manager import WireGuardManager
+    manager = WireGuardManager()
+
+    fill_started = time.perf_counter()
+    remaining = peers
+    while remaining > 0:
+        batch = min(FILL_BATCH, remaining)
+        manager.generate_new_peers(batch)
+        remaining -= batch
+    fill_s = time.perf_counter() - fill_started
+
+    runs = []
+    for count in workers:
+        manager.rotation_workers = count
+        timings = {}
+        rotated = manager.rotate_peers(manager.peer_names(), preshared_key=preshared_key or None,
+                                       timings=timings)
+        runs.append(dict(
+            workers=count,
+            rotated=len(rotated),
+            peers_per_s=len(rotated) / timings["total_s"] if timings["total_s"] else None,
+            **{key: value for key, value in timings.items() if key != "peers"}
+        ))
+    manager.kernel_sync.flush()
+    return {"fill_s": fill_s, "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="피어 키 일괄 교체 벤치마크")
+    parser.add_argument("--peers", type=int, default=10000, help="피어 수")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="쉼표로 구분한 키 생성 워커 수 목록")
+    parser.add_argument("--preshared-key", action="store_true", help="PresharedKey도 발급")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (없으면 표준 출력만)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    workers = list(dict.fromkeys(int(count) for count in args.workers.split(",") if count))
+
+    if args.child:
+        print(json.dumps(run_child(args.peers, workers, args.preshared_key)))
+        return
+
+    with tempfile.TemporaryDirectory() as home:
+        stub_dir = os.path.join(home, "bin")
+        os.makedirs(stub_dir)
+        write_stub(stub_dir, "wg", "exit 0")
+        write_stub(stub_dir, "sudo", 'exec "$@"')
+        write_stub(stub_dir, "curl", "exit 7")
+
+        env = dict(os.environ)
+        env.update({
+            "HOME": home,
+            "PATH": stub_dir + os.pathsep + env.get("PATH", ""),
+            "PYTHONPATH": ROOT,
+            "WG_NETWORK": "10.64.0.0/16",
+            "WG_ENDPOINT": "203.0.113.1",
+            "WG_EAGER_INIT": "0",
+            "WG_STATS_INTERVAL": "3600"
+        })
+        command = [sys.executable, os.path.abspath(__file__), "--child",
+                   "--peers", str(args.peers), "--workers", ",".join(map(str, workers))]
+        if args.preshared_key:
+            command.append("--preshared-key")
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=3600)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        child = json.loads(result.stdout.strip().splitlines()[-1])
+
+    summary = dict(
+        benchmark="rotation",
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        peers=args.peers,
+        preshared_key=args.preshared_key,
+        **child
+    )
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
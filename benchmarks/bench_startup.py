@@ -0,0 +1,94 @@
+"""
+애플리케이션 시작 시간 벤치마크
+
+네트워크가 없는 호스트를 흉내 내기 위해 `curl`은 지정한 시간만큼 멈추는 스텁,
+`wg`/`sudo`는 실패하는 스텁으로 대체한 뒤 다음을 측정합니다.
+
+- application 모듈 임포트 시간
+- 서비스 초기화(WireGuardManager 생성) 완료까지 걸린 시간
+- 첫 번째 피어 생성 요청 지연 시간
+
+사용법:
+    python benchmarks/bench_startup.py [--curl-delay 4] [--runs 3]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 별도 프로세스에서 실행해 임포트 비용을 매번 새로 측정
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import application
+imported = time.perf_counter()
+application.init_services()
+initialized = time.perf_counter()
+client = application.app.test_client()
+response = client.post('/api/generate_peer')
+first_request = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "init_ms": (initialized - imported) * 1000,
+    "first_peer_ms": (first_request - initialized) * 1000,
+    "status_code": response.status_code
+}))
+"""
+
+
+def write_stub(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n" + body + "\n")
+    os.chmod(path, 0o755)
+
+
+def run_once(curl_delay):
+    with tempfile.TemporaryDirectory() as home:
+        stub_dir = os.path.join(home, "bin")
+        os.makedirs(stub_dir)
+        write_stub(stub_dir, "curl", f"sleep {curl_delay}; exit 28")
+        write_stub(stub_dir, "wg", "exit 1")
+        write_stub(stub_dir, "sudo", "exit 1")
+
+        env = dict(os.environ)
+        env.update({
+            "HOME": home,
+            "PATH": stub_dir + os.pathsep + env.get("PATH", ""),
+            "WG_EAGER_INIT": "0",
+            "PYTHONPATH": ROOT
+        })
+        env.pop("WG_ENDPOINT", None)
+
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="애플리케이션 시작 시간 벤치마크")
+    parser.add_argument("--curl-delay", type=float, default=4.0, help="curl 스텁 지연 시간(초)")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수")
+    args = parser.parse_args()
+
+    runs = [run_once(args.curl_delay) for _ in range(args.runs)]
+    summary = {
+        "benchmark": "startup",
+        "curl_delay_s": args.curl_delay,
+        "runs": runs,
+        "best": {key: min(run[key] for run in runs) for key in ("import_ms", "init_ms", "first_peer_ms")}
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
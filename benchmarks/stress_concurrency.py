@@ -0,0 +1,153 @@
+"""
+동시 피어 생성/삭제 스트레스 검사
+
+여러 스레드(필요하면 여러 프로세스)에서 동시에 피어를 생성/삭제한 뒤
+다음 불변식을 확인합니다. `wg`/`sudo`는 실패하는 스텁으로 대체합니다.
+
+- 피어 이름, 공개키, IP가 모두 고유함
+- 설정 파일의 [Peer] 섹션, 레지스트리, 저장소의 피어 집합이 일치함
+- 주소 풀의 할당 수가 피어 수와 같음
+
+사용법:
+    python benchmarks/stress_concurrency.py [--threads 32] [--creates 500] [--revokes 50] [--processes 1]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def write_stub(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n" + body + "\n")
+    os.chmod(path, 0o755)
+
+
+def hammer(threads, creates, revokes, network):
+    """한 프로세스 안에서 스레드들로 생성/삭제를 동시에 실행"""
+    from wireguard.manager import WireGuardManager
+
+    manager = WireGuardManager(network=network, endpoint="203.0.113.1")
+    created = []
+    created_lock = threading.Lock()
+    errors = []
+
+    def create(_):
+        try:
+            peer = manager.generate_new_peer()["peer_info"]
+            with created_lock:
+                created.append(peer["name"])
+        except Exception as e:
+            errors.append(f"create: {e}")
+
+    def revoke(_):
+        with created_lock:
+            if not created:
+                return
+            name = created.pop(random.randrange(len(created)))
+        try:
+            manager.revoke_peer(name)
+        except Exception as e:
+            errors.append(f"revoke {name}: {e}")
+
+    tasks = [create] * creates + [revoke] * revokes
+    random.shuffle(tasks)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda task: task(None), tasks))
+    elapsed = time.perf_counter() - started
+    manager.kernel_sync.flush()
+    return {"elapsed_s": elapsed, "errors": errors}
+
+
+def _child(args, queue):
+    queue.put(hammer(*args))
+
+
+def check(network):
+    """모든 작업이 끝난 뒤 새 매니저로 불변식 확인"""
+    from wireguard.manager import WireGuardManager
+
+    manager = WireGuardManager(network=network, endpoint="203.0.113.1")
+    peers = manager.get_peers()
+    names = [peer["name"] for peer in peers]
+    keys = [peer["public_key"] for peer in peers]
+    ips = [peer["ip"] for peer in peers]
+    stored = manager.store.load()
+    config_keys = set(manager.server_config.peer_public_keys())
+
+    problems = []
+    if len(set(names)) != len(names):
+        problems.append("중복된 피어 이름")
+    if len(set(keys)) != len(keys):
+        problems.append("중복된 공개키")
+    if len(set(ips)) != len(ips):
+        problems.append("중복된 IP")
+    if config_keys != set(keys):
+        problems.append(f"설정 파일 불일치 (설정: {len(config_keys)}, 레지스트리: {len(keys)})")
+    if {peer["public_key"] for peer in stored} != set(keys):
+        problems.append(f"저장소 불일치 (저장소: {len(stored)}, 레지스트리: {len(keys)})")
+    if manager.address_pool.allocated_count != len(peers):
+        problems.append(f"주소 풀 불일치 (할당: {manager.address_pool.allocated_count}, 피어: {len(peers)})")
+    return {"peers": len(peers), "problems": problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 피어 생성/삭제 스트레스 검사")
+    parser.add_argument("--threads", type=int, default=32, help="프로세스당 스레드 수")
+    parser.add_argument("--creates", type=int, default=500, help="프로세스당 생성 요청 수")
+    parser.add_argument("--revokes", type=int, default=50, help="프로세스당 삭제 요청 수")
+    parser.add_argument("--processes", type=int, default=1, help="워커 프로세스 수")
+    parser.add_argument("--network", default="10.64.0.0/16", help="피어 주소 대역")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        stub_dir = os.path.join(home, "bin")
+        os.makedirs(stub_dir)
+        write_stub(stub_dir, "wg", "exit 1")
+        write_stub(stub_dir, "sudo", "exit 1")
+        os.environ["HOME"] = home
+        os.environ["PATH"] = stub_dir + os.pathsep + os.environ.get("PATH", "")
+
+        work = (args.threads, args.creates, args.revokes, args.network)
+        if args.processes == 1:
+            runs = [hammer(*work)]
+        else:
+            context = multiprocessing.get_context("spawn")
+            queue = context.Queue()
+            children = [context.Process(target=_child, args=(work, queue)) for _ in range(args.processes)]
+            for child in children:
+                child.start()
+            runs = [queue.get() for _ in children]
+            for child in children:
+                child.join()
+
+        result = check(args.network)
+
+    summary = {
+        "benchmark": "stress_concurrency",
+        "threads": args.threads,
+        "processes": args.processes,
+        "creates": args.creates * args.processes,
+        "revokes": args.revokes * args.processes,
+        "elapsed_s": max(run["elapsed_s"] for run in runs),
+        "errors": [error for run in runs for error in run["errors"]],
+        "peers": result["peers"],
+        "problems": result["problems"]
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    sys.exit(1 if summary["errors"] or summary["problems"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# gunicorn 설정 (gunicorn -c gunicorn.conf.py wsgi:app)
+#
+# 피어 저장소(SQLite), 주소 풀, 설정 파일은 파일 잠금으로 워커 간 직렬화되므로
+# 여러 워커를 실행해도 IP 중복이나 설정 유실이 없습니다.
+# wg 상태 수집, 만료 스케줄러, 다른 워커가 제출한 작업 확인은 leader.lock을 잡은
+# 워커 하나만 실행하고, 나머지 워커는 리더가 기록한 상태 파일을 읽습니다.
+import os
+import multiprocessing
+
+bind = os.environ.get("WG_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WG_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# SSE(/api/events) 같은 장시간 연결이 워커를 독점하지 않도록 스레드 워커 사용
+worker_class = "gthread"
+threads = int(os.environ.get("WG_THREADS", 8))
+timeout = 60
+
+# SQLite 연결과 백그라운드 스레드가 fork 이전에 만들어지지 않도록 preload 사용 안 함
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
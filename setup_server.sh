@@ -74,7 +74,7 @@ Type=simple
 User=$USER
 WorkingDirectory=/opt/wireguard-manager
 Environment=PATH=/opt/wireguard-manager/venv/bin
-ExecStart=/opt/wireguard-manager/venv/bin/python application.py
+ExecStart=/opt/wireguard-manager/venv/bin/gunicorn -c gunicorn.conf.py wsgi:app
 Restart=always
 RestartSec=10
 
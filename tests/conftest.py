@@ -0,0 +1,97 @@
+"""
+테스트 공용 fixture
+
+각 테스트는 임시 HOME과 `wg`/`sudo`/`curl` 스텁이 앞에 있는 PATH에서 실행됩니다.
+스텁 `wg`는 받은 인자를 한 줄씩 기록하므로 실행된 명령어를 확인할 수 있습니다.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# WG_FAKE_FAIL_SET=1이면 `wg set`이 실패, `wg show all dump`는 인터페이스 줄만 출력
+WG_STUB = """
+echo "$@" >> "$WG_FAKE_LOG"
+if [ "$1" = "set" ] && [ "$WG_FAKE_FAIL_SET" = "1" ]; then
+  exit 1
+fi
+if [ "$1 $2 $3" = "show all dump" ]; then
+  printf 'wg0\\t(hidden)\\tSERVER_PUBLIC_KEY=\\t51820\\toff\\n'
+fi
+exit 0
+"""
+
+
+def write_stub(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n" + body + "\n")
+    os.chmod(path, 0o755)
+
+
+class FakeWg:
+    """스텁 wg 호출 기록"""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+
+    def calls(self):
+        """기록된 wg 호출 인자 목록 (호출마다 문자열 목록)"""
+        try:
+            with open(self.log_path, encoding='utf-8') as f:
+                return [line.split() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def commands(self, subcommand):
+        return [call for call in self.calls() if call and call[0] == subcommand]
+
+    def clear(self):
+        if os.path.exists(self.log_path):
+            os.unlink(self.log_path)
+
+
+@pytest.fixture
+def fake_wg(tmp_path, monkeypatch):
+    """임시 HOME과 스텁 명령어 환경"""
+    home = tmp_path / "home"
+    stub_dir = tmp_path / "bin"
+    home.mkdir()
+    stub_dir.mkdir()
+    write_stub(str(stub_dir), "wg", WG_STUB)
+    write_stub(str(stub_dir), "sudo", 'exec "$@"')
+    write_stub(str(stub_dir), "curl", "exit 7")
+
+    log_path = str(tmp_path / "wg.log")
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("PATH", str(stub_dir) + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("WG_FAKE_LOG", log_path)
+    monkeypatch.setenv("WG_ENDPOINT", "203.0.113.1")
+    monkeypatch.setenv("WG_KEYPOOL_SIZE", "0")
+    monkeypatch.delenv("WG_FAKE_FAIL_SET", raising=False)
+    for name in ("WG_SHARDS", "WG_INTERFACE", "WG_NETWORK", "WG_SYNC_MODE", "WG_PEER_STORE"):
+        monkeypatch.delenv(name, raising=False)
+    return FakeWg(log_path)
+
+
+@pytest.fixture
+def make_manager(fake_wg):
+    """WireGuardManager 생성 함수 (테스트가 끝나면 백그라운드 스레드와 저장소 정리)"""
+    from wireguard.manager import WireGuardManager
+
+    managers = []
+
+    def make(**kwargs):
+        manager = WireGuardManager(**kwargs)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.kernel_sync.flush()
+        manager.keypair_pool.stop()
+        manager.expiry_scheduler.stop()
+        manager.store.close()
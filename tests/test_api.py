@@ -0,0 +1,159 @@
+import gzip
+import os
+
+import pytest
+
+os.environ.setdefault("WG_EAGER_INIT", "0")
+
+import application  # noqa: E402
+from wireguard.jobs import JobQueue  # noqa: E402
+from wireguard.responses import BodyCache  # noqa: E402
+from wireguard.shards import ShardSet  # noqa: E402
+
+
+@pytest.fixture
+def client(make_manager, tmp_path, monkeypatch):
+    """초기화를 건너뛰고 임시 HOME의 매니저를 사용하는 테스트 클라이언트 (작업 대기열 없음)"""
+    manager = make_manager()
+    monkeypatch.setattr(application, "_services_initialized", True)
+    monkeypatch.setattr(application, "wg_manager", manager)
+    monkeypatch.setattr(application, "shards", ShardSet([manager]))
+    monkeypatch.setattr(application, "job_queue", None)
+    # 테스트마다 저장소 버전이 0부터 시작하므로 응답 캐시도 새로 사용
+    monkeypatch.setattr(application, "response_cache", BodyCache())
+    return application.app.test_client()
+
+
+@pytest.mark.parametrize("path", ["/api/generate_peer", "/api/generate_peers", "/api/peers/peer_1"])
+@pytest.mark.parametrize("body", ["[1, 2]", '"peer"', "{not json"])
+def test_non_object_json_body_is_rejected(client, path, body):
+    method = client.patch if path.startswith("/api/peers/") else client.post
+    response = method(path, data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"success": False, "message": "요청 본문은 JSON 객체여야 합니다."}
+
+
+def test_wrong_types_in_job_request_are_rejected(client, tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "jobs.db"), get_manager=application.shards.get)
+    monkeypatch.setattr(application, "job_queue", queue)
+    try:
+        response = client.post("/api/generate_peers", json={"count": 1, "routing_policy": ["full"]},
+                               headers={"Idempotency-Key": "retry-1"})
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+
+        response = client.post("/api/jobs", json={"kind": "create", "count": [1]})
+        assert response.status_code == 400
+
+        response = client.post("/api/jobs", data="[]", content_type="application/json")
+        assert response.status_code == 400
+    finally:
+        queue.close()
+
+
+def test_idempotency_key_without_job_queue_is_rejected(client):
+    response = client.post("/api/generate_peer", json={}, headers={"Idempotency-Key": "retry-1"})
+    assert response.status_code == 503
+    assert response.get_json()["success"] is False
+    assert application.wg_manager.get_peer_count() == 0
+
+    # 멱등성 키가 없으면 바로 생성
+    response = client.post("/api/generate_peer", json={})
+    assert response.status_code == 200
+    assert application.wg_manager.get_peer_count() == 1
+
+
+@pytest.mark.parametrize("query", ["ttl=1e20", "ttl=inf", "ttl=nan", "ttl=-1", "idle_timeout=1e400"])
+def test_out_of_range_expiry_is_rejected(client, query):
+    response = client.post(f"/api/generate_peer?{query}", json={})
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_huge_ttl_in_body_is_rejected(client):
+    response = client.post("/api/generate_peers", json={"count": 1, "ttl": 1e300})
+    assert response.status_code == 400
+    assert application.wg_manager.get_peer_count() == 0
+
+
+def test_peer_fields_projection_includes_extra_fields(client):
+    manager = application.wg_manager
+    name = manager.generate_new_peer(group="staff")["peer_info"]["name"]
+    manager.rotate_peers([name], grace=3600)
+
+    response = client.get("/api/peers?fields=name,group,expires_at,previous_key")
+    assert response.status_code == 200
+    peer = response.get_json()["peers"][0]
+    assert peer["name"] == name and peer["group"] == "staff" and peer["expires_at"] is None
+    assert set(peer["previous_key"]) == {"public_key", "grace_until"}
+
+    assert client.get("/api/peers?fields=name,bogus").status_code == 400
+
+
+def test_peers_are_paginated_with_cursor_and_prefix(client):
+    application.wg_manager.generate_new_peers(5)
+
+    response = client.get("/api/peers?limit=2&fields=name")
+    body = response.get_json()
+    assert [peer["name"] for peer in body["peers"]] == ["peer_1", "peer_2"]
+    assert body["total_count"] == 5
+
+    names = [peer["name"] for peer in body["peers"]]
+    while body["next_cursor"] is not None:
+        body = client.get(f"/api/peers?limit=2&fields=name&cursor={body['next_cursor']}").get_json()
+        names += [peer["name"] for peer in body["peers"]]
+    assert names == [f"peer_{i}" for i in range(1, 6)]
+
+    body = client.get("/api/peers?prefix=peer_5").get_json()
+    assert [peer["name"] for peer in body["peers"]] == ["peer_5"]
+    assert client.get("/api/peers?limit=0").status_code == 400
+
+
+def test_peers_etag_returns_304_until_peers_change(client):
+    application.wg_manager.generate_new_peer()
+    response = client.get("/api/peers")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = client.get("/api/peers", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # 다른 쿼리는 다른 ETag
+    assert client.get("/api/peers?limit=1").headers["ETag"] != etag
+
+    application.wg_manager.generate_new_peer()
+    response = client.get("/api/peers", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.get_json()["peers"]) == 2
+
+
+def test_metrics_endpoint_exposes_request_timings(client):
+    client.get("/api/peers")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert 'wg_http_request_duration_seconds_count{method="GET",route="/api/peers",status="200"}' \
+        in response.get_data(as_text=True)
+
+
+def test_peer_list_is_compressed_for_gzip_clients(client):
+    application.wg_manager.generate_new_peers(10)
+
+    plain = client.get("/api/peers")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    response = client.get("/api/peers", headers={"Accept-Encoding": "br;q=1.0, gzip;q=0.5"})
+    expected = "br" if application.available_encodings()[0] == "br" else "gzip"
+    assert response.headers["Content-Encoding"] == expected
+    if expected == "gzip":
+        assert gzip.decompress(response.data) == plain.data
+    # 압축 본문은 바이트가 다르므로 약한 ETag
+    assert response.headers["ETag"].startswith('W/')
+    assert client.get("/api/peers", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    # 지원하지 않는 인코딩만 받으면 압축하지 않음
+    response = client.get("/api/peers", headers={"Accept-Encoding": "zstd"})
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,106 @@
+"""동시 피어 생성/삭제/키 교체 후 저장소, 설정 파일, 레지스트리, 주소 풀 일관성 확인"""
+import random
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+NETWORK = "10.64.0.0/16"
+
+
+def hammer(creates, revokes, rotates, threads=16, seed=0):
+    """한 프로세스 안에서 스레드들로 생성/삭제/키 교체를 동시에 실행하고 (오류 목록, 남은 피어 수) 반환"""
+    from wireguard.manager import WireGuardManager
+
+    manager = WireGuardManager(network=NETWORK)
+    created = []
+    created_lock = threading.Lock()
+    errors = []
+    rng = random.Random(seed)
+
+    def pick(remove):
+        with created_lock:
+            if not created:
+                return None
+            index = rng.randrange(len(created))
+            return created.pop(index) if remove else created[index]
+
+    def create():
+        peer = manager.generate_new_peer()["peer_info"]
+        with created_lock:
+            created.append(peer["name"])
+
+    def revoke():
+        # 아직 만든 피어가 없으면 건너뜀
+        name = pick(remove=True)
+        if name:
+            manager.revoke_peer(name)
+
+    def rotate():
+        name = pick(remove=False)
+        if name:
+            manager.rotate_peers([name], missing_ok=True)
+
+    def run(task):
+        try:
+            task()
+        except Exception as e:
+            errors.append(f"{task.__name__}: {e}")
+
+    tasks = [create] * creates + [revoke] * revokes + [rotate] * rotates
+    rng.shuffle(tasks)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run, tasks))
+    manager.kernel_sync.flush()
+    manager.keypair_pool.stop()
+    manager.expiry_scheduler.stop()
+    manager.store.close()
+    return errors, len(created)
+
+
+def _child(args, queue):
+    queue.put(hammer(*args))
+
+
+def assert_consistent(make_manager, expected_peers):
+    """새 매니저로 다시 읽어 불변식 확인"""
+    manager = make_manager(network=NETWORK)
+    peers = manager.get_peers()
+    names = [peer["name"] for peer in peers]
+    keys = [peer["public_key"] for peer in peers]
+    ips = [peer["ip"] for peer in peers]
+
+    assert len(peers) == expected_peers
+    assert len(set(names)) == len(names), "중복된 피어 이름"
+    assert len(set(keys)) == len(keys), "중복된 공개키"
+    assert len(set(ips)) == len(ips), "중복된 IP"
+    assert set(manager.server_config.peer_public_keys()) == set(keys), "설정 파일 불일치"
+    assert {peer["public_key"] for peer in manager.store.load()} == set(keys), "저장소 불일치"
+    assert manager.address_pool.allocated_count == len(peers), "주소 풀 불일치"
+    drift, _actions = manager.reconcile()
+    assert not (drift.missing_in_config or drift.allowed_ips_mismatch or drift.config_only)
+
+
+def test_concurrent_threads_keep_store_config_and_registry_consistent(make_manager, fake_wg):
+    errors, remaining = hammer(creates=200, revokes=30, rotates=30)
+
+    assert errors == []
+    assert_consistent(make_manager, remaining)
+
+
+def test_concurrent_processes_keep_store_config_and_registry_consistent(make_manager, fake_wg):
+    # 워커 프로세스처럼 같은 HOME을 공유하는 매니저 두 개를 별도 프로세스에서 실행
+    make_manager(network=NETWORK)
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    children = [
+        context.Process(target=_child, args=((60, 10, 10, 8, seed), queue))
+        for seed in range(2)
+    ]
+    for child in children:
+        child.start()
+    results = [queue.get(timeout=120) for _ in children]
+    for child in children:
+        child.join(timeout=30)
+
+    assert [error for errors, _remaining in results for error in errors] == []
+    assert_consistent(make_manager, sum(remaining for _errors, remaining in results))
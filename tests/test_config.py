@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from wireguard.config import ServerConfig
+
+CONFIG = """# 관리용 주석
+[Interface]
+PrivateKey = SERVERPRIV
+Address = 10.0.0.1/24
+ListenPort = 51820
+
+[Peer]
+# peer_1
+PublicKey = PUB1
+AllowedIPs = 10.0.0.2/32
+
+[Peer]
+PublicKey = PUB2
+AllowedIPs = 10.0.0.3/32
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "wg0.conf"
+    path.write_text(CONFIG, encoding="utf-8")
+    return str(path)
+
+
+def test_parse_and_render_round_trip(config_path):
+    config = ServerConfig(config_path)
+    assert config.peer_public_keys() == ["PUB1", "PUB2"]
+    assert config.interface_value("ListenPort") == "51820"
+    assert config.interface_value("Missing") is None
+
+    # 변경 후 다시 기록해도 나머지 내용은 그대로 유지
+    config.add_peers([("PUB3", "[Peer]\nPublicKey = PUB3\nAllowedIPs = 10.0.0.4/32")])
+    config.remove_peers(["PUB3"])
+    with open(config_path, encoding="utf-8") as f:
+        assert f.read() == CONFIG
+
+
+def test_replace_peers_keeps_other_sections(config_path):
+    config = ServerConfig(config_path)
+    config.replace_peers(["PUB1"], [("NEW1", "[Peer]\nPublicKey = NEW1\nAllowedIPs = 10.0.0.2/32\n")])
+    reloaded = ServerConfig(config_path)
+    assert reloaded.peer_public_keys() == ["PUB2", "NEW1"]
+    assert reloaded.has_peer("NEW1") and not reloaded.has_peer("PUB1")
+    assert "# 관리용 주석" in reloaded.text()
+
+
+def test_external_edit_is_reloaded(config_path):
+    config = ServerConfig(config_path)
+    version = config.version
+    assert config.peer_count == 2
+
+    with open(config_path, "a", encoding="utf-8") as f:
+        f.write("\n[Peer]\nPublicKey = PUB4\nAllowedIPs = 10.0.0.5/32\n")
+    os.utime(config_path, ns=(0, 1))
+    assert config.peer_count == 3
+    assert config.version != version
+
+
+def test_server_public_key_is_derived_once(config_path):
+    calls = []
+
+    def derive(private_key):
+        calls.append(private_key)
+        return "SERVERPUB"
+
+    config = ServerConfig(config_path, derive_public_key=derive)
+    assert config.server_public_key == "SERVERPUB"
+    assert config.server_public_key == "SERVERPUB"
+    assert calls == ["SERVERPRIV"]
+
+    with pytest.raises(ValueError):
+        ServerConfig(config_path + ".missing", derive_public_key=derive).server_public_key
@@ -0,0 +1,58 @@
+import pytest
+
+from wireguard.endpoint import split_endpoint, format_endpoint
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("203.0.113.1", ("203.0.113.1", None)),
+    ("203.0.113.1:51821", ("203.0.113.1", 51821)),
+    ("vpn.example.com:443", ("vpn.example.com", 443)),
+    ("2001:db8::1", ("2001:db8::1", None)),
+    ("[2001:db8::1]:51821", ("2001:db8::1", 51821)),
+    ("[2001:db8::1]", ("2001:db8::1", None)),
+])
+def test_split_endpoint(value, expected):
+    assert split_endpoint(value) == expected
+
+
+@pytest.mark.parametrize("value", ["vpn.example.com:", "host:0", "host:70000", "[vpn.example.com]:51820",
+                                   "2001:db8::1:51820:x", "[2001:db8::1]51820", ":51820"])
+def test_split_endpoint_rejects_malformed_values(value):
+    with pytest.raises(ValueError):
+        split_endpoint(value)
+
+
+def test_format_endpoint_brackets_only_ipv6_literals():
+    assert format_endpoint("2001:db8::1", 51820) == "[2001:db8::1]:51820"
+    assert format_endpoint("203.0.113.1", 51820) == "203.0.113.1:51820"
+    assert format_endpoint("vpn.example.com", 51820) == "vpn.example.com:51820"
+
+
+@pytest.mark.parametrize("configured, endpoint", [
+    ("vpn.example.com:443", "vpn.example.com:443"),
+    ("2001:db8::1", "[2001:db8::1]:51820"),
+    ("[2001:db8::1]:4500", "[2001:db8::1]:4500"),
+])
+def test_client_config_endpoint(make_manager, configured, endpoint):
+    manager = make_manager(endpoint=configured)
+    config = manager.generate_new_peer()["client_config"]
+    assert f"Endpoint = {endpoint}\n" in config
+
+
+def test_env_endpoint_port_only_applies_to_default_interface(make_manager, monkeypatch):
+    monkeypatch.setenv("WG_ENDPOINT", "vpn.example.com:4500")
+    primary = make_manager()
+    secondary = make_manager(interface="wg1", network="10.0.1.0/24", listen_port=51821)
+    explicit = make_manager(interface="wg2", network="10.0.2.0/24", listen_port=51822,
+                            endpoint="vpn2.example.com:4502")
+
+    assert "Endpoint = vpn.example.com:4500\n" in primary.generate_new_peer()["client_config"]
+    assert "Endpoint = vpn.example.com:51821\n" in secondary.generate_new_peer()["client_config"]
+    assert "Endpoint = vpn2.example.com:4502\n" in explicit.generate_new_peer()["client_config"]
+
+
+def test_malformed_env_endpoint_does_not_stop_manager(make_manager, monkeypatch):
+    monkeypatch.setenv("WG_ENDPOINT", "vpn.example.com:notaport")
+    manager = make_manager()
+    assert manager.endpoint_resolver.source != "config"
+    assert manager.endpoint_resolver.port is None
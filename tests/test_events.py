@@ -0,0 +1,81 @@
+import json
+
+from wireguard.events import ChangeWatcher, EventBroker, StatusDeltaTracker
+
+
+def parse(message):
+    event, data = message.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_publish_fans_out_to_every_subscriber():
+    broker = EventBroker()
+    first, second = broker.subscribe(), broker.subscribe()
+    broker.publish("peer_added", {"name": "피어"})
+    for subscriber in (first, second):
+        assert parse(subscriber.get_nowait()) == ("peer_added", {"name": "피어"})
+
+    broker.unsubscribe(first)
+    broker.publish("peer_removed", {})
+    assert first.empty() and not second.empty()
+
+
+def test_slow_subscriber_is_disconnected():
+    broker = EventBroker(max_queue=2)
+    subscriber = broker.subscribe()
+    for i in range(3):
+        broker.publish("tick", {"i": i})
+    assert broker.subscriber_count == 0
+
+    # 남은 이벤트 대신 종료 표시를 받아 스트림이 바로 끝남 (EventSource가 재연결)
+    stream = broker.stream(subscriber, initial=[("hello", {})])
+    assert parse(next(stream)) == ("hello", {})
+    assert list(stream) == []
+
+
+def test_stream_sends_keepalive_and_unsubscribes_on_close():
+    broker = EventBroker(heartbeat=0.01)
+    stream = broker.stream(broker.subscribe())
+    assert next(stream) == ": keepalive\n\n"
+    stream.close()
+    assert broker.subscriber_count == 0
+
+
+def test_change_watcher_keeps_running_checks_after_failure():
+    calls = []
+
+    def failing():
+        raise RuntimeError("boom")
+
+    ChangeWatcher(EventBroker(), [failing, lambda: calls.append(1)]).check_once()
+    assert calls == [1]
+
+
+def status(peers, available=True):
+    return {"available": available, "collected_at": 1.0, "peers": [
+        {"public_key": key, "endpoint": None, "latest_handshake": handshake,
+         "rx_bytes": rx, "tx_bytes": 0, "persistent_keepalive": None}
+        for key, handshake, rx in peers
+    ]}
+
+
+def test_status_delta_tracker_publishes_only_changes():
+    broker = EventBroker()
+    subscriber = broker.subscribe()
+    tracker = StatusDeltaTracker(broker, resolve_name=lambda key: f"name-{key}")
+
+    tracker(status([("A", None, 0), ("B", None, 0)]))
+    _event, data = parse(subscriber.get_nowait())
+    assert data["full"] is False and {peer["name"] for peer in data["peers"]} == {"name-A", "name-B"}
+
+    # 변화가 없으면 발행하지 않음
+    tracker(status([("A", None, 0), ("B", None, 0)]))
+    assert subscriber.empty()
+
+    tracker(status([("A", 100, 64)]))
+    _event, data = parse(subscriber.get_nowait())
+    assert [peer["public_key"] for peer in data["peers"]] == ["A"]
+    assert data["removed"] == ["B"]
+
+    snapshot = tracker.snapshot()
+    assert snapshot["full"] is True and [peer["rx_bytes"] for peer in snapshot["peers"]] == [64]
@@ -0,0 +1,93 @@
+import time
+
+from wireguard.expiry import ExpiryScheduler, GraceDeadlines, format_time
+from wireguard.registry import PeerRecord
+
+NOW = 1_700_000_000.0
+
+
+def record(name, **extra):
+    return PeerRecord(name, None, f"pub-{name}", f"10.0.0.{len(name) + 1}", format_time(NOW - 3600), extra)
+
+
+class Harness:
+    def __init__(self, records, handshakes=None):
+        self.records = {r.name: r for r in records}
+        self.handshakes = handshakes
+        self.revoked = []
+        self.scheduler = ExpiryScheduler(self.revoke, self.records.get, lambda: self.handshakes)
+        self.scheduler.schedule(records)
+
+    def revoke(self, names):
+        self.revoked.append(list(names))
+        for name in names:
+            self.records.pop(name)
+
+
+def test_due_peers_are_revoked_in_one_batch():
+    harness = Harness([
+        record("a", expires_at=format_time(NOW - 10)),
+        record("b", expires_at=format_time(NOW - 5)),
+        record("c", expires_at=format_time(NOW + 600)),
+        record("d"),
+    ])
+    # 만료 정책이 없는 피어는 등록하지 않음
+    assert len(harness.scheduler) == 3
+
+    assert harness.scheduler.run_due(NOW) == ["a", "b"]
+    assert harness.revoked == [["a", "b"]]
+    assert len(harness.scheduler) == 1
+    assert harness.scheduler.run_due(NOW) == []
+
+
+def test_unschedule_and_reschedule():
+    target = record("a", expires_at=format_time(NOW - 10))
+    harness = Harness([target])
+    harness.scheduler.unschedule(["a"])
+    assert harness.scheduler.run_due(NOW) == []
+
+    harness.scheduler.reset([target])
+    assert harness.scheduler.run_due(NOW) == ["a"]
+
+
+def test_recent_handshake_pushes_idle_deadline():
+    peer = record("a", idle_timeout=600)
+    harness = Harness([peer], handshakes={"pub-a": NOW - 60})
+    # 생성 후 1시간이 지났지만 1분 전 핸드셰이크가 있었으므로 9분 뒤로 재등록
+    assert harness.scheduler.run_due(NOW) == []
+    assert harness.scheduler._deadlines["a"] == NOW - 60 + 600
+
+    harness.handshakes = {}
+    assert harness.scheduler.run_due(NOW + 600) == ["a"]
+
+
+def test_idle_check_is_retried_when_status_is_unknown():
+    harness = Harness([record("a", idle_timeout=60), record("b", idle_timeout=60, expires_at=format_time(NOW - 1))])
+    assert harness.scheduler.run_due(NOW) == ["b"]
+    assert harness.scheduler._deadlines["a"] == NOW + ExpiryScheduler.STATUS_RETRY
+
+    harness.handshakes = {}
+    assert harness.scheduler.run_due(NOW + ExpiryScheduler.STATUS_RETRY) == ["a"]
+
+
+def test_background_thread_revokes_when_deadline_arrives():
+    harness = Harness([])
+    harness.scheduler.start()
+    try:
+        harness.records["a"] = peer = record("a", expires_at=format_time(time.time() + 1))
+        harness.scheduler.schedule([peer])
+        deadline = time.monotonic() + 5
+        while not harness.revoked and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert harness.revoked == [["a"]]
+    finally:
+        harness.scheduler.stop()
+
+
+def test_grace_deadlines_pop_only_current_entries():
+    deadlines = GraceDeadlines()
+    deadlines.schedule([record("a", previous_key={"grace_until": format_time(NOW - 1)})])
+    deadlines.push("b", NOW + 10)
+    deadlines.push("b", NOW - 2)
+    assert sorted(deadlines.pop_due(NOW)) == ["a", "b"]
+    assert len(deadlines) == 0 and deadlines.pop_due(NOW + 20) == []
@@ -0,0 +1,39 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from wireguard.export import client_config_files, iter_ndjson, iter_zip, qr_available, render_qr
+
+
+def test_iter_zip_streams_one_chunk_per_file_and_is_readable():
+    files = [(f"peer_{i}.conf", f"[Interface]\nAddress = 10.0.0.{i}/24\n" * 50) for i in range(1, 4)]
+    chunks = list(iter_zip(files))
+    # 파일마다 한 청크 + 중앙 디렉토리
+    assert len(chunks) == len(files) + 1
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in files]
+        assert archive.read("peer_2.conf").decode() == files[1][1]
+
+
+def test_client_config_files_and_ndjson():
+    peer_configs = [{"peer_info": {"name": "피어_1"}, "client_config": "[Interface]\n"}]
+    assert list(client_config_files(peer_configs)) == [("피어_1.conf", "[Interface]\n")]
+
+    lines = list(iter_ndjson(peer_configs + [{"n": 2}]))
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    assert [json.loads(line) for line in lines] == peer_configs + [{"n": 2}]
+    assert "피어_1" in lines[0]
+
+
+@pytest.mark.skipif(not qr_available(), reason="qrcode 패키지 필요")
+def test_render_qr_formats_and_cache():
+    png = render_qr("[Interface]\nPrivateKey = x\n", "png")
+    assert png.startswith(b"\x89PNG")
+    assert render_qr("[Interface]\nPrivateKey = x\n", "png") is png
+    assert b"<svg" in render_qr("[Interface]\nPrivateKey = x\n", "svg")
+    with pytest.raises(ValueError):
+        render_qr("text", "gif")
@@ -0,0 +1,76 @@
+import os
+
+os.environ.setdefault("WG_EAGER_INIT", "0")
+
+import application  # noqa: E402
+from wireguard.health import HealthMonitor  # noqa: E402
+from wireguard.shards import ShardSet  # noqa: E402
+
+
+def failed(snapshot):
+    return sorted((check["name"], check["interface"]) for check in snapshot["checks"] if not check["ok"])
+
+
+def test_ready_when_all_critical_checks_pass(make_manager):
+    monitor = HealthMonitor(ShardSet([make_manager()]))
+    assert monitor.snapshot() is None
+
+    snapshot = monitor.check_now()
+    assert snapshot["ready"] and snapshot["status"] == "ready", failed(snapshot)
+    assert {check["name"] for check in snapshot["checks"]} == {"wg", "config", "store", "interface", "address_pool"}
+
+
+def test_missing_interface_is_not_ready_and_low_pool_is_degraded(make_manager):
+    primary = make_manager()
+    # 스텁 wg dump에는 wg0만 있으므로 wg1은 올라와 있지 않은 인터페이스
+    secondary = make_manager(interface="wg1", network="10.0.1.0/28", listen_port=51821)
+    monitor = HealthMonitor(ShardSet([primary, secondary]), min_free_addresses=20)
+
+    snapshot = monitor.check_now()
+    assert snapshot["status"] == "not_ready"
+    assert failed(snapshot) == [("address_pool", "wg1"), ("interface", "wg1")]
+
+    monitor = HealthMonitor(ShardSet([primary]), min_free_addresses=1000)
+    snapshot = monitor.check_now()
+    assert snapshot["ready"] and snapshot["status"] == "degraded"
+
+
+def test_missing_config_fails_config_check(make_manager):
+    manager = make_manager()
+    os.unlink(manager.get_config_file_path())
+    snapshot = HealthMonitor(ShardSet([manager])).check_now()
+    assert not snapshot["ready"]
+    assert ("config", "wg0") in failed(snapshot)
+
+
+def test_stale_snapshot_is_reported_not_ready(make_manager):
+    monitor = HealthMonitor(ShardSet([make_manager()]), interval=10)
+    monitor.check_now()
+    assert monitor.snapshot()["ready"]
+
+    monitor._snapshot["checked_monotonic"] -= 31
+    snapshot = monitor.snapshot()
+    assert snapshot["ready"] is False and snapshot["status"] == "stale"
+    assert "checked_monotonic" not in snapshot and snapshot["age_s"] >= 31
+
+
+def test_readiness_endpoint_returns_503_for_stale_snapshot(make_manager, monkeypatch):
+    manager = make_manager()
+    monitor = HealthMonitor(ShardSet([manager]), interval=10)
+    monkeypatch.setattr(application, "_services_initialized", True)
+    monkeypatch.setattr(application, "wg_manager", manager)
+    monkeypatch.setattr(application, "shards", ShardSet([manager]))
+    monkeypatch.setattr(application, "health_monitor", monitor)
+    client = application.app.test_client()
+
+    assert client.get("/api/ready").status_code == 503
+    monitor.check_now()
+    assert client.get("/api/ready").status_code == 200
+    assert client.get("/api/health").get_json()["ready"] is True
+
+    monitor._snapshot["checked_monotonic"] -= 31
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.get_json()["status"] == "stale"
+    assert client.get("/api/health").status_code == 503
+    assert client.get("/api/live").status_code == 200
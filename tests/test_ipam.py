@@ -0,0 +1,44 @@
+import json
+import os
+
+from wireguard.ipam import AddressPool
+
+
+def test_state_file_keeps_only_next_offset(make_manager):
+    manager = make_manager()
+    names = [peer["peer_info"]["name"] for peer in manager.generate_new_peers(4)]
+    path = manager.address_pool.state_path
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"network": "10.0.0.0/24", "next": 6}
+
+    # 반환만 하면 상태 파일을 다시 쓰지 않음
+    stamp = os.stat(path).st_mtime_ns
+    released_ip = manager.registry.get(names[1]).ip
+    manager.revoke_peer(names[1])
+    assert os.stat(path).st_mtime_ns == stamp
+
+    # 다시 로드하면 저장소 주소로 free-list를 재구성해 반환된 주소를 재사용
+    reloaded = make_manager()
+    assert reloaded.address_pool.allocated_count == 3
+    assert reloaded.generate_new_peer()["peer_info"]["ip"] == released_ip
+
+
+def test_other_worker_sees_released_addresses(make_manager):
+    writer = make_manager()
+    reader = make_manager()
+    names = [peer["peer_info"]["name"] for peer in writer.generate_new_peers(3)]
+    released_ip = writer.registry.get(names[0]).ip
+    writer.revoke_peer(names[0])
+
+    reader.refresh()
+    assert reader.address_pool.allocated_count == 2
+    assert reader.generate_new_peer()["peer_info"]["ip"] == released_ip
+
+
+def test_legacy_free_list_is_loaded_without_used_ips(tmp_path):
+    path = tmp_path / "address_pool.json"
+    path.write_text(json.dumps({"network": "10.0.0.0/24", "next": 5, "free": [3]}), encoding="utf-8")
+    pool = AddressPool("10.0.0.0/24", state_path=str(path))
+    assert pool.load()
+    assert pool.allocated_count == 2
+    assert pool.allocate() == "10.0.0.3"
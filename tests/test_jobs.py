@@ -0,0 +1,42 @@
+import subprocess
+
+from wireguard.jobs import JobQueue
+
+
+def test_orphaned_jobs_fail_when_leadership_is_gained(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), get_manager=lambda interface: None)
+    try:
+        queue.polling = False
+        job, _created = queue.submit("revoke", "wg0", {"names": ["peer_1"]})
+        # 종료된 프로세스가 실행 중이던 작업으로 표시
+        dead = subprocess.Popen(["true"])
+        dead.wait()
+        with queue._lock:
+            queue._conn.execute("UPDATE jobs SET status = 'running', owner = ? WHERE id = ?", (dead.pid, job["id"]))
+
+        queue.set_polling(True)
+
+        job = queue.get(job["id"])
+        assert job["status"] == "failed"
+        assert "종료" in job["error"]
+    finally:
+        queue.close()
+
+
+def test_create_batch_falls_back_to_single_jobs(make_manager, tmp_path):
+    # /29: 서버 주소를 빼면 피어 주소가 몇 개뿐이라 두 작업을 합치면 부족
+    manager = make_manager(network="10.9.0.0/29")
+    capacity = manager.address_pool.capacity - manager.address_pool.allocated_count
+    queue = JobQueue(str(tmp_path / "jobs.db"), get_manager=lambda interface: manager)
+    try:
+        first, _created = queue.submit("create", manager.interface, {"count": capacity - 1})
+        second, _created = queue.submit("create", manager.interface, {"count": 2})
+        assert queue.run_pending() == 2
+
+        first, second = queue.get(first["id"]), queue.get(second["id"])
+        assert first["status"] == "succeeded"
+        assert len(first["result"]["peers"]) == capacity - 1
+        assert second["status"] == "failed"
+        assert manager.get_peer_count() == capacity - 1
+    finally:
+        queue.close()
@@ -0,0 +1,63 @@
+import time
+import itertools
+
+from wireguard.keys import KeypairPool, derive_public_key, generate_keypairs
+
+
+def counting_generator():
+    counter = itertools.count()
+    return lambda: (f"private-{next(counter)}", f"public-{next(counter)}")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_pool_refills_below_low_water():
+    pool = KeypairPool(high_water=8, low_water=4, generate=counting_generator())
+    pool.start()
+    try:
+        assert wait_for(lambda: len(pool) == 8)
+        taken = pool.take(5)
+        assert len(taken) == 5
+        assert wait_for(lambda: len(pool) == 8)
+        # 풀보다 많이 꺼내면 부족분은 바로 생성
+        assert len(set(pool.take(20))) == 20
+    finally:
+        pool.stop()
+
+
+def test_pool_backs_off_when_generation_fails():
+    calls = []
+
+    def failing():
+        calls.append(time.monotonic())
+        raise RuntimeError("wg not found")
+
+    pool = KeypairPool(high_water=4, generate=failing)
+    pool.retry_delay = 0.1
+    pool.start()
+    try:
+        time.sleep(0.5)
+    finally:
+        pool.stop()
+    # 0.1, 0.2초 ... 간격으로만 다시 시도 (바쁜 반복이면 수천 번 호출됨)
+    assert 3 <= len(calls) <= 5
+    assert calls[2] - calls[1] >= calls[1] - calls[0] >= 0.09
+
+
+def test_disabled_pool_generates_on_demand():
+    pool = KeypairPool(high_water=0, generate=counting_generator())
+    pool.start()
+    assert len(pool.take(3)) == 3
+    assert len(pool) == 0
+
+
+def test_generated_public_keys_match_private_keys():
+    pairs = generate_keypairs(3, workers=1)
+    assert len({public_key for _private_key, public_key in pairs}) == 3
+    for private_key, public_key in pairs:
+        assert derive_public_key(private_key) == public_key
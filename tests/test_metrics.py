@@ -0,0 +1,46 @@
+from wireguard.metrics import MetricsRegistry, command_label
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "테스트 시간", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP test_seconds 테스트 시간", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="1"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 5.55',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.gauge("test_peers", "피어 수", lambda: [(('wg"0\n',), 3)], ("interface",))
+    assert 'test_peers{interface="wg\\"0\\n"} 3' in registry.render()
+
+
+def test_failing_callback_does_not_break_render():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("down")
+
+    registry.gauge("test_broken", "실패", broken)
+    registry.callback_counter("test_total", "합계", lambda: 7)
+    registry.gauge("test_skipped", "값 없음", lambda: None)
+    text = registry.render()
+    assert "# test_broken 수집 실패: down" in text
+    assert "# TYPE test_total counter\ntest_total 7\n" in text
+    assert "\ntest_skipped " not in text
+
+
+def test_command_label():
+    assert command_label(["sudo", "wg", "syncconf", "wg0", "/dev/stdin"]) == "wg syncconf"
+    assert command_label(["/usr/bin/wg-quick", "up", "wg0"]) == "wg-quick"
+    assert command_label(["sudo"]) == "unknown"
@@ -0,0 +1,67 @@
+import ipaddress
+
+import pytest
+
+from wireguard.policies import DEFAULT_DNS, RoutingPolicies, collapse_networks
+
+VPN = ipaddress.ip_network("10.0.0.0/24")
+
+
+def test_collapse_merges_overlapping_and_adjacent_ranges():
+    collapsed = collapse_networks([
+        "192.168.0.0/25", "192.168.0.128/25", "192.168.0.10/32",
+        "fd00::/65", "fd00:0:0:0:8000::/65", "10.1.2.3/16",
+    ])
+    assert [str(network) for network in collapsed] == ["10.1.0.0/16", "192.168.0.0/24", "fd00::/64"]
+    with pytest.raises(ValueError):
+        collapse_networks(["not-a-cidr"])
+
+
+@pytest.fixture
+def policies(tmp_path):
+    return RoutingPolicies(str(tmp_path / "routing_policies.json"))
+
+
+def test_split_policy_includes_vpn_network(policies):
+    stored = policies.put("office", "split", ["172.16.0.0/13", "172.24.0.0/13", "10.0.0.128/25"])
+    assert stored["networks"] == ["10.0.0.128/25", "172.16.0.0/12"]
+    assert stored["input_networks"] == 3
+
+    allowed_ips, dns = policies.resolve({"routing_policy": "office"}, VPN)
+    assert allowed_ips == "10.0.0.0/24, 172.16.0.0/12"
+    assert dns == ", ".join(DEFAULT_DNS)
+
+
+def test_peer_policy_overrides_group_and_falls_back_to_full(policies):
+    policies.put("office", "split", ["172.16.0.0/12"], dns=["10.0.0.1"])
+    policies.set_group("staff", "office")
+    assert policies.policy_name({"group": "staff"}) == "office"
+    assert policies.policy_name({"group": "staff", "routing_policy": "full"}) == "full"
+    assert policies.policy_name({"routing_policy": "deleted"}) == "full"
+    assert policies.resolve({"group": "guest"}, ipaddress.ip_network("fd00::/64"))[0] == "0.0.0.0/0, ::/0"
+
+    with pytest.raises(ValueError):
+        policies.delete("office")
+    policies.set_group("staff", None)
+    policies.delete("office")
+    assert policies.policy_name({"group": "staff"}) == "full"
+
+
+def test_invalid_policies_are_rejected(policies):
+    for args in (("full", "split", ["10.0.0.0/8"]), ("p", "bogus", []), ("p", "split", []),
+                 ("p", "split", ["10.0.0.0/33"])):
+        with pytest.raises(ValueError):
+            policies.put(*args)
+    with pytest.raises(ValueError):
+        policies.put("p", "full", dns=["dns.example"])
+    with pytest.raises(KeyError):
+        policies.set_group("staff", "missing")
+
+
+def test_changes_from_another_worker_are_picked_up(policies):
+    other = RoutingPolicies(policies.path)
+    assert policies.resolve({"routing_policy": "office"}, VPN)[0] == "0.0.0.0/0"
+
+    other.put("office", "split", ["192.168.0.0/24"])
+    assert policies.version == other.version
+    assert policies.resolve({"routing_policy": "office"}, VPN)[0] == "10.0.0.0/24, 192.168.0.0/24"
@@ -0,0 +1,79 @@
+from wireguard.reconcile import diff_peers, iter_config_peers, iter_dump_peers
+from wireguard.registry import PeerRecord
+
+CONFIG = """[Interface]
+PrivateKey = SERVERPRIV
+
+[Peer]
+# peer_1 - 2024-01-01 12:00:00
+PublicKey = PUB1
+AllowedIPs = 10.0.0.2/32
+
+[Peer]
+PublicKey = PUB2
+AllowedIPs = 10.0.0.9/32
+
+[Peer]
+PublicKey = FOREIGN
+AllowedIPs = 10.0.0.50/32, 192.168.0.0/24
+"""
+
+DUMP = (
+    "SERVERPRIV\tSERVERPUB\t51820\toff\n"
+    "PUB1\t(none)\t(none)\t10.0.0.2/32\t0\t0\t0\toff\n"
+    "ROGUE\t(none)\t(none)\t(none)\t0\t0\t0\toff\n"
+)
+
+
+def test_iter_config_peers_reads_keys_ips_and_comments():
+    peers = list(iter_config_peers(CONFIG.splitlines(keepends=True)))
+    assert [peer["public_key"] for peer in peers] == ["PUB1", "PUB2", "FOREIGN"]
+    assert peers[0]["name"] == "peer_1" and peers[0]["created_at"] == "2024-01-01 12:00:00"
+    assert peers[1]["name"] is None
+    assert peers[2]["allowed_ips"] == ["10.0.0.50/32", "192.168.0.0/24"]
+
+
+def test_iter_dump_peers_skips_interface_line():
+    assert list(iter_dump_peers(DUMP.splitlines(keepends=True))) == [("PUB1", ["10.0.0.2/32"]), ("ROGUE", [])]
+
+
+def test_diff_peers_reports_every_kind_of_drift():
+    records = [PeerRecord(f"peer_{i}", None, f"PUB{i}", f"10.0.0.{i + 1}", None) for i in (1, 2, 3)]
+    drift = diff_peers(records, iter_config_peers(CONFIG.splitlines()), iter_dump_peers(DUMP.splitlines()), 32)
+
+    report = drift.to_dict()
+    assert report["in_sync"] is False
+    assert (report["store_peers"], report["config_peers"], report["interface_peers"]) == (3, 3, 2)
+    assert report["missing_in_config"] == ["peer_3"]
+    assert report["missing_on_interface"] == ["peer_2", "peer_3"]
+    assert report["allowed_ips_mismatch"] == [{"name": "peer_2", "store": "10.0.0.3", "config": ["10.0.0.9/32"]}]
+    assert [peer["public_key"] for peer in report["config_only"]] == ["FOREIGN"]
+    assert report["interface_only"] == ["ROGUE"]
+    assert drift.to_dict(sample_limit=1)["missing_on_interface"] == ["peer_2"]
+
+
+def test_diff_without_interface_compares_store_and_config_only():
+    records = [PeerRecord("peer_1", None, "PUB1", "10.0.0.2", None)]
+    drift = diff_peers(records, [{"public_key": "PUB1", "allowed_ips": ["10.0.0.2/32"]}], None, 32)
+    assert drift.in_sync and drift.interface_count is None
+
+
+def test_repair_imports_config_only_peers(make_manager):
+    manager = make_manager()
+    manager.generate_new_peers(2)
+    with open(manager.config_file, "a", encoding="utf-8") as f:
+        f.write("\n[Peer]\n# imported_1 - 2024-01-01 12:00:00\nPublicKey = FOREIGN\nAllowedIPs = 10.0.0.50/32\n")
+
+    drift, actions = manager.reconcile()
+    assert actions is None
+    assert [peer["public_key"] for peer in drift.config_only] == ["FOREIGN"]
+
+    _drift, actions = manager.reconcile(repair=True)
+    assert actions["imported"] == 1
+    assert manager.get_peer_by_ip("10.0.0.50")["imported"] is True
+    # 가져온 주소는 주소 풀에서도 사용 중으로 처리
+    assert manager.address_pool.allocated_count == 3
+    assert manager.generate_new_peer()["peer_info"]["ip"] != "10.0.0.50"
+
+    drift, _actions = manager.reconcile()
+    assert not drift.config_only and not drift.missing_in_config
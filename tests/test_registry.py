@@ -0,0 +1,78 @@
+import pytest
+
+from wireguard.registry import PeerRecord, PeerRegistry
+
+
+def make_record(number, **extra):
+    return PeerRecord(f"peer_{number}", f"priv{number}", f"pub{number}", f"10.0.0.{number + 1}",
+                      "2024-01-01 00:00:00", extra)
+
+
+def test_indexes_find_records_by_name_public_key_and_ip():
+    registry = PeerRegistry(make_record(i) for i in range(1, 4))
+    record = registry.get("peer_2")
+    assert registry.get_by_public_key("pub2") is record
+    assert registry.get_by_ip("10.0.0.3") is record
+    assert len(registry) == 3 and "peer_2" in registry
+
+    registry.remove("peer_2")
+    assert registry.get("peer_2") is None
+    assert registry.get_by_public_key("pub2") is None
+    assert registry.get_by_ip("10.0.0.3") is None
+    with pytest.raises(KeyError):
+        registry.remove("peer_2")
+
+
+def test_duplicate_name_key_or_ip_is_rejected():
+    registry = PeerRegistry([make_record(1)])
+    version = registry.version
+    for record in (make_record(1),
+                   PeerRecord("other", None, "pub1", "10.0.0.9", None),
+                   PeerRecord("other", None, "pubX", "10.0.0.2", None)):
+        with pytest.raises(ValueError):
+            registry.add(record)
+    assert len(registry) == 1 and registry.version == version
+
+
+def test_page_skips_removed_records_across_compaction(monkeypatch):
+    monkeypatch.setattr(PeerRegistry, "COMPACT_THRESHOLD", 2)
+    registry = PeerRegistry(make_record(i) for i in range(1, 11))
+    for i in (2, 3, 4, 5, 6, 7):
+        registry.remove(f"peer_{i}")
+    # 삭제가 절반을 넘으면 순번 목록을 정리
+    assert len(registry._order) < 10
+
+    records, cursor = registry.page(limit=2)
+    assert [r.name for r in records] == ["peer_1", "peer_8"]
+    records, cursor = registry.page(after=cursor, limit=2)
+    assert [r.name for r in records] == ["peer_9", "peer_10"]
+    assert cursor is None
+
+    records, _ = registry.page(predicate=lambda r: r.name.endswith("0"))
+    assert [r.name for r in records] == ["peer_10"]
+
+
+def test_replace_keeps_order_and_cursor():
+    registry = PeerRegistry(make_record(i) for i in range(1, 4))
+    seq = registry.get("peer_2").seq
+    rotated = PeerRecord("peer_2", "newpriv", "newpub", "10.0.0.3", "2024-01-01 00:00:00")
+
+    old = registry.replace(rotated)
+    assert old.public_key == "pub2"
+    assert rotated.seq == seq
+    assert [r.name for r in registry.page()[0]] == ["peer_1", "peer_2", "peer_3"]
+    assert registry.get_by_public_key("newpub") is rotated
+    assert registry.get_by_public_key("pub2") is None
+
+    with pytest.raises(ValueError):
+        registry.replace(PeerRecord("peer_2", None, "pub1", "10.0.0.3", None))
+    with pytest.raises(KeyError):
+        registry.replace(PeerRecord("missing", None, "pubZ", "10.0.0.99", None))
+
+
+def test_view_hides_previous_private_key():
+    record = make_record(1, previous_key={"public_key": "old", "private_key": "secret",
+                                          "preshared_key": "psk", "grace_until": 123})
+    assert record.to_view()["previous_key"] == {"public_key": "old", "grace_until": 123}
+    assert record.to_dict()["previous_key"]["private_key"] == "secret"
+    assert record.to_view(["name", "group"]) == {"name": "peer_1", "group": None}
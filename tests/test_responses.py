@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import pytest
+
+from wireguard import responses
+from wireguard.responses import BodyCache, available_encodings, compress
+
+
+def test_gzip_round_trip_and_unknown_encoding():
+    data = b'{"peers": []}' * 200
+    assert gzip.decompress(compress(data, "gzip")) == data
+    with pytest.raises(ValueError):
+        compress(data, "deflate")
+
+
+@pytest.mark.skipif(responses.brotli is None, reason="brotli 패키지 필요")
+def test_brotli_is_preferred_when_installed():
+    assert available_encodings() == ("br", "gzip")
+    data = b"x" * 4096
+    assert responses.brotli.decompress(compress(data, "br")) == data
+
+
+def test_body_cache_reuses_bodies_and_compression():
+    cache = BodyCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b"a" * 2048, "application/json"
+
+    entry = cache.get(("peers", 1), build)
+    assert cache.get(("peers", 1), build) is entry
+    assert (cache.hits, cache.misses, len(builds)) == (1, 1, 1)
+
+    encoded = cache.encoded(entry, "gzip")
+    assert cache.encoded(entry, "gzip") is encoded
+    assert cache.size == 2048 + len(encoded)
+
+
+def test_body_cache_evicts_least_recently_used():
+    cache = BodyCache(max_bytes=250)
+    for key in ("a", "b"):
+        cache.get(key, lambda: (b"x" * 100, "application/json"))
+    cache.get("a", lambda: (b"", ""))
+    cache.get("c", lambda: (b"x" * 100, "application/json"))
+    assert len(cache) == 2 and cache.size == 200
+    # b가 가장 오래 사용되지 않았으므로 제거
+    rebuilt = []
+    cache.get("b", lambda: rebuilt.append(1) or (b"y", "application/json"))
+    assert rebuilt == [1]
+
+    # 상한보다 큰 본문은 캐시하지 않음
+    cache.get("huge", lambda: (b"z" * 1000, "application/json"))
+    assert "huge" not in cache._entries
+
+
+def test_json_provider_falls_back_for_values_orjson_rejects():
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.json = responses.FastJSONProvider(app)
+    value = {"big": 2 ** 70, "이름": "피어"}
+    assert json.loads(app.json.dumps_bytes(value)) == value
+    with app.app_context():
+        assert json.loads(app.json.response(value).get_data()) == value
@@ -0,0 +1,32 @@
+import time
+
+
+def test_previous_private_key_is_only_served_as_previous_config(make_manager):
+    manager = make_manager()
+    name = manager.generate_new_peer()["peer_info"]["name"]
+    old_private_key = manager.registry.get(name).private_key
+
+    manager.rotate_peers([name], grace=3600)
+
+    peer = manager.get_peer(name)
+    assert set(peer["previous_key"]) == {"public_key", "grace_until"}
+    listed, _cursor = manager.query_peers()
+    assert "private_key" not in listed[0]["previous_key"]
+    assert "private_key" not in manager.get_peer_by_ip(peer["ip"])["previous_key"]
+
+    config, _grace_until = manager.get_previous_client_config(name)
+    assert f"PrivateKey = {old_private_key}" in config
+
+
+def test_expired_previous_keys_are_dropped_on_next_rotation(make_manager):
+    manager = make_manager()
+    first, second = (peer["peer_info"]["name"] for peer in manager.generate_new_peers(2))
+
+    manager.rotate_peers([first], grace=1)
+    assert len(manager.grace_deadlines) == 1
+    time.sleep(1.1)
+
+    manager.rotate_peers([second])
+    assert len(manager.grace_deadlines) == 0
+    assert "previous_key" not in manager.get_peer(first)
+    assert all("previous_key" not in peer for peer in manager.store.load())
@@ -0,0 +1,63 @@
+import pytest
+
+from wireguard.shards import ShardSet
+
+
+def make_shards(make_manager, count=2, placement="least_loaded"):
+    managers = [make_manager()] + [
+        make_manager(interface=f"wg{i}", network=f"10.0.{i}.0/24", listen_port=51820 + i)
+        for i in range(1, count)
+    ]
+    return ShardSet(managers, placement=placement)
+
+
+def test_peer_events_report_total_across_shards(make_manager):
+    shards = make_shards(make_manager)
+    events = []
+    shards.add_listener(lambda event, data: events.append((event, data)))
+
+    shards.get("wg0").generate_new_peers(2)
+    shards.get("wg1").generate_new_peer()
+
+    event, data = events[-1]
+    assert event == "peer_added"
+    assert data["interface"] == "wg1"
+    assert data["interface_peers"] == 1
+    assert data["total_peers"] == 3
+
+
+def test_least_loaded_places_on_emptiest_shard_with_room(make_manager):
+    primary = make_manager()
+    small = make_manager(interface="wg1", network="10.0.1.0/29", listen_port=51821)
+    shards = ShardSet([primary, small])
+
+    primary.generate_new_peers(2)
+    assert shards.place() is small
+
+    # 사용률이 낮아도 요청 수만큼 여유가 없는 샤드는 제외 (/29는 피어 5개)
+    assert shards.place(count=6) is primary
+    small.generate_new_peers(5)
+    assert shards.place() is primary
+    with pytest.raises(ValueError):
+        shards.place(count=1000)
+
+
+def test_hash_placement_is_stable_per_key(make_manager):
+    shards = make_shards(make_manager, count=3, placement="hash")
+    placed = {key: shards.place(shard_key=key).interface for key in (f"user-{i}" for i in range(20))}
+    assert len(set(placed.values())) > 1
+    assert all(shards.place(shard_key=key).interface == interface for key, interface in placed.items())
+
+    # 키가 없으면 least_loaded
+    shards.get("wg0").generate_new_peer()
+    assert shards.place().interface != "wg0"
+
+
+def test_invalid_shard_sets_are_rejected(make_manager):
+    manager = make_manager()
+    with pytest.raises(ValueError):
+        ShardSet([manager], placement="random")
+    with pytest.raises(ValueError):
+        ShardSet([manager, manager])
+    with pytest.raises(ValueError):
+        ShardSet([])
@@ -0,0 +1,56 @@
+import time
+
+from wireguard.stats import TrafficSampler, TrafficSeries
+
+
+def test_ring_buffer_keeps_newest_samples_in_order():
+    series = TrafficSeries(3)
+    for i in range(1, 6):
+        series.append(float(i), i * 100, i * 10)
+
+    assert len(series) == 3
+    assert [sample["timestamp"] for sample in series.samples()] == [3.0, 4.0, 5.0]
+    assert all(sample["rx_bytes"] == 100 and sample["tx_bytes"] == 10 for sample in series.samples())
+    assert series.totals(since=4.0) == (200, 20)
+
+
+def test_counter_reset_records_current_value():
+    series = TrafficSeries(4, last_rx=1000, last_tx=1000)
+    series.append(1.0, 50, 1200)
+    assert series.samples() == [{"timestamp": 1.0, "rx_bytes": 50, "tx_bytes": 200}]
+
+
+class FakeCollector:
+    def __init__(self):
+        self.status = None
+
+    def set(self, peers):
+        self.status = {"available": True, "collected_at": time.time(),
+                       "peers": [{"public_key": key, "rx_bytes": rx, "tx_bytes": tx} for key, rx, tx in peers]}
+        time.sleep(0.001)
+
+    def collect(self):
+        return self.status
+
+
+def test_sampler_builds_series_and_top_talkers():
+    collector = FakeCollector()
+    sampler = TrafficSampler(collector, capacity=4)
+
+    collector.set([("A", 0, 0), ("B", 0, 0)])
+    sampler.sample_once()
+    # 첫 샘플은 기준값
+    assert sampler.get_series("A") == []
+
+    collector.set([("A", 500, 0), ("B", 10, 10)])
+    sampler.sample_once()
+    # 같은 수집 결과는 다시 반영하지 않음
+    sampler.sample_once()
+    assert len(sampler.get_series("A")) == 1
+    assert [item[0] for item in sampler.top_talkers(count=1)] == ["A"]
+
+    # 인터페이스에서 사라진 피어는 정리
+    collector.set([("A", 600, 0)])
+    sampler.sample_once()
+    assert sampler.get_series("B") is None
+    assert sampler.get_series("missing") is None
@@ -0,0 +1,70 @@
+import subprocess
+import threading
+import time
+
+from wireguard.status import StatusCollector, parse_dump
+
+DUMP = (
+    "wg0\tPRIVATE\tSERVERPUB=\t51820\toff\n"
+    "wg0\tPEER1=\t(none)\t198.51.100.7:40000\t10.0.0.2/32\t1700000000\t1024\t2048\t25\n"
+    "wg0\tPEER2=\tPSK=\t(none)\t(none)\t0\t0\t0\toff\n"
+    "wg1\tPRIVATE\tSERVERPUB1=\t51821\t0x10\n"
+)
+
+
+def test_parse_dump_builds_interfaces_and_peers_without_secrets():
+    status = parse_dump(DUMP + "garbage line\n")
+    assert status["interfaces"] == [
+        {"name": "wg0", "public_key": "SERVERPUB=", "listen_port": 51820, "fwmark": None, "peer_count": 2},
+        {"name": "wg1", "public_key": "SERVERPUB1=", "listen_port": 51821, "fwmark": "0x10", "peer_count": 0},
+    ]
+    first, second = status["peers"]
+    assert first == {
+        "interface": "wg0", "public_key": "PEER1=", "endpoint": "198.51.100.7:40000",
+        "allowed_ips": ["10.0.0.2/32"], "latest_handshake": 1700000000,
+        "rx_bytes": 1024, "tx_bytes": 2048, "persistent_keepalive": 25
+    }
+    assert second["endpoint"] is None and second["allowed_ips"] == []
+    assert second["latest_handshake"] is None and second["persistent_keepalive"] is None
+    assert "PRIVATE" not in repr(status) and "PSK=" not in repr(status)
+
+
+def counting_runner(calls, delay=0.0):
+    def run(command, timeout=10):
+        calls.append(command)
+        time.sleep(delay)
+        return subprocess.CompletedProcess(command, 0, stdout=DUMP, stderr="")
+    return run
+
+
+def test_collector_caches_within_ttl_and_invalidates():
+    calls = []
+    collector = StatusCollector(counting_runner(calls), ttl=60)
+    first = collector.collect()
+    assert first["available"] and "peer: PEER1=" in first["text"]
+    assert collector.collect() is first
+    assert len(calls) == 1 and collector.hit_ratio == 0.5
+
+    collector.invalidate()
+    collector.collect()
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_dump():
+    calls = []
+    collector = StatusCollector(counting_runner(calls, delay=0.2), ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(collector.collect())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_dump_is_reported_unavailable():
+    def run(command, timeout=10):
+        return subprocess.CompletedProcess(command, 1, stdout="", stderr="no permission")
+    status = StatusCollector(run, ttl=0).collect()
+    assert status["available"] is False and status["peers"] == []
@@ -0,0 +1,57 @@
+from wireguard.sync import KernelSync
+
+
+def test_incremental_changes_in_debounce_window_become_one_wg_set(make_manager, fake_wg):
+    manager = make_manager(sync_mode="incremental")
+    manager.kernel_sync.debounce = 60
+    fake_wg.clear()
+
+    peers = [manager.generate_new_peer()["peer_info"] for _ in range(3)]
+    manager.revoke_peer(peers[0]["name"])
+    assert fake_wg.commands("set") == []
+
+    manager.kernel_sync.flush()
+
+    calls = fake_wg.commands("set")
+    assert len(calls) == 1
+    command = " ".join(calls[0])
+    for peer in peers[1:]:
+        assert f"peer {peer['public_key']} allowed-ips {peer['ip']}/32" in command
+    assert f"peer {peers[0]['public_key']} remove" in command
+    assert fake_wg.commands("syncconf") == []
+
+
+def test_failed_wg_set_falls_back_to_syncconf(make_manager, fake_wg, monkeypatch):
+    manager = make_manager(sync_mode="incremental")
+    manager.kernel_sync.debounce = 60
+    monkeypatch.setenv("WG_FAKE_FAIL_SET", "1")
+    fake_wg.clear()
+
+    manager.generate_new_peer()
+    manager.kernel_sync.flush()
+
+    assert len(fake_wg.commands("set")) == 1
+    assert fake_wg.commands("syncconf") == [["syncconf", manager.interface, manager.config_file]]
+
+
+def test_syncconf_mode_syncs_every_change(make_manager, fake_wg):
+    manager = make_manager()
+    fake_wg.clear()
+
+    manager.generate_new_peers(2)
+    manager.revoke_peer("peer_1")
+
+    assert fake_wg.commands("set") == []
+    assert len(fake_wg.commands("syncconf")) == 2
+
+
+def test_full_apply_drops_pending_changes_for_same_peers():
+    full_syncs = []
+    sync = KernelSync(lambda command, timeout=10: None, lambda: full_syncs.append(1),
+                      mode="incremental", debounce=60)
+    sync.apply(added=[("KEY_A=", "10.0.0.2/32"), ("KEY_B=", "10.0.0.3/32")])
+    sync.apply(added=[("KEY_A=", "10.0.0.2/32")], full=True)
+
+    assert full_syncs == [1]
+    assert list(sync._pending) == ["KEY_B="]
+    sync._timer.cancel()
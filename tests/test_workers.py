@@ -0,0 +1,91 @@
+import os
+import subprocess
+
+from wireguard.jobs import JobQueue
+from wireguard.leader import LeaderElection
+from wireguard.status import StatusCollector
+
+
+def test_refresh_notifies_changes_made_by_another_worker(make_manager):
+    writer = make_manager()
+    reader = make_manager()
+    events = []
+    reader.add_listener(lambda event, data: events.append((event, [peer["name"] for peer in data["peers"]])))
+
+    created = [peer["peer_info"]["name"] for peer in writer.generate_new_peers(2)]
+    reader.refresh()
+    assert events == [("peer_added", created)]
+
+    events.clear()
+    writer.revoke_peer(created[0])
+    writer.rotate_peers([created[1]])
+    reader.refresh()
+    assert events == [("peer_removed", [created[0]]), ("peer_rotated", [created[1]])]
+
+    # 자기 프로세스의 변경은 refresh에서 다시 알리지 않음
+    events.clear()
+    reader.generate_new_peer()
+    events.clear()
+    reader.refresh()
+    assert events == []
+
+
+def test_only_one_worker_is_elected_leader(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    elected = []
+    first = LeaderElection(path, on_elected=lambda: elected.append("first"), retry_interval=60)
+    second = LeaderElection(path, on_elected=lambda: elected.append("second"), retry_interval=60)
+    first.start()
+    second.start()
+    try:
+        assert first.is_leader
+        assert not second.is_leader
+        assert elected == ["first"]
+    finally:
+        second.stop()
+
+
+def test_followers_read_the_leader_status_snapshot(tmp_path):
+    dump = "wg0\tprivate\tpublic\t51820\toff\n"
+    calls = {"leader": 0, "follower": 0}
+
+    def runner(role):
+        def run(command, timeout=10):
+            calls[role] += 1
+            return subprocess.CompletedProcess(command, 0, stdout=dump, stderr="")
+        return run
+
+    path = str(tmp_path / "status_snapshot.json")
+    leader = StatusCollector(runner("leader"), ttl=0, shared_path=path)
+    follower = StatusCollector(runner("follower"), ttl=0, shared_path=path)
+    follower.leader = False
+
+    # 리더가 아직 기록하지 않았으면 직접 실행
+    assert follower.collect()["available"]
+    assert calls["follower"] == 1
+
+    snapshot = leader.collect()
+    assert os.path.exists(path)
+    assert follower.collect()["collected_at"] == snapshot["collected_at"]
+    assert calls == {"leader": 1, "follower": 1}
+
+    # 공유 결과가 오래되면 다시 직접 실행
+    follower.shared_max_age = -1
+    follower.collect()
+    assert calls["follower"] == 2
+
+
+def test_finished_jobs_are_listed_after_cursor(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), get_manager=lambda interface: None)
+    try:
+        first, _created = queue.submit("revoke", "wg0", {"names": ["peer_1"]})
+        second, _created = queue.submit("revoke", "wg0", {"names": ["peer_2"]})
+        while queue.run_pending():
+            pass
+
+        jobs, cursor = queue.finished_after((0.0, ""))
+        assert sorted(job["id"] for job in jobs) == sorted((first["id"], second["id"]))
+        assert all(job["status"] == "failed" for job in jobs)
+        assert queue.finished_after(cursor) == ([], cursor)
+    finally:
+        queue.close()
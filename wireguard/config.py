@@ -0,0 +1,227 @@
+import os
+import logging
+import tempfile
+import threading
+from .metrics import FILE_WRITE_SECONDS
+
+
+class ServerConfig:
+    """
+    메모리에 파싱해 둔 서버 설정 파일 (wg0.conf) 모델
+
+    파일은 한 번만 읽고 mtime/inode/크기가 바뀐 경우에만 다시 파싱합니다.
+    쓰기는 모델을 갱신한 뒤 임시 파일 + rename으로 원자적으로 기록합니다.
+
+    - header: 첫 번째 [Peer] 앞의 내용 ([Interface] 섹션과 주석)
+    - peers: 공개키 -> [Peer] 섹션 텍스트 (파일 순서 유지)
+    """
+
+    def __init__(self, path, derive_public_key=None):
+        """
+        Args:
+            path: 설정 파일 경로
+            derive_public_key: 개인키로 공개키를 계산하는 함수
+        """
+        self.path = path
+        self._derive_public_key = derive_public_key
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._header = ""
+        self._interface = {}
+        self._peers = {}
+        self._text = None
+        self._server_public_key = None
+
+    @staticmethod
+    def _file_stamp(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _ensure_fresh(self):
+        stamp = self._file_stamp(self.path)
+        if stamp != self._stamp:
+            self._load(stamp)
+
+    def _load(self, stamp):
+        if stamp is None:
+            content = ""
+        else:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        self._parse(content)
+        self._stamp = stamp
+        self._text = content
+
+    def _parse(self, content):
+        header = []
+        blocks = []
+        current = None
+        for line in content.splitlines(keepends=True):
+            if line.startswith('['):
+                if line.strip() == '[Peer]':
+                    current = [line]
+                    blocks.append(current)
+                    continue
+                current = None
+            if current is None:
+                header.append(line)
+            else:
+                current.append(line)
+
+        # 피어 섹션 앞의 구분용 빈 줄 하나는 렌더링 시 다시 추가
+        if blocks and header and not header[-1].strip():
+            header.pop()
+        self._header = "".join(header)
+        self._interface = self._parse_section(header, '[Interface]')
+
+        self._peers = {}
+        for index, block in enumerate(blocks):
+            while len(block) > 1 and not block[-1].strip():
+                block.pop()
+            text = "".join(block)
+            if not text.endswith('\n'):
+                text += '\n'
+            public_key = self._parse_section(block, '[Peer]').get('PublicKey') or f"__unknown_{index}"
+            self._peers[public_key] = text
+        self._server_public_key = None
+
+    @staticmethod
+    def _parse_section(lines, name):
+        values = {}
+        in_section = False
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('['):
+                in_section = stripped == name
+                continue
+            if in_section and '=' in stripped and not stripped.startswith('#'):
+                key, value = stripped.split('=', 1)
+                values[key.strip()] = value.strip()
+        return values
+
+    def _render(self):
+        parts = [self._header]
+        for text in self._peers.values():
+            parts.append("\n")
+            parts.append(text)
+        return "".join(parts)
+
+    def _write(self):
+        with FILE_WRITE_SECONDS.time("config"):
+            text = self._render()
+            directory = os.path.dirname(self.path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".wg-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        self._stamp = self._file_stamp(self.path)
+        self._text = text
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def initialize(self, content):
+        """새 설정 파일 생성 (기존 내용 대체)"""
+        with self._lock:
+            self._parse(content)
+            self._write()
+
+    @property
+    def version(self):
+        """설정 파일 버전 ((mtime, inode, 크기), 파일이 없으면 None)"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._stamp
+
+    def text(self):
+        """설정 파일 전체 내용"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._text
+
+    def interface_value(self, key):
+        """[Interface] 섹션 값 (없으면 None)"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._interface.get(key)
+
+    def peer_public_keys(self):
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._peers)
+
+    def has_peer(self, public_key):
+        with self._lock:
+            self._ensure_fresh()
+            return public_key in self._peers
+
+    @property
+    def peer_count(self):
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._peers)
+
+    @property
+    def server_public_key(self):
+        """서버 공개키 (개인키가 바뀌기 전까지 한 번만 계산)"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._server_public_key is None:
+                private_key = self._interface.get('PrivateKey')
+                if not private_key:
+                    raise ValueError("서버 개인키를 찾을 수 없습니다.")
+                self._server_public_key = self._derive_public_key(private_key)
+            return self._server_public_key
+
+    def add_peers(self, sections):
+        """
+        [Peer] 섹션 추가 후 파일 기록
+
+        Args:
+            sections: (공개키, 섹션 텍스트) 목록
+        """
+        with self._lock:
+            self._ensure_fresh()
+            for public_key, text in sections:
+                self._peers[public_key] = text if text.endswith('\n') else text + '\n'
+            self._write()
+
+    def replace_peers(self, public_keys, sections):
+        """
+        [Peer] 섹션 제거와 추가를 한 번의 파일 기록으로 수행 (키 교체 등)
+
+        Args:
+            public_keys: 제거할 공개키 목록
+            sections: 추가할 (공개키, 섹션 텍스트) 목록
+        """
+        with self._lock:
+            self._ensure_fresh()
+            for public_key in public_keys:
+                self._peers.pop(public_key, None)
+            for public_key, text in sections:
+                self._peers[public_key] = text if text.endswith('\n') else text + '\n'
+            self._write()
+
+    def remove_peers(self, public_keys):
+        """공개키에 해당하는 [Peer] 섹션 제거 후 파일 기록 (제거된 수 반환)"""
+        with self._lock:
+            self._ensure_fresh()
+            removed = 0
+            for public_key in public_keys:
+                if self._peers.pop(public_key, None) is not None:
+                    removed += 1
+            if removed:
+                self._write()
+            else:
+                logging.warning("설정 파일에서 제거할 피어를 찾지 못했습니다.")
+            return removed
@@ -0,0 +1,187 @@
+import os
+import json
+import logging
+import ipaddress
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def is_valid_ip(ip):
+    """IP 주소 형식 검증 (IPv4/IPv6)"""
+    try:
+        ipaddress.ip_address(ip)
+        return True
+    except ValueError:
+        return False
+
+
+def split_endpoint(value):
+    """
+    엔드포인트 설정값을 (호스트, 포트)로 분리 (포트가 없으면 None)
+
+    `203.0.113.1`, `vpn.example.com:51821`, `2001:db8::1`, `[2001:db8::1]:51821` 형식을 받습니다.
+
+    Raises:
+        ValueError: 형식이나 포트가 올바르지 않을 때
+    """
+    value = value.strip()
+    port = None
+    if value.startswith('['):
+        host, bracket, rest = value[1:].partition(']')
+        if not bracket or (rest and not rest.startswith(':')):
+            raise ValueError(f"엔드포인트 형식이 올바르지 않습니다: {value}")
+        port = rest[1:] if rest else None
+        if not is_valid_ip(host) or ipaddress.ip_address(host).version != 6:
+            raise ValueError(f"대괄호 안에는 IPv6 주소만 쓸 수 있습니다: {value}")
+    elif value.count(':') > 1:
+        # 포트 없는 IPv6 주소 (포트를 붙이려면 대괄호 필요)
+        if not is_valid_ip(value):
+            raise ValueError(f"엔드포인트 형식이 올바르지 않습니다 (IPv6 주소에 포트를 붙이려면 [주소]:포트): {value}")
+        host = value
+    else:
+        host, colon, port = value.partition(':')
+        port = port if colon else None
+    if not host:
+        raise ValueError(f"엔드포인트 호스트가 비어 있습니다: {value}")
+    if port is not None:
+        if not port.isdigit() or not 1 <= int(port) <= 65535:
+            raise ValueError(f"엔드포인트 포트가 올바르지 않습니다: {value}")
+        port = int(port)
+    return host, port
+
+
+def format_endpoint(host, port):
+    """클라이언트 설정의 Endpoint 값 (IPv6 주소만 대괄호로 감쌈)"""
+    if is_valid_ip(host) and ipaddress.ip_address(host).version == 6:
+        host = f"[{host}]"
+    return f"{host}:{port}"
+
+
+class EndpointResolver:
+    """
+    클라이언트 설정에 들어갈 서버 엔드포인트(공인 IP) 결정
+
+    우선순위: 설정값(WG_ENDPOINT) > 디스크 캐시 > 백그라운드 조회.
+    설정값에 포트가 있으면(`host:port`, `[IPv6]:port`) 클라이언트 설정에 인터페이스 포트 대신 사용합니다.
+    백그라운드 조회는 모든 방법을 동시에 실행하고 가장 먼저 성공한 결과를 사용하며,
+    결과는 재시작 후에도 쓰이도록 디스크에 저장합니다.
+    """
+
+    PROBES = [
+        # AWS EC2 메타데이터
+        ["curl", "-s", "--max-time", "3", "http://169.254.169.254/latest/meta-data/public-ipv4"],
+        # 외부 서비스들
+        ["curl", "-s", "--max-time", "3", "ifconfig.me"],
+        ["curl", "-s", "--max-time", "3", "ipecho.net/plain"],
+        ["curl", "-s", "--max-time", "3", "icanhazip.com"]
+    ]
+
+    def __init__(self, run_command, cache_path, configured=None, use_port=True):
+        """
+        Args:
+            run_command: 명령어 실행 함수 (WireGuardManager._run_command)
+            cache_path: 조회 결과를 저장할 파일 경로
+            configured: 설정된 엔드포인트 (있으면 조회하지 않음, 형식이 잘못되면 무시하고 캐시/조회 사용)
+            use_port: 설정값의 포트 사용 여부 (False면 호스트만 사용)
+        """
+        self._run_command = run_command
+        self.cache_path = cache_path
+        # 설정값에 포함된 포트 (없으면 None)
+        self.port = None
+        if configured:
+            try:
+                configured, port = split_endpoint(configured)
+                self.port = port if use_port else None
+            except ValueError as e:
+                logging.error(f"엔드포인트 설정 무시 (캐시 또는 조회 사용): {str(e)}")
+                configured = None
+        self._value = configured or None
+        self._source = "config" if configured else None
+        self._ready = threading.Event()
+        self._started = False
+        self._lock = threading.Lock()
+
+    @property
+    def source(self):
+        """엔드포인트 출처 (config, cache, probe 또는 None)"""
+        return self._source
+
+    def start(self):
+        """엔드포인트 결정 시작 (조회가 필요하면 백그라운드 스레드에서 실행)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        if self._value:
+            self._ready.set()
+            return
+
+        cached = self._load_cache()
+        if cached:
+            self._value = cached
+            self._source = "cache"
+            self._ready.set()
+
+        # 캐시가 있어도 백그라운드에서 갱신 (IP 변경 대비)
+        threading.Thread(target=self._probe, name="endpoint-probe", daemon=True).start()
+
+    def get(self, timeout=0.0):
+        """
+        엔드포인트 반환
+
+        Args:
+            timeout: 아직 결정되지 않았을 때 기다릴 최대 시간(초)
+        """
+        if not self._ready.is_set() and timeout > 0:
+            self._ready.wait(timeout)
+        return self._value
+
+    def _probe(self):
+        ip = None
+        executor = ThreadPoolExecutor(max_workers=len(self.PROBES))
+        try:
+            futures = [executor.submit(self._run_command, probe, timeout=5) for probe in self.PROBES]
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception:
+                    continue
+                if result and result.returncode == 0 and is_valid_ip(result.stdout.strip()):
+                    ip = result.stdout.strip()
+                    break
+        finally:
+            # 나머지 조회는 기다리지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if ip:
+            if ip != self._value:
+                logging.info(f"서버 공인 IP: {ip}")
+                self._save_cache(ip)
+            self._value = ip
+            self._source = "probe"
+        elif not self._value:
+            logging.warning("서버 공인 IP를 가져올 수 없습니다. 기본값 사용")
+        self._ready.set()
+
+    def _load_cache(self):
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    value = json.load(f).get("endpoint")
+                if value and is_valid_ip(value):
+                    return value
+        except Exception as e:
+            logging.warning(f"엔드포인트 캐시 로드 실패: {str(e)}")
+        return None
+
+    def _save_cache(self, value):
+        try:
+            directory = os.path.dirname(self.cache_path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".endpoint-", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"endpoint": value}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logging.warning(f"엔드포인트 캐시 저장 실패: {str(e)}")
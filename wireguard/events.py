@@ -0,0 +1,193 @@
+import json
+import queue
+import logging
+import threading
+
+
+class EventBroker:
+    """
+    Server-Sent Events 브로커
+
+    하나의 생산자(매니저, 트래픽 샘플러)가 발행한 이벤트를 모든 구독자에게 전달합니다.
+    """
+
+    def __init__(self, max_queue=100, heartbeat=15.0):
+        """
+        Args:
+            max_queue: 구독자별 대기 이벤트 수 상한 (넘치면 해당 구독자 연결 종료)
+            heartbeat: 이벤트가 없을 때 keepalive 주석을 보내는 간격(초)
+        """
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """모든 구독자에게 이벤트 전달 (직렬화는 한 번만 수행)"""
+        message = self.format(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # 느린 구독자는 연결 종료 (EventSource가 자동 재연결)
+                logging.warning("이벤트 대기열이 가득 찬 구독자 연결 종료")
+                self.unsubscribe(subscriber)
+                # 대기열이 가득 차 있으므로 남은 이벤트를 버리고 종료 표시 전달 (재연결 시 전체 상태를 다시 받음)
+                try:
+                    while True:
+                        subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                subscriber.put_nowait(None)
+
+    @staticmethod
+    def format(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def stream(self, subscriber, initial=()):
+        """
+        구독자 대기열을 SSE 텍스트로 스트리밍
+
+        Args:
+            subscriber: subscribe()가 반환한 대기열
+            initial: 연결 직후 보낼 (이벤트, 데이터) 목록
+        """
+        try:
+            for event, data in initial:
+                yield self.format(event, data)
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+
+class ChangeWatcher:
+    """
+    다른 워커 프로세스의 변경 사항을 주기적으로 확인해 이 프로세스의 구독자에게 전달
+
+    이벤트는 변경을 처리한 프로세스에서만 발행되므로, 각 워커는 구독자가 있는 동안만
+    interval초마다 확인 함수(저장소 버전 비교, 끝난 작업 조회 등)를 실행합니다.
+    """
+
+    def __init__(self, broker, checks, interval=1.0):
+        """
+        Args:
+            broker: EventBroker 인스턴스
+            checks: 확인 함수 목록 (변경이 있으면 직접 broker에 발행)
+            interval: 확인 간격(초)
+        """
+        self.broker = broker
+        self.checks = list(checks)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.broker.subscriber_count:
+                continue
+            self.check_once()
+
+    def check_once(self):
+        for check in self.checks:
+            try:
+                check()
+            except Exception as e:
+                logging.warning(f"변경 사항 확인 실패: {str(e)}")
+
+
+class StatusDeltaTracker:
+    """
+    수집된 상태를 직전 상태와 비교해 변경된 피어만 발행
+
+    트래픽 샘플러의 on_sample 콜백으로 사용합니다.
+    """
+
+    TRACKED_FIELDS = ("endpoint", "latest_handshake", "rx_bytes", "tx_bytes", "persistent_keepalive")
+
+    def __init__(self, broker, resolve_name=None):
+        """
+        Args:
+            broker: EventBroker 인스턴스
+            resolve_name: 공개키로 피어 이름을 찾는 함수
+        """
+        self.broker = broker
+        self.resolve_name = resolve_name
+        self._peers = {}
+        self._available = None
+        self._lock = threading.Lock()
+
+    def _peer_view(self, peer):
+        view = {field: peer[field] for field in self.TRACKED_FIELDS}
+        view["public_key"] = peer["public_key"]
+        view["name"] = self.resolve_name(peer["public_key"]) if self.resolve_name else None
+        return view
+
+    def __call__(self, status):
+        with self._lock:
+            current = {peer["public_key"]: peer for peer in status["peers"]}
+            changed = []
+            for public_key, peer in current.items():
+                previous = self._peers.get(public_key)
+                if previous is None or any(previous[f] != peer[f] for f in self.TRACKED_FIELDS):
+                    changed.append(self._peer_view(peer))
+            removed = [public_key for public_key in self._peers if public_key not in current]
+            available_changed = status["available"] != self._available
+
+            self._peers = current
+            self._available = status["available"]
+
+        if changed or removed or available_changed:
+            self.broker.publish("status", {
+                "full": False,
+                "available": status["available"],
+                "collected_at": status["collected_at"],
+                "peers": changed,
+                "removed": removed
+            })
+
+    def snapshot(self):
+        """새 구독자에게 보낼 전체 상태 (wg를 실행하지 않음)"""
+        with self._lock:
+            return {
+                "full": True,
+                "available": bool(self._available),
+                "collected_at": None,
+                "peers": [self._peer_view(peer) for peer in self._peers.values()],
+                "removed": []
+            }
@@ -0,0 +1,236 @@
+import time
+import heapq
+import logging
+import threading
+from datetime import datetime
+
+# created_at / expires_at 시각 형식
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(value):
+    """시각 문자열을 epoch 초로 변환 (없거나 형식이 다르면 None)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)
+
+
+class GraceDeadlines:
+    """
+    키 교체 유예 기간(previous_key.grace_until) 마감 시각 최소 힙
+
+    유예 기간이 지난 이전 키를 정리할 때 전체 레지스트리를 훑지 않고
+    마감이 지난 항목만 꺼냅니다. 잠금이 없으므로 매니저 상태 잠금 안에서만 사용합니다.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # 이름 -> 힙에 들어 있는 유효한 마감 시각 (이전 항목은 꺼낼 때 무시)
+        self._deadlines = {}
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def push(self, name, deadline):
+        if self._deadlines.get(name) == deadline:
+            return
+        self._deadlines[name] = deadline
+        heapq.heappush(self._heap, (deadline, name))
+
+    def schedule(self, records):
+        """이전 키가 남아 있는 레코드 등록"""
+        for record in records:
+            previous = (record.extra or {}).get("previous_key")
+            deadline = parse_time(previous.get("grace_until")) if previous else None
+            if deadline is not None:
+                self.push(record.name, deadline)
+
+    def reset(self, records):
+        """레지스트리가 다시 로드되었을 때 전체 재등록"""
+        self._heap = []
+        self._deadlines = {}
+        self.schedule(records)
+
+    def pop_due(self, now):
+        """마감 시각이 now 이전인 이름 목록 (꺼낸 항목은 등록 해제)"""
+        names = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, name = heapq.heappop(self._heap)
+            if self._deadlines.get(name) == deadline:
+                del self._deadlines[name]
+                names.append(name)
+        return names
+
+
+class ExpiryScheduler:
+    """
+    피어 만료 스케줄러
+
+    - expires_at: 지정 시각이 지나면 삭제
+    - idle_timeout: 최근 핸드셰이크(없으면 생성 시각) 이후 이 시간(초) 동안 연결이 없으면 삭제
+
+    피어별 다음 확인 시각을 최소 힙에 넣어 두고, 가장 이른 시각이 되었을 때만 깨어나
+    그 시점에 만료된 피어들을 한 번의 일괄 삭제로 처리합니다. 전체 피어 목록을 주기적으로 훑지 않습니다.
+    """
+
+    # 인터페이스 상태를 알 수 없을 때 유휴 판정을 미루는 시간(초)
+    STATUS_RETRY = 60.0
+
+    def __init__(self, revoke, get_record, get_handshakes):
+        """
+        Args:
+            revoke: 피어 이름 목록을 한 번에 삭제하는 함수
+            get_record: 이름으로 PeerRecord를 반환하는 함수 (없으면 None)
+            get_handshakes: {공개키: 최근 핸드셰이크 epoch} 반환 함수 (상태를 알 수 없으면 None)
+        """
+        self._revoke = revoke
+        self._get_record = get_record
+        self._get_handshakes = get_handshakes
+        self._heap = []
+        # 이름 -> 힙에 들어 있는 유효한 마감 시각 (이전 항목은 꺼낼 때 무시)
+        self._deadlines = {}
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    @staticmethod
+    def _deadline(record, last_seen=None):
+        """레코드의 다음 확인 시각 (만료 정책이 없으면 None)"""
+        extra = record.extra or {}
+        deadlines = []
+        expires_at = parse_time(extra.get("expires_at"))
+        if expires_at is not None:
+            deadlines.append(expires_at)
+        idle_timeout = extra.get("idle_timeout")
+        if idle_timeout:
+            base = max(last_seen or 0, parse_time(record.created_at) or 0)
+            deadlines.append(base + float(idle_timeout))
+        return min(deadlines) if deadlines else None
+
+    def _push(self, name, deadline):
+        """마감 시각 등록 (잠금 안에서 호출, 가장 이른 시각이 바뀌면 스레드 깨움)"""
+        if self._deadlines.get(name) == deadline:
+            return
+        self._deadlines[name] = deadline
+        heapq.heappush(self._heap, (deadline, name))
+        if self._heap[0][1] == name:
+            self._cond.notify()
+
+    def schedule(self, records):
+        """만료 정책이 있는 레코드 등록"""
+        with self._cond:
+            for record in records:
+                deadline = self._deadline(record)
+                if deadline is not None:
+                    self._push(record.name, deadline)
+
+    def unschedule(self, names):
+        """등록 해제 (힙 항목은 꺼낼 때 무시)"""
+        with self._cond:
+            for name in names:
+                self._deadlines.pop(name, None)
+
+    def reset(self, records):
+        """레지스트리가 다시 로드되었을 때 전체 재등록"""
+        with self._cond:
+            self._heap = []
+            self._deadlines = {}
+        self.schedule(records)
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="peer-expiry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stop:
+                    # 무효가 된 항목 정리
+                    while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                        heapq.heappop(self._heap)
+                    if self._heap and self._heap[0][0] <= time.time():
+                        break
+                    self._cond.wait(self._heap[0][0] - time.time() if self._heap else None)
+                if self._stop:
+                    return
+                due = self._pop_due(time.time())
+            try:
+                self._process(due)
+            except Exception as e:
+                logging.error(f"피어 만료 처리 실패: {str(e)}")
+                # 실패한 피어는 잠시 뒤 다시 확인
+                with self._cond:
+                    for name in due:
+                        self._push(name, time.time() + self.STATUS_RETRY)
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, name = heapq.heappop(self._heap)
+            if self._deadlines.get(name) == deadline:
+                del self._deadlines[name]
+                due.append(name)
+        return due
+
+    def run_due(self, now=None):
+        """지금 만료된 피어 즉시 처리 (삭제된 이름 목록 반환)"""
+        with self._cond:
+            due = self._pop_due(time.time() if now is None else now)
+        return self._process(due, now)
+
+    def _process(self, names, now=None):
+        now = time.time() if now is None else now
+        records = [record for record in map(self._get_record, names) if record is not None]
+
+        handshakes = None
+        if any((record.extra or {}).get("idle_timeout") for record in records):
+            handshakes = self._get_handshakes()
+
+        expired = []
+        with self._cond:
+            for record in records:
+                extra = record.extra or {}
+                if extra.get("idle_timeout") and handshakes is None:
+                    # 핸드셰이크를 알 수 없으면 유휴 판정 보류
+                    expires_at = parse_time(extra.get("expires_at"))
+                    if expires_at is not None and expires_at <= now:
+                        expired.append(record.name)
+                    else:
+                        retry = now + self.STATUS_RETRY
+                        self._push(record.name, min(retry, expires_at) if expires_at else retry)
+                    continue
+                last_seen = handshakes.get(record.public_key) if handshakes else None
+                deadline = self._deadline(record, last_seen)
+                if deadline is None:
+                    continue
+                if deadline <= now:
+                    expired.append(record.name)
+                else:
+                    # 최근 핸드셰이크가 있었으면 다음 유휴 마감 시각으로 재등록
+                    self._push(record.name, deadline)
+
+        if expired:
+            self._revoke(expired)
+            logging.info(f"만료된 피어 {len(expired)}개를 삭제했습니다: {', '.join(expired[:10])}")
+        return expired
@@ -0,0 +1,101 @@
+import io
+import json
+import zipfile
+from functools import lru_cache
+
+try:
+    import qrcode
+    from qrcode.image.pure import PyPNGImage
+    from qrcode.image.svg import SvgPathImage
+except ImportError:  # QR 코드는 선택 기능
+    qrcode = None
+
+# QR 이미지 형식 -> MIME 타입
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml"
+}
+
+
+class _ChunkBuffer:
+    """zipfile 출력을 모아 두었다가 청크 단위로 내보내는 쓰기 전용 버퍼"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """지금까지 기록된 데이터를 꺼내고 버퍼 비우기"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_ndjson(items):
+    """항목들을 한 줄에 하나씩 JSON으로 직렬화 (NDJSON)"""
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def iter_zip(files):
+    """
+    (파일명, 내용) 목록을 zip 아카이브로 스트리밍
+
+    파일 하나를 압축할 때마다 해당 청크를 바로 내보내므로
+    전체 아카이브를 메모리에 올리지 않습니다.
+
+    Args:
+        files: (파일명, 문자열 내용) 튜플의 iterable
+    """
+    buffer = _ChunkBuffer()
+    # 시크 불가능한 스트림이므로 zipfile이 데이터 디스크립터 방식으로 기록
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in files:
+            archive.writestr(filename, content)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    # 중앙 디렉토리
+    chunk = buffer.drain()
+    if chunk:
+        yield chunk
+
+
+def client_config_files(peer_configs):
+    """generate_new_peers 결과를 (파일명, 클라이언트 설정) 튜플로 변환"""
+    for peer_config in peer_configs:
+        yield f"{peer_config['peer_info']['name']}.conf", peer_config['client_config']
+
+
+def qr_available():
+    """QR 코드 생성 가능 여부 (qrcode 패키지 설치 여부)"""
+    return qrcode is not None
+
+
+@lru_cache(maxsize=256)
+def render_qr(text, image_format="png"):
+    """
+    텍스트를 QR 코드 이미지로 변환 (같은 내용은 LRU 캐시에서 반환)
+
+    Args:
+        text: QR 코드에 담을 내용 (클라이언트 설정)
+        image_format: "png" 또는 "svg"
+
+    Returns:
+        이미지 바이트
+    """
+    if qrcode is None:
+        raise RuntimeError("QR 코드를 만들려면 qrcode 패키지가 필요합니다.")
+    if image_format not in QR_FORMATS:
+        raise ValueError(f"지원하지 않는 QR 형식입니다: {image_format}")
+    factory = PyPNGImage if image_format == "png" else SvgPathImage
+    image = qrcode.make(text, image_factory=factory, error_correction=qrcode.constants.ERROR_CORRECT_L)
+    output = io.BytesIO()
+    image.save(output)
+    return output.getvalue()
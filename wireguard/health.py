@@ -0,0 +1,143 @@
+import time
+import logging
+import threading
+
+from .expiry import format_time
+
+
+class HealthMonitor:
+    """
+    준비 상태(readiness) 확인을 백그라운드에서 주기적으로 실행하고 결과를 보관하는 모니터
+
+    요청마다 `wg`를 실행하거나 파일/저장소를 확인하지 않고 마지막 결과만 반환합니다.
+
+    - wg: `wg show all dump` 실행 가능 여부
+    - config: 샤드별 설정 파일 파싱과 서버 개인키
+    - store: 샤드별 피어 저장소 쓰기 가능 여부
+    - interface: 샤드별 인터페이스가 올라와 있는지
+    - address_pool: 샤드별 남은 주소 수 (부족해도 준비 상태에는 영향 없음, degraded로 표시)
+    """
+
+    def __init__(self, shard_set, interval=10.0, min_free_addresses=10):
+        """
+        Args:
+            shard_set: ShardSet 인스턴스
+            interval: 확인 간격(초, 결과가 3배 이상 오래되면 준비되지 않은 것으로 판단)
+            min_free_addresses: 샤드별 최소 여유 주소 수
+        """
+        self.shard_set = shard_set
+        self.interval = interval
+        self.min_free_addresses = min_free_addresses
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+        logging.info(f"상태 확인 시작 (간격: {self.interval}초)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check_now()
+            except Exception as e:
+                logging.warning(f"상태 확인 실패: {str(e)}")
+            self._stop.wait(self.interval)
+
+    @staticmethod
+    def _check(name, critical, run, interface=None):
+        """확인 하나 실행 (run은 (성공 여부, 설명) 반환, 예외는 실패로 기록)"""
+        started = time.perf_counter()
+        try:
+            ok, detail = run()
+        except Exception as e:
+            ok, detail = False, str(e)
+        return {
+            "name": name,
+            "interface": interface,
+            "ok": bool(ok),
+            "critical": critical,
+            "detail": detail,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def check_now(self):
+        """모든 확인을 실행하고 결과 보관 (확인 스레드에서 호출)"""
+        started = time.perf_counter()
+        primary = self.shard_set.primary
+        # wg show all dump는 모든 인터페이스를 한 번에 보여주므로 한 번만 실행
+        status = primary.status_collector.collect() or {"available": False, "interfaces": []}
+        live_interfaces = {item["name"] for item in status["interfaces"]}
+
+        checks = [self._check("wg", True, lambda: (
+            status["available"], "wg 실행 가능" if status["available"] else "wg show all dump 실행 실패"
+        ))]
+        for manager in self.shard_set:
+            interface = manager.interface
+            checks.append(self._check("config", True, lambda: self._check_config(manager), interface))
+            checks.append(self._check("store", True, lambda: self._check_store(manager), interface))
+            checks.append(self._check("interface", True, lambda: (
+                interface in live_interfaces,
+                "인터페이스 활성" if interface in live_interfaces else "인터페이스가 올라와 있지 않습니다"
+            ), interface))
+            checks.append(self._check("address_pool", False, lambda: self._check_pool(manager), interface))
+
+        ready = all(check["ok"] for check in checks if check["critical"])
+        degraded = not all(check["ok"] for check in checks)
+        snapshot = {
+            "ready": ready,
+            "status": "not_ready" if not ready else "degraded" if degraded else "ready",
+            "checked_at": format_time(time.time()),
+            "checked_monotonic": time.monotonic(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checks": checks
+        }
+        previous = self._snapshot
+        if previous is None or previous["status"] != snapshot["status"]:
+            failed = [f"{check['name']}({check['interface'] or '-'})" for check in checks if not check["ok"]]
+            logging.info(f"준비 상태: {snapshot['status']}" + (f", 실패: {', '.join(failed)}" if failed else ""))
+        self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _check_config(manager):
+        if not manager.server_config.exists():
+            return False, f"설정 파일이 없습니다: {manager.get_config_file_path()}"
+        # 서버 개인키가 없거나 잘못되면 예외
+        manager.server_config.server_public_key
+        return True, f"피어 섹션 {manager.server_config.peer_count}개"
+
+    @staticmethod
+    def _check_store(manager):
+        manager.store.check_writable()
+        return True, "쓰기 가능"
+
+    def _check_pool(self, manager):
+        pool = manager.address_pool
+        free = pool.capacity - pool.allocated_count
+        return free >= self.min_free_addresses, f"여유 주소 {free}/{pool.capacity}개"
+
+    def snapshot(self):
+        """
+        마지막 확인 결과 (아직 확인 전이면 None)
+
+        확인 스레드가 멈춰 결과가 interval의 3배 이상 오래되면 준비되지 않은 것으로 표시합니다.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        age = time.monotonic() - snapshot["checked_monotonic"]
+        result = {key: value for key, value in snapshot.items() if key != "checked_monotonic"}
+        result["age_s"] = round(age, 3)
+        if age > self.interval * 3:
+            result.update(ready=False, status="stale")
+        return result
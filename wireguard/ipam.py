@@ -0,0 +1,223 @@
+import os
+import json
+import logging
+import ipaddress
+import tempfile
+from .metrics import FILE_WRITE_SECONDS
+
+
+class AddressPoolExhausted(ValueError):
+    """할당 가능한 주소가 없을 때 발생"""
+
+
+class AddressPool:
+    """
+    CIDR 대역 기반 피어 주소 할당기
+
+    아직 한 번도 할당되지 않은 영역은 최고 수위(next offset) 하나로,
+    반환된 주소는 free-list로 관리하므로 할당/반환이 모두 O(1)이며
+    IPv6 /64처럼 큰 대역에서도 비트맵을 만들지 않습니다.
+    오프셋 0은 네트워크 주소, 1은 서버 주소, 2부터 피어에 할당됩니다.
+
+    상태 파일에는 next offset만 기록하고, free-list는 로드할 때 used_ips가 돌려주는
+    사용 중 주소(피어 저장소)로 다시 만듭니다. 반환으로 free-list만 바뀌면 파일을 쓰지 않습니다.
+    """
+
+    FIRST_PEER_OFFSET = 2
+
+    def __init__(self, network, state_path=None, used_ips=None):
+        """
+        Args:
+            network: 피어 주소 대역 (CIDR)
+            state_path: 상태 파일 경로 (None이면 저장하지 않음)
+            used_ips: 사용 중인 주소 목록을 돌려주는 함수 (로드할 때 free-list 재구성에 사용)
+        """
+        self.network = ipaddress.ip_network(network, strict=True)
+        self.state_path = state_path
+        self.used_ips = used_ips
+
+        # IPv4는 브로드캐스트 주소 제외
+        last = self.network.num_addresses - 1
+        if self.network.version == 4 and self.network.prefixlen < 31:
+            last -= 1
+        self._last_offset = last
+        if self._last_offset < self.FIRST_PEER_OFFSET:
+            raise ValueError(f"피어를 할당할 수 없는 대역입니다: {network}")
+
+        self._next_offset = self.FIRST_PEER_OFFSET
+        self._free = []
+        self._free_set = set()
+        # 상태 파일에 마지막으로 기록한 next offset
+        self._saved_next = None
+        # 마지막으로 읽거나 쓴 상태 파일의 (mtime, inode)
+        self._stamp = None
+
+    @property
+    def server_address(self):
+        """서버 인터페이스 주소 (대역의 첫 번째 호스트)"""
+        return self.network[1]
+
+    @property
+    def prefixlen(self):
+        return self.network.prefixlen
+
+    @property
+    def host_prefixlen(self):
+        """피어 AllowedIPs에 사용할 단일 호스트 prefix (/32 또는 /128)"""
+        return self.network.max_prefixlen
+
+    @property
+    def capacity(self):
+        return self._last_offset - self.FIRST_PEER_OFFSET + 1
+
+    @property
+    def allocated_count(self):
+        return self._next_offset - self.FIRST_PEER_OFFSET - len(self._free)
+
+    def usage(self):
+        """주소 풀 사용량"""
+        return {
+            "network": str(self.network),
+            "capacity": self.capacity,
+            "allocated": self.allocated_count,
+            "available": self.capacity - self.allocated_count
+        }
+
+    def _offset(self, ip):
+        address = ipaddress.ip_address(ip)
+        if address not in self.network:
+            raise ValueError(f"{ip}은(는) {self.network} 대역에 속하지 않습니다.")
+        return int(address) - int(self.network.network_address)
+
+    def _address(self, offset):
+        return str(self.network.network_address + offset)
+
+    def allocate(self):
+        """주소 하나 할당 (반환된 주소 우선 재사용)"""
+        if self._free:
+            offset = self._free.pop()
+            self._free_set.discard(offset)
+            return self._address(offset)
+        if self._next_offset > self._last_offset:
+            raise AddressPoolExhausted(f"{self.network} 대역에 할당 가능한 IP가 없습니다.")
+        offset = self._next_offset
+        self._next_offset += 1
+        return self._address(offset)
+
+    def allocate_many(self, count):
+        """주소 여러 개 할당 (부족하면 아무것도 할당하지 않음)"""
+        available = self.capacity - self.allocated_count
+        if count > available:
+            raise AddressPoolExhausted(
+                f"{self.network} 대역에 할당 가능한 IP가 부족합니다. (요청: {count}, 가용: {available})"
+            )
+        return [self.allocate() for _ in range(count)]
+
+    def release(self, ip):
+        """주소 반환"""
+        offset = self._offset(ip)
+        if offset < self.FIRST_PEER_OFFSET or offset >= self._next_offset or offset in self._free_set:
+            logging.warning(f"할당되지 않은 주소 반환 무시: {ip}")
+            return
+        self._free.append(offset)
+        self._free_set.add(offset)
+
+    def _used_offsets(self, used_ips):
+        used = set()
+        for ip in used_ips:
+            try:
+                offset = self._offset(ip)
+            except ValueError as e:
+                logging.warning(f"주소 풀 재구성 중 무시된 주소: {str(e)}")
+                continue
+            if self.FIRST_PEER_OFFSET <= offset <= self._last_offset:
+                used.add(offset)
+        return used
+
+    def _set_free(self, used):
+        self._free = [o for o in range(self._next_offset - 1, self.FIRST_PEER_OFFSET - 1, -1) if o not in used]
+        self._free_set = set(self._free)
+
+    def seed(self, used_ips):
+        """
+        기존 피어 주소로 풀 상태 재구성 (상태 파일이 없거나 피어를 가져왔을 때 실행)
+
+        Args:
+            used_ips: 이미 사용 중인 주소 목록
+        """
+        used = self._used_offsets(used_ips)
+        self._next_offset = max(used) + 1 if used else self.FIRST_PEER_OFFSET
+        self._set_free(used)
+
+    def rebuild(self):
+        """
+        next offset은 유지하고 사용 중 주소(used_ips)로 free-list만 다시 만듦
+
+        다른 프로세스가 피어를 추가/삭제했을 때 레지스트리를 다시 읽은 뒤 호출합니다.
+        """
+        if self.used_ips is None:
+            return
+        used = self._used_offsets(self.used_ips())
+        if used:
+            self._next_offset = max(self._next_offset, max(used) + 1)
+        self._set_free(used)
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.state_path)
+        except (FileNotFoundError, TypeError):
+            return None
+        return (st.st_mtime_ns, st.st_ino)
+
+    def refresh(self):
+        """다른 프로세스가 상태 파일을 바꿨으면 다시 로드"""
+        if self.state_path and self._file_stamp() != self._stamp:
+            self.load()
+
+    def load(self):
+        """상태 파일 로드 (대역이 다르거나 파일이 없으면 False)"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return False
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("network") != str(self.network):
+                logging.warning(f"주소 풀 대역 변경 감지: {state.get('network')} -> {self.network}")
+                return False
+            self._next_offset = int(state["next"])
+            self._saved_next = self._next_offset
+            if self.used_ips is not None:
+                self.rebuild()
+            else:
+                # 이전 형식 파일의 free-list (used_ips가 없을 때만 사용)
+                self._free = [int(o) for o in state.get("free", [])]
+                self._free_set = set(self._free)
+            self._stamp = self._file_stamp()
+            return True
+        except Exception as e:
+            logging.error(f"주소 풀 상태 로드 실패: {str(e)}")
+            return False
+
+    def save(self):
+        """상태 파일 원자적 저장 (next offset이 바뀌지 않았으면 기록하지 않음)"""
+        if not self.state_path or self._next_offset == self._saved_next:
+            return
+        state = {
+            "network": str(self.network),
+            "next": self._next_offset
+        }
+        directory = os.path.dirname(self.state_path) or "."
+        with FILE_WRITE_SECONDS.time("address_pool"):
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ipam-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.state_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        self._saved_next = self._next_offset
+        self._stamp = self._file_stamp()
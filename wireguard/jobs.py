@@ -0,0 +1,452 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# 작업 종류와 상태
+KINDS = ("create", "revoke", "rotate")
+FINISHED = ("succeeded", "failed")
+
+
+class IdempotencyConflict(Exception):
+    """같은 멱등성 키로 다른 내용의 작업을 제출했을 때"""
+
+
+def fingerprint(kind, spec):
+    """작업 요청 내용의 지문 (같은 멱등성 키로 다시 제출한 요청이 같은지 비교용)"""
+    payload = json.dumps({"kind": kind, "spec": spec}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _peer_summary(peer):
+    """작업 결과에 남길 피어 정보 (개인키 제외)"""
+    return {key: peer.get(key) for key in ("name", "public_key", "ip", "created_at")}
+
+
+class JobQueue:
+    """
+    피어 생성/삭제/키 교체 비동기 작업 대기열
+
+    작업은 SQLite(WAL)에 기록되므로 어느 워커 프로세스에서 제출하든
+    다른 워커에서 상태를 조회할 수 있고, 멱등성 키는 모든 프로세스에서 유일합니다.
+
+    각 프로세스의 작업 스레드는 제출 알림 또는 poll_interval마다 깨어나
+    (polling이 False이면 이 프로세스의 제출 알림에만 깨어남, 리더 워커만 주기적으로 확인)
+    대기 중인 작업을 최대 batch_size개까지 한 번에 가져가고,
+    같은 인터페이스/정책의 생성 작업은 한 번의 generate_new_peers 호출로,
+    삭제와 키 교체는 인터페이스별로 한 번의 호출로 처리합니다
+    (설정 파일 기록과 WireGuard 동기화가 배치당 한 번).
+    """
+
+    SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    fingerprint TEXT,
+    kind TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    owner INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+    COLUMNS = ("id", "idempotency_key", "kind", "interface", "params", "status",
+               "result", "error", "created_at", "started_at", "finished_at")
+
+    def __init__(self, path, get_manager, on_finished=None, batch_size=100, batch_window=0.05,
+                 poll_interval=1.0, retention=86400):
+        """
+        Args:
+            path: 작업 DB 경로
+            get_manager: 인터페이스 이름으로 WireGuardManager를 반환하는 함수 (없으면 None)
+            on_finished: 작업이 끝날 때 호출할 함수 (callback(job 딕셔너리))
+            batch_size: 한 번에 처리할 최대 작업 수
+            batch_window: 깨어난 뒤 작업이 더 모이도록 기다리는 시간(초)
+            poll_interval: 다른 프로세스가 제출한 작업 확인 간격(초)
+            retention: 끝난 작업(과 멱등성 키)을 보관하는 시간(초)
+        """
+        self.path = path
+        self._get_manager = get_manager
+        self._on_finished = on_finished
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.poll_interval = poll_interval
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+        # 제출/완료 알림 (같은 프로세스 안에서만 유효, 다른 프로세스는 poll_interval로 확인)
+        self._cond = threading.Condition()
+        self._pending = False
+        self._stop = False
+        self._thread = None
+        self._last_purge = 0.0
+        # 다른 프로세스가 제출한 작업을 poll_interval마다 확인할지 여부
+        self.polling = True
+
+        self.fail_orphans()
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def fail_orphans(self):
+        """
+        실행 중에 종료된 프로세스의 작업은 실패 처리 (다시 실행하면 중복 생성될 수 있으므로 재시도하지 않음)
+
+        생성 시와 리더로 선출될 때, 그리고 주기적 확인 중에는 1분마다 실행합니다.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, owner FROM jobs WHERE status = 'running'").fetchall()
+            orphans = [job_id for job_id, owner in rows if not self._process_alive(owner)]
+            if orphans:
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ? AND status = 'running'",
+                    [("작업을 처리하던 프로세스가 종료되었습니다.", time.time(), job_id) for job_id in orphans]
+                )
+                logging.warning(f"중단된 작업 {len(orphans)}개를 실패 처리했습니다.")
+
+    @staticmethod
+    def _process_alive(pid):
+        if not pid:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def submit(self, kind, interface, params, idempotency_key=None, spec=None):
+        """
+        작업 제출
+
+        Args:
+            kind: "create", "revoke", "rotate"
+            interface: 대상 인터페이스
+            params: 작업 인자 (create: count, expires_at, idle_timeout, group, routing_policy / revoke: names /
+                    rotate: names, group 또는 all, preshared_key, grace)
+            idempotency_key: 멱등성 키 (같은 키로 다시 제출하면 기존 작업 반환)
+            spec: 멱등성 비교에 쓸 원래 요청 내용 (None이면 params)
+
+        Returns:
+            (작업 딕셔너리, 새로 만들었으면 True)
+
+        Raises:
+            IdempotencyConflict: 같은 키로 다른 내용의 작업을 제출했을 때
+        """
+        if kind not in KINDS:
+            raise ValueError(f"지원하지 않는 작업입니다: {kind}")
+        digest = fingerprint(kind, params if spec is None else spec)
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, idempotency_key, fingerprint, kind, interface, params, status, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+                    (job_id, idempotency_key, digest, kind, interface,
+                     json.dumps(params, ensure_ascii=False), time.time())
+                )
+                created = True
+            except sqlite3.IntegrityError:
+                row = self._conn.execute(
+                    "SELECT fingerprint FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row is None:
+                    raise
+                if row[0] != digest:
+                    raise IdempotencyConflict(f"같은 멱등성 키로 다른 작업이 이미 제출되었습니다: {idempotency_key}")
+                job_id = self._conn.execute(
+                    "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()[0]
+                created = False
+
+        if created:
+            with self._cond:
+                self._pending = True
+                self._cond.notify_all()
+        return self.get(job_id), created
+
+    def get(self, job_id):
+        """작업 조회 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row)
+
+    def wait(self, job_id, timeout):
+        """작업이 끝나거나 timeout초가 지날 때까지 대기 후 작업 반환"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            # 같은 프로세스에서 끝나면 바로 깨어나고, 다른 프로세스가 처리 중이면 주기적으로 확인
+            with self._cond:
+                self._cond.wait(min(remaining, 0.25))
+
+    def count(self, status):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def finished_after(self, cursor, limit=100):
+        """
+        cursor 이후에 끝난 작업 목록 (모든 프로세스, 끝난 순서)
+
+        Args:
+            cursor: 마지막으로 확인한 (finished_at, id)
+        Returns:
+            (작업 목록, 새 cursor)
+        """
+        finished_at, job_id = cursor
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN ('succeeded', 'failed') "
+                "AND (finished_at > ? OR (finished_at = ? AND id > ?)) ORDER BY finished_at, id LIMIT ?",
+                (finished_at, finished_at, job_id, limit)
+            ).fetchall()
+        jobs = [self._row_to_job(row) for row in rows]
+        if jobs:
+            cursor = (jobs[-1]["finished_at"], jobs[-1]["id"])
+        return jobs, cursor
+
+    def set_polling(self, polling):
+        """다른 프로세스가 제출한 작업의 주기적 확인 여부 변경 (켜면 중단된 작업도 바로 정리)"""
+        if polling:
+            # 이전 리더가 실행 중이던 작업은 다른 워커가 이어받지 않으므로 실패 처리
+            self.fail_orphans()
+        with self._cond:
+            self.polling = polling
+            self._cond.notify_all()
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="peer-jobs", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._pending and not self._stop:
+                    self._cond.wait(self.poll_interval if self.polling else None)
+                if self._stop:
+                    return
+                woke_by_submit, self._pending = self._pending, False
+            if woke_by_submit and self.batch_window > 0:
+                # 연달아 들어오는 제출을 한 배치로 모음
+                time.sleep(self.batch_window)
+            try:
+                while self.run_pending():
+                    pass
+                self._purge()
+            except Exception as e:
+                logging.error(f"작업 대기열 처리 실패: {str(e)}")
+
+    def _claim(self):
+        """대기 중인 작업을 최대 batch_size개까지 이 프로세스 소유로 표시"""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status = 'queued' "
+                    "ORDER BY created_at LIMIT ?", (self.batch_size,)
+                ).fetchall()
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'running', owner = ?, started_at = ? WHERE id = ?",
+                    [(os.getpid(), now, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        return [self._row_to_job(row) for row in rows]
+
+    def run_pending(self):
+        """대기 중인 작업 한 배치 처리 (처리한 작업 수 반환)"""
+        jobs = self._claim()
+        if not jobs:
+            return 0
+
+        groups = {}
+        for job in jobs:
+            params = job["params"]
+            if job["kind"] == "create":
+                key = (job["kind"], job["interface"], params.get("expires_at"), params.get("idle_timeout"),
+                       params.get("group"), params.get("routing_policy"))
+            elif job["kind"] == "rotate":
+                key = (job["kind"], job["interface"], params.get("preshared_key"), params.get("grace"))
+            else:
+                key = (job["kind"], job["interface"])
+            groups.setdefault(key, []).append(job)
+
+        for (kind, interface, *_), group in groups.items():
+            started = time.perf_counter()
+            manager = self._get_manager(interface)
+            if manager is None:
+                outcomes = [(job, None, f"알 수 없는 인터페이스입니다: {interface}") for job in group]
+            else:
+                try:
+                    outcomes = getattr(self, f"_run_{kind}")(manager, group)
+                except Exception as e:
+                    logging.error(f"작업 처리 실패 ({kind}, {len(group)}개): {str(e)}")
+                    outcomes = [(job, None, str(e)) for job in group]
+            self._finish(outcomes)
+            logging.info(f"작업 {len(group)}개 처리 완료 ({kind}, {interface}, "
+                         f"{(time.perf_counter() - started) * 1000:.1f}ms)")
+        return len(jobs)
+
+    def _run_create(self, manager, jobs):
+        """같은 정책의 생성 작업을 한 번의 일괄 생성으로 처리"""
+        params = jobs[0]["params"]
+        total = sum(job["params"]["count"] for job in jobs)
+        try:
+            peers = manager.generate_new_peers(
+                total,
+                expires_at=params.get("expires_at"),
+                idle_timeout=params.get("idle_timeout"),
+                group=params.get("group"),
+                routing_policy=params.get("routing_policy")
+            )
+        except Exception as e:
+            if len(jobs) == 1:
+                raise
+            # 주소가 부족한 경우 등 합친 요청만 실패할 수 있으므로 작업별로 다시 시도
+            logging.warning(f"일괄 생성 실패, 작업 {len(jobs)}개를 하나씩 다시 시도합니다: {str(e)}")
+            outcomes = []
+            for job in jobs:
+                try:
+                    outcomes.extend(self._run_create(manager, [job]))
+                except Exception as job_error:
+                    outcomes.append((job, None, str(job_error)))
+            return outcomes
+        outcomes = []
+        offset = 0
+        for job in jobs:
+            count = job["params"]["count"]
+            created = [_peer_summary(peer["peer_info"]) for peer in peers[offset:offset + count]]
+            offset += count
+            outcomes.append((job, {"interface": manager.interface, "peers": created}, None))
+        return outcomes
+
+    def _run_revoke(self, manager, jobs):
+        names = {job["id"]: job["params"]["names"] for job in jobs}
+        revoked = manager.revoke_peers(self._all_names(names), missing_ok=True)
+        return self._split_by_name(manager, jobs, names, revoked, "revoked", "피어를 찾을 수 없습니다")
+
+    def _run_rotate(self, manager, jobs):
+        """키 교체 (names, group 또는 all 대상은 실행 시점의 피어 목록으로 결정)"""
+        names = {}
+        for job in jobs:
+            params = job["params"]
+            if params.get("all"):
+                names[job["id"]] = manager.peer_names()
+            elif params.get("group"):
+                names[job["id"]] = manager.peer_names(group=params["group"])
+            else:
+                names[job["id"]] = params["names"]
+        params = jobs[0]["params"]
+        timings = {}
+        rotated = manager.rotate_peers(self._all_names(names), missing_ok=True,
+                                       preshared_key=params.get("preshared_key"),
+                                       grace=params.get("grace"), timings=timings)
+        outcomes = self._split_by_name(manager, jobs, names, rotated, "rotated",
+                                       "피어를 찾을 수 없거나 개인키가 없는 피어입니다")
+        for _job, result, _error in outcomes:
+            if result is not None:
+                result["timings"] = timings
+        return outcomes
+
+    @staticmethod
+    def _all_names(names):
+        return list(dict.fromkeys(name for job_names in names.values() for name in job_names))
+
+    @staticmethod
+    def _split_by_name(manager, jobs, names, peers, field, missing_message):
+        """배치 처리 결과를 작업별로 나눔 (처리된 피어가 하나도 없는 작업은 실패)"""
+        by_name = {peer["name"]: _peer_summary(peer) for peer in peers}
+        outcomes = []
+        for job in jobs:
+            job_names = names[job["id"]]
+            done = [by_name[name] for name in job_names if name in by_name]
+            missing = [name for name in job_names if name not in by_name]
+            if not done:
+                outcomes.append((job, None, f"{missing_message}: {', '.join(missing[:10]) or '대상 없음'}"))
+                continue
+            outcomes.append((job, {"interface": manager.interface, field: done, "missing": missing}, None))
+        return outcomes
+
+    def _finish(self, outcomes):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                [
+                    ("failed" if error else "succeeded",
+                     json.dumps(result, ensure_ascii=False) if result is not None else None,
+                     error, now, job["id"])
+                    for job, result, error in outcomes
+                ]
+            )
+        with self._cond:
+            self._cond.notify_all()
+
+        if self._on_finished:
+            for job, _result, _error in outcomes:
+                try:
+                    self._on_finished(self.get(job["id"]))
+                except Exception as e:
+                    logging.warning(f"작업 완료 알림 실패 (무시됨): {str(e)}")
+
+    def _purge(self):
+        """보관 기간이 지난 끝난 작업 삭제와 중단된 작업 정리 (1분에 한 번만)"""
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        if self.polling:
+            self.fail_orphans()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (now - self.retention,)
+            )
+        if cursor.rowcount:
+            logging.info(f"보관 기간이 지난 작업 {cursor.rowcount}개를 삭제했습니다.")
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,187 @@
+import os
+import base64
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from cryptography.hazmat.primitives.asymmetric import x25519
+from cryptography.hazmat.primitives import serialization
+
+
+def generate_keypair():
+    """
+    WireGuard 호환 X25519 키페어 생성
+
+    공개키는 생성한 개인키 객체에서 바로 계산하므로 base64 왕복이 없습니다.
+
+    Returns:
+        (개인키, 공개키) base64 문자열 튜플
+    """
+    private_key = x25519.X25519PrivateKey.generate()
+    private_bytes = private_key.private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    public_bytes = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return base64.b64encode(private_bytes).decode('utf-8'), base64.b64encode(public_bytes).decode('utf-8')
+
+
+def derive_public_key(private_key_str):
+    """base64 개인키로 공개키 계산 (잘못된 키면 ValueError)"""
+    try:
+        private_bytes = base64.b64decode(private_key_str, validate=True)
+        private_key = x25519.X25519PrivateKey.from_private_bytes(private_bytes)
+    except Exception as e:
+        raise ValueError(f"올바른 WireGuard 개인키가 아닙니다: {str(e)}") from e
+    public_bytes = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return base64.b64encode(public_bytes).decode('utf-8')
+
+
+def generate_preshared_key():
+    """WireGuard PresharedKey (32바이트 난수, base64)"""
+    return base64.b64encode(os.urandom(32)).decode('utf-8')
+
+
+def _generate_chunk(count):
+    return [generate_keypair() for _ in range(count)]
+
+
+def generate_keypairs(count, workers=None, chunk_size=1000):
+    """
+    키페어 count개 생성
+
+    count가 chunk_size의 두 배 이상이고 workers가 2 이상이면 chunk_size개씩 나눠
+    워커 프로세스에서 병렬로 생성합니다. 멀티스레드 프로세스에서 fork하지 않도록
+    spawn 방식으로 프로세스를 만들며, 실패하면 현재 프로세스에서 생성합니다.
+
+    Args:
+        count: 생성할 키페어 수
+        workers: 워커 프로세스 수 (None이면 CPU 수, 최대 8)
+        chunk_size: 워커에 한 번에 맡길 키페어 수
+
+    Returns:
+        (개인키, 공개키) 튜플 목록
+    """
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8)
+    if workers < 2 or count < chunk_size * 2:
+        return _generate_chunk(count)
+
+    chunks = [chunk_size] * (count // chunk_size)
+    if count % chunk_size:
+        chunks.append(count % chunk_size)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            return [pair for chunk in executor.map(_generate_chunk, chunks) for pair in chunk]
+    except Exception as e:
+        logging.warning(f"병렬 키 생성 실패, 현재 프로세스에서 생성합니다: {str(e)}")
+        return _generate_chunk(count)
+
+
+class KeypairPool:
+    """
+    미리 생성해 둔 키페어 풀
+
+    백그라운드 스레드가 풀을 high_water까지 채워 두고, 남은 수가 low_water 아래로
+    내려가면 다시 채웁니다. 피어 생성은 준비된 키페어를 꺼내기만 하며,
+    풀이 비어 있으면 요청 스레드에서 바로 생성합니다.
+    키페어는 메모리에만 보관하며 디스크에 기록하지 않습니다.
+    """
+
+    # 생성 실패 후 다시 시도하기까지 기다리는 시간(초, 실패할 때마다 두 배로 늘려 최대값까지)
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, high_water=64, low_water=None, generate=generate_keypair):
+        """
+        Args:
+            high_water: 풀에 채워 둘 키페어 수 (0이면 풀 사용 안 함)
+            low_water: 이 수 아래로 내려가면 다시 채움 (None이면 high_water의 절반)
+            generate: 키페어 생성 함수
+        """
+        self.high_water = max(0, high_water)
+        self.low_water = self.high_water // 2 if low_water is None else min(low_water, self.high_water)
+        self.retry_delay = self.RETRY_DELAY
+        self._generate = generate
+        self._pairs = deque()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def start(self):
+        """백그라운드 채우기 시작"""
+        if self.high_water == 0:
+            return
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="keypair-pool", daemon=True)
+            self._thread.start()
+        logging.info(f"키페어 풀 시작 (최대 {self.high_water}개)")
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._pairs.clear()
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        delay = self.retry_delay
+        while True:
+            with self._cond:
+                while not self._stop and len(self._pairs) > self.low_water:
+                    self._cond.wait()
+                if self._stop:
+                    return
+            # 생성은 잠금 밖에서 수행해 꺼내는 쪽을 막지 않음
+            failed = False
+            while not self._stop and len(self._pairs) < self.high_water:
+                try:
+                    pair = self._generate()
+                except Exception as e:
+                    logging.error(f"키페어 풀 채우기 실패 ({delay:g}초 후 다시 시도): {str(e)}")
+                    failed = True
+                    break
+                self._pairs.append(pair)
+                delay = self.retry_delay
+            if failed:
+                # 풀이 여전히 low_water 이하이므로 기다리지 않으면 바로 다시 실패하며 CPU를 점유
+                with self._cond:
+                    if not self._stop:
+                        self._cond.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def take(self, count=1):
+        """
+        키페어 count개 반환 (풀에 부족한 만큼은 바로 생성)
+
+        Returns:
+            (개인키, 공개키) 튜플 목록
+        """
+        pairs = []
+        while len(pairs) < count:
+            try:
+                pairs.append(self._pairs.popleft())
+            except IndexError:
+                break
+        if self.high_water and len(self._pairs) <= self.low_water:
+            with self._cond:
+                self._cond.notify()
+        while len(pairs) < count:
+            pairs.append(self._generate())
+        return pairs
@@ -0,0 +1,71 @@
+import os
+import logging
+import threading
+
+from .locking import InterProcessLock
+
+
+class LeaderElection:
+    """
+    파일 잠금으로 워커 프로세스 중 하나를 리더로 선출
+
+    리더는 잠금을 프로세스가 끝날 때까지 잡고 있으며, 리더 프로세스가 종료되면
+    운영체제가 잠금을 풀어 주므로 다른 워커가 retry_interval 안에 이어받습니다.
+    `wg show` 수집, 만료 스케줄러, 작업 실행처럼 호스트당 하나만 돌아야 하는 작업에 사용합니다.
+    """
+
+    def __init__(self, path, on_elected=None, retry_interval=5.0):
+        """
+        Args:
+            path: 잠금 파일 경로 (같은 호스트의 모든 워커가 같은 경로 사용)
+            on_elected: 리더가 되었을 때 호출할 함수 (선출 스레드 또는 start()에서 호출)
+            retry_interval: 리더가 아닐 때 다시 시도하는 간격(초)
+        """
+        self._lock = InterProcessLock(path)
+        self.on_elected = on_elected
+        self.retry_interval = retry_interval
+        self._leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._leader
+
+    def start(self):
+        """바로 한 번 시도하고, 실패하면 백그라운드에서 주기적으로 다시 시도"""
+        if self._try_elect():
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.retry_interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.retry_interval):
+            if self._try_elect():
+                return
+
+    def _try_elect(self):
+        if self._leader:
+            return True
+        try:
+            if not self._lock.try_acquire():
+                return False
+        except Exception as e:
+            logging.warning(f"리더 잠금 시도 실패: {str(e)}")
+            return False
+        self._leader = True
+        logging.info(f"이 워커(pid {os.getpid()})가 백그라운드 작업 리더로 선출되었습니다.")
+        if self.on_elected:
+            try:
+                self.on_elected()
+            except Exception as e:
+                logging.error(f"리더 작업 시작 실패: {str(e)}")
+        return True
@@ -0,0 +1,74 @@
+import os
+import fcntl
+import threading
+
+
+class InterProcessLock:
+    """
+    fcntl 파일 잠금 기반 프로세스 간 잠금 (같은 프로세스 안에서는 재진입 가능)
+
+    flock은 같은 프로세스의 스레드끼리는 서로 막지 않으므로
+    프로세스 내부 동기화를 위해 RLock을 함께 사용합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except Exception:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+            self._depth += 1
+        except Exception:
+            self._thread_lock.release()
+            raise
+
+    def try_acquire(self):
+        """잠금을 기다리지 않고 시도 (다른 프로세스가 잡고 있으면 False)"""
+        if not self._thread_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._depth == 0:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    return False
+                except Exception:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+            self._depth += 1
+            return True
+        except Exception:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                fd, self._fd = self._fd, None
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -1,67 +1,259 @@
 import subprocess
 import os
-import json
-import secrets
-import base64
 from datetime import datetime
-from cryptography.hazmat.primitives.asymmetric import x25519
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.serialization import NoEncryption
 import logging
-import tempfile
-import shutil
+import threading
+import time
+import ipaddress
+from .store import create_peer_store
+from .ipam import AddressPool
+from .registry import PeerRecord, PeerRegistry
+from .sync import KernelSync
+from .status import StatusCollector
+from .config import ServerConfig
+from .endpoint import EndpointResolver, format_endpoint, is_valid_ip
+from .locking import InterProcessLock
+from .keys import KeypairPool, generate_keypair, generate_keypairs, generate_preshared_key, derive_public_key
+from .metrics import COMMAND_SECONDS, command_label
+from .expiry import ExpiryScheduler, GraceDeadlines, parse_time, format_time, TIME_FORMAT
+from .reconcile import iter_config_peers, iter_dump_peers, diff_peers
+from .policies import RoutingPolicies, DEFAULT_DNS
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class WireGuardManager:
-    def __init__(self, config_file=None, peers_file="peers.json"):
+    def __init__(self, config_file=None, peers_file="peers.json", peer_store=None, network=None,
+                 sync_mode=None, endpoint=None, interface=None, listen_port=None):
         """
         WireGuard 매니저 초기화
         
         Args:
             config_file: WireGuard 설정 파일 경로 (None이면 사용자 디렉토리 사용)
-            peers_file: 피어 정보 저장 파일
+            peers_file: 피어 정보 저장 파일 (JSON 저장소 또는 마이그레이션 원본)
+            peer_store: 피어 저장소 종류 ("sqlite" 또는 "json", None이면 WG_PEER_STORE 환경변수 또는 sqlite)
+            network: 피어 주소 대역 CIDR (None이면 WG_NETWORK 환경변수 또는 10.0.0.0/24)
+            sync_mode: 인터페이스 동기화 방식 ("syncconf" 또는 "incremental", None이면 WG_SYNC_MODE 환경변수 또는 syncconf)
+            endpoint: 클라이언트 설정의 서버 주소 (None이면 WG_ENDPOINT 환경변수, 디스크 캐시, 백그라운드 조회 순,
+                WG_ENDPOINT의 포트는 기본 인터페이스에만 적용)
+            interface: WireGuard 인터페이스 이름 (None이면 WG_INTERFACE 환경변수 또는 wg0)
+            listen_port: 서버 포트 (None이면 WG_LISTEN_PORT 환경변수 또는 51820, 새 설정 파일을 만들 때 사용)
         """
+        self.interface = interface or os.environ.get("WG_INTERFACE", "wg0")
+        self.listen_port = int(listen_port or os.environ.get("WG_LISTEN_PORT", "51820"))
+        
         # 사용자 디렉토리에 설정 파일 저장 (권한 문제 해결)
         self.app_dir = os.path.expanduser("~/wireguard-manager")
-        os.makedirs(self.app_dir, exist_ok=True)
+        # wg0은 기존 위치를 그대로 쓰고, 다른 인터페이스는 하위 디렉토리에 상태를 분리
+        self.state_dir = self.app_dir if self.interface == "wg0" else os.path.join(self.app_dir, self.interface)
+        os.makedirs(self.state_dir, exist_ok=True)
+        
+        # 인터페이스마다 피어 이름이 겹치지 않도록 접두사 구분 (wg0: peer_N, wg1: wg1_peer_N)
+        self.peer_name_prefix = "peer" if self.interface == "wg0" else f"{self.interface}_peer"
         
         if config_file is None:
-            self.config_file = os.path.join(self.app_dir, "wg0.conf")
+            self.config_file = os.path.join(self.state_dir, f"{self.interface}.conf")
         else:
             self.config_file = config_file
+        
+        # 서버 설정 파일 모델 (한 번 파싱 후 파일이 바뀔 때만 다시 읽음)
+        self.server_config = ServerConfig(self.config_file, derive_public_key=self._generate_public_key)
+            
+        self.peers_file = os.path.join(self.state_dir, peers_file)
+        
+        # 여러 워커 프로세스가 같은 파일을 공유하므로 상태 변경은 파일 잠금으로 직렬화
+        self._commit_lock = InterProcessLock(os.path.join(self.state_dir, "manager.lock"))
+        # 메모리 상태(레지스트리, 피어 번호, 주소 풀) 교체/변경용 프로세스 내부 잠금
+        # 잠금 순서: _commit_lock -> _state_lock
+        self._state_lock = threading.RLock()
+        
+        with self._commit_lock:
+            self.store = create_peer_store(
+                peer_store or os.environ.get("WG_PEER_STORE", "sqlite"),
+                self.state_dir,
+                peers_file
+            )
+            self.registry = PeerRegistry(PeerRecord.from_dict(peer) for peer in self._load_peers())
+            self.peer_counter = self._last_peer_number()
+            # 키 교체 유예 기간이 남은 이전 키 (다음 키 교체 때 마감이 지난 것만 정리)
+            self.grace_deadlines = GraceDeadlines()
+            self.grace_deadlines.schedule(self.registry)
+            self._publish_peers_version()
             
-        self.peers_file = os.path.join(self.app_dir, peers_file)
-        self.peers = self._load_peers()
-        self.peer_counter = len(self.peers)
+            # 주소 풀 (서버 주소와 피어 주소 모두 같은 대역 설정 사용)
+            self.address_pool = self._load_address_pool(network or os.environ.get("WG_NETWORK", "10.0.0.0/24"))
+        
+        # 인터페이스 동기화 (incremental 모드는 WG_SYNC_DEBOUNCE초 동안 변경을 모아 적용)
+        self.kernel_sync = KernelSync(
+            self._run_command,
+            self._sync_wireguard_config,
+            interface=self.interface,
+            mode=sync_mode or os.environ.get("WG_SYNC_MODE", "syncconf"),
+            debounce=float(os.environ.get("WG_SYNC_DEBOUNCE", "0.2"))
+        )
         
-        # 서버 공인 IP 캐시
-        self._cached_server_ip = None
+        # wg show all dump 결과 캐시 (WG_STATUS_TTL초, 리더 워커의 결과를 다른 워커와 공유)
+        self.status_collector = StatusCollector(
+            self._run_command,
+            ttl=float(os.environ.get("WG_STATUS_TTL", "2")),
+            shared_path=os.path.join(self.app_dir, "status_snapshot.json"),
+            shared_max_age=float(os.environ.get("WG_STATS_INTERVAL", "10")) * 3
+        )
+        
+        # 미리 생성해 두는 키페어 풀 (메모리에만 보관, WG_KEYPOOL_SIZE=0이면 사용 안 함)
+        self.keypair_pool = KeypairPool(high_water=int(os.environ.get("WG_KEYPOOL_SIZE", "64")))
+        self.keypair_pool.start()
+        # 대량 키 교체 시 키 생성 워커 프로세스 수 (None이면 CPU 수)
+        workers = os.environ.get("WG_ROTATE_WORKERS")
+        self.rotation_workers = int(workers) if workers else None
+        
+        # 만료 시각/유휴 제한이 있는 피어 자동 삭제 (다음 마감 시각에만 깨어남)
+        self.expiry_scheduler = ExpiryScheduler(
+            revoke=lambda names: self.revoke_peers(names, missing_ok=True),
+            get_record=lambda name: self.registry.get(name),
+            get_handshakes=self._get_latest_handshakes
+        )
+        self.expiry_scheduler.schedule(self.registry)
+        self.expiry_scheduler.start()
+        
+        # 클라이언트 AllowedIPs/DNS 라우팅 정책 (모든 인터페이스가 같은 파일 공유)
+        self.routing_policies = RoutingPolicies(os.path.join(self.app_dir, "routing_policies.json"))
+        
+        # 피어 추가/삭제 이벤트 리스너 (callback(event, data))
+        self._listeners = []
+        
+        # 서버 공인 IP (조회가 필요하면 백그라운드에서 동시에 실행, 결과는 디스크에 저장)
+        # WG_ENDPOINT의 포트는 기본 인터페이스에만 적용 (다른 샤드는 호스트만 쓰고 자기 포트 사용)
+        self.endpoint_resolver = EndpointResolver(
+            self._run_command,
+            os.path.join(self.state_dir, "endpoint.json"),
+            configured=endpoint or os.environ.get("WG_ENDPOINT"),
+            use_port=bool(endpoint) or self.interface == os.environ.get("WG_INTERFACE", "wg0")
+        )
+        self.endpoint_resolver.start()
         
         # WireGuard 설정 확인
-        self._ensure_wireguard_config()
+        with self._commit_lock:
+            self._ensure_wireguard_config()
+    
+    def refresh(self):
+        """
+        다른 워커 프로세스의 변경 사항 반영
+        
+        변경이 없으면 저장소 버전과 주소 풀 파일 상태만 확인합니다.
+        커밋 중인 스레드와 겹치지 않도록 상태 잠금 안에서 확인하므로,
+        다른 스레드가 변경 감지를 먼저 소비해도 커밋은 항상 최신 상태에서 진행됩니다.
+        
+        다른 프로세스가 추가/삭제/키 교체한 피어는 이 프로세스의 리스너에도
+        peer_added/peer_removed/peer_rotated 이벤트로 전달합니다.
+        """
+        with self._state_lock:
+            if self.store.changed_externally():
+                previous = self.registry
+                self.registry = PeerRegistry(PeerRecord.from_dict(peer) for peer in self._load_peers())
+                self.peer_counter = self._last_peer_number()
+                self.expiry_scheduler.reset(self.registry)
+                self.grace_deadlines.reset(self.registry)
+                self._publish_peers_version()
+                # 다른 프로세스가 할당/반환한 주소 반영 (next offset은 아래 refresh에서 파일 기준으로 갱신)
+                self.address_pool.rebuild()
+                logging.info("다른 프로세스의 피어 변경 사항을 반영했습니다.")
+                if self._listeners:
+                    self._notify_external_changes(previous, self.registry)
+            self.address_pool.refresh()
+    
+    def _notify_external_changes(self, previous, current):
+        """두 레지스트리를 비교해 달라진 피어를 이벤트로 발행"""
+        fields = ("name", "public_key", "ip", "created_at")
+        added, rotated = [], []
+        for record in current:
+            before = previous.get(record.name)
+            if before is None:
+                added.append(record.to_dict(fields))
+            elif before.public_key != record.public_key:
+                rotated.append(record.to_dict(fields))
+        removed = [record.to_dict(fields) for record in previous if current.get(record.name) is None]
+        for event, peers in (("peer_added", added), ("peer_removed", removed), ("peer_rotated", rotated)):
+            if peers:
+                self._notify(event, peers)
+    
+    def set_leader(self, leader):
+        """
+        호스트당 하나만 실행할 백그라운드 작업(만료 스케줄러, wg 상태 수집) 담당 여부 설정
+        
+        단독으로 사용할 때는 리더로 시작하며, 여러 워커로 실행할 때는
+        LeaderElection으로 선출된 워커만 리더가 됩니다.
+        """
+        self.status_collector.leader = leader
+        if leader:
+            self.expiry_scheduler.start()
+        else:
+            self.expiry_scheduler.stop()
+    
+    def _publish_peers_version(self):
+        """
+        레지스트리 갱신이 끝난 뒤 저장소 버전 공개 (상태 잠금 안에서 호출)
+        
+        저장소 버전은 레지스트리보다 먼저 바뀌므로, 조회 쪽은 공개된 버전만 사용해야
+        새 버전 키에 이전 레지스트리로 만든 응답이 캐시되지 않습니다.
+        """
+        self._peers_version = self.store.version
     
     def _load_peers(self):
         """피어 정보 로드"""
         try:
-            if os.path.exists(self.peers_file):
-                with open(self.peers_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return self.store.load()
         except Exception as e:
             logging.error(f"피어 정보 로드 실패: {str(e)}")
             return []
     
-    def _save_peers(self):
-        """피어 정보 저장"""
-        try:
-            with open(self.peers_file, 'w', encoding='utf-8') as f:
-                json.dump(self.peers, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logging.error(f"피어 정보 저장 실패: {str(e)}")
+    def _last_peer_number(self):
+        """peer_N 이름 중 가장 큰 번호 (삭제된 피어가 있어도 이름이 겹치지 않도록)"""
+        last = 0
+        for record in self.registry:
+            prefix, _, number = record.name.rpartition('_')
+            if prefix == self.peer_name_prefix and number.isdigit():
+                last = max(last, int(number))
+        return last
+    
+    def _load_address_pool(self, network):
+        """주소 풀 로드 (free-list는 레지스트리 주소로 재구성, 상태 파일이 없으면 next offset도 재구성)"""
+        pool = AddressPool(
+            network,
+            state_path=os.path.join(self.state_dir, "address_pool.json"),
+            used_ips=lambda: (record.ip for record in self.registry)
+        )
+        if not pool.load():
+            pool.seed(record.ip for record in self.registry)
+            pool.save()
+            logging.info(f"주소 풀 상태를 생성했습니다: {pool.network}")
+        return pool
+    
+    def add_listener(self, callback):
+        """피어 변경 이벤트 리스너 등록 (callback(event, data))"""
+        self._listeners.append(callback)
+    
+    def _notify(self, event, peers):
+        """피어 변경 이벤트 발행 (개인키 제외)"""
+        if not self._listeners:
+            return
+        data = {
+            "peers": [
+                {key: peer[key] for key in ("name", "public_key", "ip", "created_at")}
+                for peer in peers
+            ],
+            "interface": self.interface,
+            "total_peers": len(self.registry)
+        }
+        for callback in self._listeners:
+            try:
+                callback(event, data)
+            except Exception as e:
+                logging.warning(f"피어 이벤트 전달 실패 (무시됨): {str(e)}")
     
     def _run_command(self, command, check=False, timeout=10):
-        """안전한 명령어 실행"""
+        """안전한 명령어 실행 (실행 시간은 명령어/결과별로 기록)"""
+        started = time.perf_counter()
+        outcome = "failure"
         try:
             result = subprocess.run(
                 command,
@@ -70,11 +262,14 @@ class WireGuardManager:
                 timeout=timeout,
                 check=check
             )
+            outcome = "ok" if result.returncode == 0 else "error"
             return result
         except subprocess.TimeoutExpired:
+            outcome = "timeout"
             logging.error(f"명령어 실행 시간 초과: {' '.join(command)}")
             return None
         except subprocess.CalledProcessError as e:
+            outcome = "error"
             logging.error(f"명령어 실행 실패: {' '.join(command)}, 오류: {e.stderr}")
             return None
         except FileNotFoundError:
@@ -83,11 +278,13 @@ class WireGuardManager:
         except Exception as e:
             logging.error(f"명령어 실행 중 예외 발생: {str(e)}")
             return None
+        finally:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, command_label(command), outcome)
     
     def _ensure_wireguard_config(self):
         """WireGuard 설정 파일 확인 및 생성"""
         try:
-            if not os.path.exists(self.config_file):
+            if not self.server_config.exists():
                 logging.info("WireGuard 설정 파일이 없습니다. 생성 중...")
                 self._create_wireguard_config()
             else:
@@ -104,17 +301,16 @@ class WireGuardManager:
             # 기본 설정 파일 생성
             config_content = f"""[Interface]
 PrivateKey = {server_private_key}
-Address = 10.0.0.1/24
-ListenPort = 51820
-# PostUp = iptables -A FORWARD -i wg0 -j ACCEPT; iptables -t nat -A POSTROUTING -o eth0 -j MASQUERADE
-# PostDown = iptables -D FORWARD -i wg0 -j ACCEPT; iptables -t nat -D POSTROUTING -o eth0 -j MASQUERADE
+Address = {self.address_pool.server_address}/{self.address_pool.prefixlen}
+ListenPort = {self.listen_port}
+# PostUp = iptables -A FORWARD -i {self.interface} -j ACCEPT; iptables -t nat -A POSTROUTING -o eth0 -j MASQUERADE
+# PostDown = iptables -D FORWARD -i {self.interface} -j ACCEPT; iptables -t nat -D POSTROUTING -o eth0 -j MASQUERADE
 
 # 피어 설정은 아래에 자동으로 추가됩니다.
 """
             
             # 설정 파일 저장
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                f.write(config_content)
+            self.server_config.initialize(config_content)
             
             logging.info(f"WireGuard 설정 파일이 생성되었습니다: {self.config_file}")
             
@@ -124,119 +320,563 @@ ListenPort = 51820
     
     def _generate_private_key(self):
         """개인키 생성 - WireGuard 호환"""
-        try:
-            # cryptography 라이브러리 사용
-            private_key = x25519.X25519PrivateKey.generate()
-            private_key_bytes = private_key.private_bytes(
-                encoding=serialization.Encoding.Raw,
-                format=serialization.PrivateFormat.Raw,
-                encryption_algorithm=NoEncryption()
-            )
-            return base64.b64encode(private_key_bytes).decode('utf-8')
-        except Exception as e:
-            logging.warning(f"cryptography 개인키 생성 실패, 대안 사용: {str(e)}")
-            # 대안: secrets 모듈 사용 (WireGuard 호환)
-            private_key_bytes = secrets.token_bytes(32)
-            return base64.b64encode(private_key_bytes).decode('utf-8')
+        return generate_keypair()[0]
     
     def _generate_public_key(self, private_key_str):
-        """공개키 생성 - WireGuard 호환"""
-        try:
-            # cryptography 라이브러리 사용
-            private_key_bytes = base64.b64decode(private_key_str)
-            private_key = x25519.X25519PrivateKey.from_private_bytes(private_key_bytes)
-            public_key = private_key.public_key()
-            public_key_bytes = public_key.public_bytes(
-                encoding=serialization.Encoding.Raw,
-                format=serialization.PublicFormat.Raw
-            )
-            return base64.b64encode(public_key_bytes).decode('utf-8')
-        except Exception as e:
-            logging.warning(f"cryptography 공개키 생성 실패, 대안 사용: {str(e)}")
-            # 대안: 간단한 해시 기반 공개키 생성
-            import hashlib
-            private_key_bytes = base64.b64decode(private_key_str)
-            public_key_bytes = hashlib.sha256(private_key_bytes).digest()
-            return base64.b64encode(public_key_bytes).decode('utf-8')
-    
-    def generate_new_peer(self):
+        """공개키 생성 - WireGuard 호환 (잘못된 개인키면 ValueError)"""
+        return derive_public_key(private_key_str)
+    
+    def generate_new_peer(self, expires_at=None, idle_timeout=None, group=None, routing_policy=None):
         """새로운 WireGuard 피어 생성"""
+        return self.generate_new_peers(1, expires_at=expires_at, idle_timeout=idle_timeout,
+                                       group=group, routing_policy=routing_policy)[0]
+    
+    def generate_new_peers(self, count, expires_at=None, idle_timeout=None, group=None, routing_policy=None):
+        """
+        여러 WireGuard 피어를 한 번에 생성
+        
+        키페어를 한 번에 생성하고, 설정 파일과 피어 파일은 한 번만 기록하며,
+        WireGuard 동기화도 한 번만 수행합니다.
+        
+        Args:
+            count: 생성할 피어 수
+            expires_at: 만료 시각 ("%Y-%m-%d %H:%M:%S", None이면 만료 없음)
+            idle_timeout: 최근 핸드셰이크 이후 이 시간(초) 동안 연결이 없으면 삭제 (None이면 없음)
+            group: 피어 그룹 (그룹 라우팅 정책 적용, None이면 없음)
+            routing_policy: 피어 라우팅 정책 이름 (None이면 그룹 정책 또는 full)
+        """
+        if count < 1:
+            raise ValueError("생성할 피어 수는 1 이상이어야 합니다.")
+        extra = self._expiry_policy(expires_at, idle_timeout)
+        extra.update(self._routing_fields(group, routing_policy))
+        
         try:
-            # 피어 키페어 생성
-            peer_private_key = self._generate_private_key()
-            peer_public_key = self._generate_public_key(peer_private_key)
+            # 미리 생성된 키페어 사용 (부족하면 잠금 밖에서 바로 생성)
+            keypairs = self.keypair_pool.take(count)
             
-            # 피어 IP 할당 (10.0.0.2부터 시작)
-            peer_ip = f"10.0.0.{self.peer_counter + 2}"
-            
-            # 피어 정보 생성
-            peer_name = f"peer_{self.peer_counter + 1}"
-            peer_info = {
-                "name": peer_name,
-                "private_key": peer_private_key,
-                "public_key": peer_public_key,
-                "ip": peer_ip,
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            # IP 할당과 설정/저장소 기록은 프로세스 간 잠금 안에서 짧게 수행
+            with self._commit_lock, self._state_lock:
+                self.refresh()
+                new_peers = self._commit_new_peers(keypairs, extra)
             
-            # 피어를 설정 파일에 추가
-            self._add_peer_to_config(peer_info)
+            if "expires_at" in extra or "idle_timeout" in extra:
+                self.expiry_scheduler.schedule(
+                    record for record in map(self.registry.get, (peer["name"] for peer in new_peers)) if record
+                )
+            self._notify("peer_added", new_peers)
             
-            # 피어 목록에 추가
-            self.peers.append(peer_info)
-            self.peer_counter += 1
-            self._save_peers()
-            
-            # 클라이언트 설정 생성
-            client_config = self._generate_client_config(peer_info)
+            # 서버 공개키와 공인 IP는 한 번만 조회
+            server_public_key = self._get_server_public_key()
+            server_ip = self._get_server_public_ip()
             
-            return {
-                "peer_info": peer_info,
-                "client_config": client_config
-            }
+            return [
+                {
+                    "peer_info": peer_info,
+                    "client_config": self._generate_client_config(
+                        peer_info,
+                        server_public_key=server_public_key,
+                        server_ip=server_ip
+                    )
+                }
+                for peer_info in new_peers
+            ]
             
         except Exception as e:
             logging.error(f"피어 생성 실패: {str(e)}")
             raise
     
-    def _add_peer_to_config(self, peer_info):
-        """피어를 설정 파일에 추가"""
+    def _expiry_policy(self, expires_at, idle_timeout):
+        """만료 정책 검증 후 피어 정보에 추가할 필드 반환"""
+        policy = {}
+        if expires_at is not None:
+            if parse_time(expires_at) is None:
+                raise ValueError(f"만료 시각 형식이 올바르지 않습니다 ({TIME_FORMAT}): {expires_at}")
+            policy["expires_at"] = expires_at
+        if idle_timeout is not None:
+            if int(idle_timeout) < 1:
+                raise ValueError("idle_timeout은 1초 이상이어야 합니다.")
+            policy["idle_timeout"] = int(idle_timeout)
+        return policy
+    
+    def _routing_fields(self, group, routing_policy):
+        """그룹/라우팅 정책 검증 후 피어 정보에 추가할 필드 반환"""
+        fields = {}
+        if group is not None:
+            if not isinstance(group, str) or not group:
+                raise ValueError("group은 비어 있지 않은 문자열이어야 합니다.")
+            fields["group"] = group
+        if routing_policy is not None:
+            if not self.routing_policies.exists(routing_policy):
+                raise ValueError(f"라우팅 정책을 찾을 수 없습니다: {routing_policy}")
+            fields["routing_policy"] = routing_policy
+        return fields
+    
+    def update_peer_routing(self, name, changes):
+        """
+        피어 그룹/라우팅 정책 변경 (서버 설정은 바뀌지 않으므로 저장소만 갱신)
+        
+        Args:
+            name: 피어 이름
+            changes: {"group": ..., "routing_policy": ...} (값이 None이면 해제)
+        
+        Returns:
+            변경된 피어 정보 (없으면 KeyError)
+        """
+        unknown = set(changes) - {"group", "routing_policy"}
+        if unknown:
+            raise ValueError(f"변경할 수 없는 필드입니다: {', '.join(sorted(unknown))}")
+        fields = self._routing_fields(
+            changes.get("group"),
+            changes.get("routing_policy")
+        )
+        try:
+            with self._commit_lock, self._state_lock:
+                self.refresh()
+                record = self.registry.get(name)
+                if record is None:
+                    raise KeyError(name)
+                peer_info = record.to_dict()
+                for field in changes:
+                    peer_info.pop(field, None)
+                peer_info.update(fields)
+                self.store.update_peers([peer_info])
+                self.registry.replace(PeerRecord.from_dict(peer_info))
+                self._publish_peers_version()
+            logging.info(f"피어 라우팅 설정 변경: {name} {changes}")
+            return peer_info
+        
+        except Exception as e:
+            logging.error(f"피어 라우팅 설정 변경 실패: {str(e)}")
+            raise
+    
+    def _get_latest_handshakes(self):
+        """공개키별 최근 핸드셰이크 시각 (인터페이스 상태를 알 수 없으면 None)"""
+        status = self.status_collector.collect()
+        if not status or not status["available"]:
+            return None
+        return {peer["public_key"]: peer["latest_handshake"] or 0 for peer in status["peers"]}
+    
+    def _commit_new_peers(self, keypairs, extra=None):
+        """
+        주소를 할당하고 피어를 저장소, 설정 파일, 주소 풀, 레지스트리에 기록 (잠금 안에서 호출)
+        
+        저장소를 먼저 기록하고, 설정 파일 기록이나 동기화가 실패하면 저장소 행과 설정 섹션,
+        할당한 주소를 되돌린 뒤 예외를 전달합니다. 저장소에 없는 피어가 설정 파일과
+        인터페이스에만 남지 않도록 하기 위함입니다.
+        """
+        # 피어 IP 할당 (부족하면 AddressPoolExhausted)
+        peer_ips = self.address_pool.allocate_many(len(keypairs))
+        
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_peers = []
+        for i, (peer_private_key, peer_public_key) in enumerate(keypairs):
+            number = self.peer_counter + i + 1
+            new_peers.append({
+                "name": f"{self.peer_name_prefix}_{number}",
+                "private_key": peer_private_key,
+                "public_key": peer_public_key,
+                "ip": peer_ips[i],
+                "created_at": created_at,
+                **(extra or {})
+            })
+        
         try:
-            # 기존 설정 파일 읽기
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config_content = f.read()
+            # 저장소에 추가분만 기록 (하나의 트랜잭션)
+            self.store.add_peers(new_peers)
+        except Exception as e:
+            logging.error(f"피어 정보 저장 실패: {str(e)}")
+            for ip in peer_ips:
+                self.address_pool.release(ip)
+            raise
+        
+        try:
+            # 피어를 설정 파일에 추가 (1회 기록 + 1회 동기화)
+            self._add_peers_to_config(new_peers)
+        except Exception:
+            self._rollback_new_peers(new_peers, peer_ips)
+            raise
+        self.address_pool.save()
+        
+        # 피어 목록에 추가
+        for peer_info in new_peers:
+            self.registry.add(PeerRecord.from_dict(peer_info))
+        self.peer_counter += len(new_peers)
+        self._publish_peers_version()
+        return new_peers
+    
+    def _rollback_new_peers(self, new_peers, peer_ips):
+        """설정 파일 기록에 실패한 새 피어를 저장소, 설정 파일, 주소 풀에서 되돌림 (잠금 안에서 호출)"""
+        public_keys = [peer["public_key"] for peer in new_peers]
+        try:
+            if any(self.server_config.has_peer(public_key) for public_key in public_keys):
+                self.server_config.remove_peers(public_keys)
+        except Exception as e:
+            logging.error(f"설정 파일 되돌리기 실패 (reconcile로 복구 필요): {str(e)}")
+        try:
+            self.store.remove_peers([peer["name"] for peer in new_peers])
+        except Exception as e:
+            logging.error(f"저장소 되돌리기 실패 (reconcile로 복구 필요): {str(e)}")
+        for ip in peer_ips:
+            self.address_pool.release(ip)
+    
+    def _add_peers_to_config(self, peer_infos):
+        """피어들을 설정 파일에 추가"""
+        try:
+            # 새로운 피어 섹션 추가 (설정 모델 갱신 후 원자적 기록)
+            self.server_config.add_peers([self._peer_section(peer_info) for peer_info in peer_infos])
             
-            # 새로운 피어 섹션 추가
-            peer_section = f"""
-[Peer]
+            logging.info(f"피어 {len(peer_infos)}개가 설정 파일에 추가되었습니다.")
+            
+            # WireGuard가 실행 중이면 설정 동기화 시도
+            self.kernel_sync.apply(added=[
+                (peer_info['public_key'], f"{peer_info['ip']}/{self.address_pool.host_prefixlen}")
+                for peer_info in peer_infos
+            ])
+            
+        except Exception as e:
+            logging.error(f"피어 설정 파일 추가 실패: {str(e)}")
+            raise
+    
+    def _peer_section(self, peer_info):
+        """설정 파일 [Peer] 섹션 (공개키, 섹션 텍스트)"""
+        preshared_key = f"PresharedKey = {peer_info['preshared_key']}\n" if peer_info.get('preshared_key') else ""
+        return peer_info['public_key'], f"""[Peer]
 # {peer_info['name']} - {peer_info['created_at']}
 PublicKey = {peer_info['public_key']}
-AllowedIPs = {peer_info['ip']}/32
+{preshared_key}AllowedIPs = {peer_info['ip']}/{self.address_pool.host_prefixlen}
 """
+    
+    def revoke_peer(self, name):
+        """피어 삭제 (설정 파일, 저장소, 주소 풀에서 제거)"""
+        return self.revoke_peers([name])[0]
+    
+    def revoke_peers(self, names, missing_ok=False):
+        """
+        여러 피어를 한 번에 삭제
+        
+        설정 파일 기록과 WireGuard 동기화는 한 번만 수행합니다.
+        
+        Args:
+            names: 삭제할 피어 이름 목록
+            missing_ok: True면 없는 이름은 건너뜀 (False면 KeyError)
+        """
+        try:
+            with self._commit_lock, self._state_lock:
+                self.refresh()
+                records = []
+                for name in names:
+                    record = self.registry.get(name)
+                    if record is None:
+                        if missing_ok:
+                            continue
+                        raise KeyError(name)
+                    records.append(record)
+                if not records:
+                    return []
+                
+                self._remove_peers_from_config({record.public_key for record in records})
+                self.store.remove_peers([record.name for record in records])
+                
+                for record in records:
+                    self.registry.remove(record.name)
+                    self.address_pool.release(record.ip)
+                self._publish_peers_version()
             
-            config_content += peer_section
+            self.expiry_scheduler.unschedule(record.name for record in records)
+            logging.info(f"피어 {len(records)}개가 삭제되었습니다.")
+            revoked = [record.to_dict() for record in records]
+            self._notify("peer_removed", revoked)
+            return revoked
             
-            # 설정 파일 업데이트
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                f.write(config_content)
+        except Exception as e:
+            logging.error(f"피어 삭제 실패: {str(e)}")
+            raise
+    
+    def _remove_peers_from_config(self, public_keys):
+        """공개키에 해당하는 [Peer] 섹션을 설정 파일에서 제거"""
+        try:
+            self.server_config.remove_peers(public_keys)
             
-            logging.info(f"피어 {peer_info['name']}이 설정 파일에 추가되었습니다.")
+            self.kernel_sync.apply(removed=public_keys)
             
-            # WireGuard가 실행 중이면 설정 동기화 시도
-            self._sync_wireguard_config()
+        except Exception as e:
+            logging.error(f"피어 설정 파일 제거 실패: {str(e)}")
+            raise
+    
+    def rotate_peers(self, names, missing_ok=False, preshared_key=None, grace=None, timings=None):
+        """
+        여러 피어의 키페어를 한 번에 교체 (이름, IP, 만료/라우팅 정책은 유지)
+
+        키페어는 잠금 밖에서 준비하며, 많으면 워커 프로세스에서 병렬로 생성합니다.
+        설정 파일 기록, 저장소 갱신, WireGuard 동기화는 배치당 한 번만 수행합니다.
+
+        Args:
+            names: 키를 교체할 피어 이름 목록
+            missing_ok: True면 없는 이름과 개인키가 없는 피어는 건너뜀 (False면 KeyError / ValueError)
+            preshared_key: True면 PresharedKey 새로 발급, False면 제거, None이면 기존에 있던 피어만 새로 발급
+            grace: 이전 키 설정을 내려받을 수 있는 시간(초, None이면 WG_ROTATE_GRACE 또는 0)
+            timings: 단계별 소요 시간(초)을 기록할 딕셔너리
+
+        Returns:
+            교체된 피어 정보 목록
+        """
+        names = list(dict.fromkeys(names))
+        grace = float(os.environ.get("WG_ROTATE_GRACE", "0")) if grace is None else float(grace)
+        timings = {} if timings is None else timings
+        started = time.perf_counter()
+        try:
+            # 키페어는 잠금 밖에서 준비 (건너뛰는 피어가 있어도 남는 키는 버림)
+            if len(names) <= self.keypair_pool.high_water:
+                keypairs = self.keypair_pool.take(len(names))
+            else:
+                keypairs = generate_keypairs(len(names), workers=self.rotation_workers)
+            timings["keygen_s"] = time.perf_counter() - started
+
+            commit_started = time.perf_counter()
+            with self._commit_lock, self._state_lock:
+                self.refresh()
+                records = []
+                for name in names:
+                    record = self.registry.get(name)
+                    if record is None:
+                        if missing_ok:
+                            continue
+                        raise KeyError(name)
+                    if not record.private_key:
+                        if missing_ok:
+                            continue
+                        raise ValueError(f"개인키가 없는 피어는 키를 교체할 수 없습니다: {name}")
+                    records.append(record)
+                if not records:
+                    return []
+
+                now = time.time()
+                rotated_at = format_time(now)
+                rotated = []
+                for record, (private_key, public_key) in zip(records, keypairs):
+                    peer_info = record.to_dict()
+                    peer_info.pop("previous_key", None)
+                    if grace > 0:
+                        # 유예 기간 동안 이전 클라이언트 설정을 내려받을 수 있도록 보관
+                        peer_info["previous_key"] = {
+                            "private_key": record.private_key,
+                            "public_key": record.public_key,
+                            "preshared_key": peer_info.get("preshared_key"),
+                            "grace_until": format_time(now + grace)
+                        }
+                    if preshared_key or (preshared_key is None and peer_info.get("preshared_key")):
+                        peer_info["preshared_key"] = generate_preshared_key()
+                    else:
+                        peer_info.pop("preshared_key", None)
+                    peer_info.update(private_key=private_key, public_key=public_key, rotated_at=rotated_at)
+                    rotated.append(peer_info)
+
+                # 유예 기간이 지난 다른 피어의 이전 키도 같은 저장소 갱신에서 정리 (마감 힙에서 꺼낸 피어만 확인)
+                rotated_names = {peer["name"] for peer in rotated}
+                expired = []
+                for name in self.grace_deadlines.pop_due(now):
+                    record = self.registry.get(name)
+                    previous = (record.extra or {}).get("previous_key") if record else None
+                    if previous and name not in rotated_names and parse_time(previous["grace_until"]) <= now:
+                        peer_info = record.to_dict()
+                        del peer_info["previous_key"]
+                        expired.append(peer_info)
+
+                old_keys = [record.public_key for record in records]
+                try:
+                    self.server_config.replace_peers(old_keys, [self._peer_section(peer) for peer in rotated])
+                    self.store.update_peers(rotated + expired)
+                except Exception:
+                    # 꺼낸 마감 항목을 잃지 않도록 다시 등록
+                    self.grace_deadlines.reset(self.registry)
+                    raise
+                for peer_info in rotated + expired:
+                    self.registry.replace(PeerRecord.from_dict(peer_info))
+                self.grace_deadlines.schedule(self.registry.get(peer["name"]) for peer in rotated)
+                self._publish_peers_version()
+                timings["commit_s"] = time.perf_counter() - commit_started
+
+                sync_started = time.perf_counter()
+                host_prefixlen = self.address_pool.host_prefixlen
+                self.kernel_sync.apply(
+                    added=[(peer['public_key'], f"{peer['ip']}/{host_prefixlen}") for peer in rotated],
+                    removed=old_keys,
+                    # wg set으로는 PresharedKey를 줄 수 없으므로 전체 동기화
+                    full=any(peer.get("preshared_key") for peer in rotated)
+                )
+                timings["sync_s"] = time.perf_counter() - sync_started
+
+            timings["peers"] = len(rotated)
+            timings["total_s"] = time.perf_counter() - started
+            logging.info(f"피어 {len(rotated)}개의 키를 교체했습니다 "
+                         f"(키 생성 {timings['keygen_s'] * 1000:.1f}ms, 기록 {timings['commit_s'] * 1000:.1f}ms, "
+                         f"동기화 {timings['sync_s'] * 1000:.1f}ms)")
+            self._notify("peer_rotated", rotated)
+            return rotated
+
+        except Exception as e:
+            logging.error(f"피어 키 교체 실패: {str(e)}")
+            raise
+
+    def peer_names(self, group=None):
+        """피어 이름 목록 (group을 지정하면 해당 그룹만)"""
+        return [
+            record.name for record in self.registry
+            if group is None or (record.extra or {}).get("group") == group
+        ]
+
+    def reconcile(self, repair=False):
+        """
+        저장소, 설정 파일, 실행 중인 인터페이스의 피어 비교 (repair=True면 복구)
+        
+        설정 파일과 `wg show <인터페이스> dump` 출력은 한 줄씩 읽으며,
+        공개키 인덱스로 비교하므로 피어 수에 선형입니다.
+        
+        복구 기준은 저장소이며, 설정 파일에만 있는 피어는 저장소로 가져옵니다.
+        - 설정 파일에 없거나 AllowedIPs가 다른 피어: 저장소 기준으로 섹션 기록
+        - 설정 파일에만 있는 피어: 저장소로 가져오기 (개인키 없음)
+        - 인터페이스에만 있는 피어: 인터페이스에서 제거
+        - 인터페이스에 없는 피어: 인터페이스에 추가
+        
+        Returns:
+            (Drift, 복구 결과 딕셔너리 또는 None)
+        """
+        try:
+            with self._commit_lock, self._state_lock:
+                self.refresh()
+                live = self._read_live_peers()
+                live_peers = live.items() if live is not None else None
+                try:
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        drift = diff_peers(self.registry, iter_config_peers(f), live_peers,
+                                           self.address_pool.host_prefixlen)
+                except FileNotFoundError:
+                    drift = diff_peers(self.registry, [], live_peers, self.address_pool.host_prefixlen)
+                
+                if not repair or drift.in_sync:
+                    return drift, None
+                actions, imported = self._repair_drift(drift)
+            
+            logging.info(f"피어 상태 복구 완료: {actions}")
+            if imported:
+                self._notify("peer_added", imported)
+            return drift, actions
             
         except Exception as e:
-            logging.error(f"피어 설정 파일 추가 실패: {str(e)}")
+            logging.error(f"피어 상태 비교 실패: {str(e)}")
             raise
     
+    def _read_live_peers(self, timeout=30):
+        """실행 중인 인터페이스의 피어 (공개키 -> AllowedIPs, 읽을 수 없으면 None)"""
+        command = ["wg", "show", self.interface, "dump"]
+        started = time.perf_counter()
+        outcome = "failure"
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            logging.warning(f"인터페이스 상태를 읽을 수 없습니다: {str(e)}")
+            COMMAND_SECONDS.observe(time.perf_counter() - started, command_label(command), outcome)
+            return None
+        
+        # 출력 전체를 메모리에 모으지 않고 한 줄씩 파싱
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            peers = dict(iter_dump_peers(process.stdout))
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+        
+        outcome = "ok" if returncode == 0 else ("timeout" if returncode < 0 else "error")
+        COMMAND_SECONDS.observe(time.perf_counter() - started, command_label(command), outcome)
+        return peers if returncode == 0 else None
+    
+    def _repair_drift(self, drift):
+        """Drift 복구 (잠금 안에서 호출, 설정 파일 기록과 인터페이스 동기화는 각각 한 번)"""
+        actions = {"imported": 0, "skipped": [], "config_sections_written": 0,
+                   "interface_added": 0, "interface_removed": 0}
+        
+        # 1. 설정 파일에만 있는 피어를 저장소로 가져오기
+        imported = []
+        used_names = set()
+        used_ips = set()
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for peer in drift.config_only:
+            ip = self._import_ip(peer["allowed_ips"])
+            if ip is None or ip in used_ips or self.registry.get_by_ip(ip):
+                actions["skipped"].append({"public_key": peer["public_key"], "reason": "사용할 수 없는 AllowedIPs"})
+                continue
+            name = peer["name"]
+            if not name or name in used_names or self.registry.get(name) is not None:
+                self.peer_counter += 1
+                name = f"{self.peer_name_prefix}_{self.peer_counter}"
+            used_names.add(name)
+            used_ips.add(ip)
+            imported.append({
+                "name": name,
+                "private_key": None,
+                "public_key": peer["public_key"],
+                "ip": ip,
+                "created_at": peer["created_at"] or created_at,
+                "imported": True
+            })
+        if imported:
+            for peer_info in imported:
+                self.registry.add(PeerRecord.from_dict(peer_info))
+            self.store.add_peers(imported)
+            self._publish_peers_version()
+            self.peer_counter = self._last_peer_number()
+            # 가져온 주소까지 포함해 주소 풀 재구성
+            self.address_pool.seed(record.ip for record in self.registry)
+            self.address_pool.save()
+            actions["imported"] = len(imported)
+        
+        # 2. 저장소 기준으로 설정 파일 섹션 기록
+        records = drift.missing_in_config + [record for record, _ in drift.allowed_ips_mismatch]
+        if records:
+            self.server_config.add_peers([self._peer_section(record.to_dict()) for record in records])
+            actions["config_sections_written"] = len(records)
+        
+        # 3. 인터페이스 추가/제거
+        if drift.interface_count is not None:
+            added = {record.public_key: record for record in drift.missing_on_interface}
+            for record, _ in drift.allowed_ips_mismatch:
+                added[record.public_key] = record
+            host_prefixlen = self.address_pool.host_prefixlen
+            if added or drift.interface_only:
+                self.kernel_sync.apply(
+                    added=[(key, f"{record.ip}/{host_prefixlen}") for key, record in added.items()],
+                    removed=drift.interface_only,
+                    full=any((record.extra or {}).get("preshared_key") for record in added.values())
+                )
+            actions["interface_added"] = len(added)
+            actions["interface_removed"] = len(drift.interface_only)
+        
+        return actions, imported
+    
+    def _import_ip(self, allowed_ips):
+        """가져올 피어의 주소 (주소 풀 대역의 단일 호스트 AllowedIPs만 허용)"""
+        if len(allowed_ips) != 1:
+            return None
+        try:
+            interface = ipaddress.ip_interface(allowed_ips[0])
+        except ValueError:
+            return None
+        if interface.network.prefixlen != self.address_pool.host_prefixlen:
+            return None
+        if interface.ip not in self.address_pool.network or interface.ip == self.address_pool.server_address:
+            return None
+        return str(interface.ip)
+    
     def _sync_wireguard_config(self):
         """WireGuard 설정 동기화 (선택적)"""
         try:
             # wg 명령어로 현재 상태 확인
-            result = self._run_command(["wg", "show"], timeout=5)
+            result = self._run_command(["wg", "show", self.interface], timeout=5)
             if result and result.returncode == 0:
                 # WireGuard가 실행 중이면 동기화 시도
-                sync_result = self._run_command(["sudo", "wg", "syncconf", "wg0", self.config_file], timeout=10)
+                sync_result = self._run_command(["sudo", "wg", "syncconf", self.interface, self.config_file], timeout=10)
                 if sync_result and sync_result.returncode == 0:
                     logging.info("WireGuard 설정이 동기화되었습니다.")
                 else:
@@ -246,24 +886,38 @@ AllowedIPs = {peer_info['ip']}/32
         except Exception as e:
             logging.warning(f"WireGuard 동기화 시도 중 오류 (무시됨): {str(e)}")
     
-    def _generate_client_config(self, peer_info):
-        """클라이언트 설정 파일 생성"""
+    def _generate_client_config(self, peer_info, server_public_key=None, server_ip=None):
+        """클라이언트 설정 파일 생성 (AllowedIPs/DNS는 피어에 적용되는 라우팅 정책)"""
+        try:
+            allowed_ips, dns = self.routing_policies.resolve(peer_info, self.address_pool.network)
+        except Exception as e:
+            logging.error(f"라우팅 정책 적용 실패, 전체 터널 사용: {str(e)}")
+            # IPv6 대역이면 IPv6 트래픽도 터널로 라우팅
+            allowed_ips = "0.0.0.0/0, ::/0" if self.address_pool.network.version == 6 else "0.0.0.0/0"
+            dns = ", ".join(DEFAULT_DNS)
+        preshared_key = f"PresharedKey = {peer_info['preshared_key']}\n" if peer_info.get('preshared_key') else ""
+        
         try:
             # 서버 공개키 가져오기
-            server_public_key = self._get_server_public_key()
+            if server_public_key is None:
+                server_public_key = self._get_server_public_key()
             
             # EC2 인스턴스의 공인 IP 가져오기
-            server_ip = self._get_server_public_ip()
+            if server_ip is None:
+                server_ip = self._get_server_public_ip()
+            
+            # IPv6 주소만 대괄호로 감싸고, 설정된 엔드포인트에 포트가 있으면 그 포트 사용
+            endpoint = format_endpoint(server_ip, self.endpoint_resolver.port or self._get_listen_port())
             
             client_config = f"""[Interface]
 PrivateKey = {peer_info['private_key']}
-Address = {peer_info['ip']}/24
-DNS = 8.8.8.8, 8.8.4.4
+Address = {peer_info['ip']}/{self.address_pool.prefixlen}
+DNS = {dns}
 
 [Peer]
 PublicKey = {server_public_key}
-Endpoint = {server_ip}:51820
-AllowedIPs = 0.0.0.0/0
+{preshared_key}Endpoint = {endpoint}
+AllowedIPs = {allowed_ips}
 PersistentKeepalive = 25
 """
             return client_config
@@ -273,116 +927,96 @@ PersistentKeepalive = 25
             # 기본 설정 반환
             return f"""[Interface]
 PrivateKey = {peer_info['private_key']}
-Address = {peer_info['ip']}/24
-DNS = 8.8.8.8, 8.8.4.4
+Address = {peer_info['ip']}/{self.address_pool.prefixlen}
+DNS = {dns}
 
 [Peer]
 PublicKey = [서버_공개키를_여기에_입력]
-Endpoint = [서버_공인IP]:51820
-AllowedIPs = 0.0.0.0/0
+{preshared_key}Endpoint = [서버_공인IP]:{self.listen_port}
+AllowedIPs = {allowed_ips}
 PersistentKeepalive = 25
 """
     
     def _get_server_public_key(self):
-        """서버 공개키 가져오기"""
+        """서버 공개키 가져오기 (설정 모델에 캐시됨)"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # [Interface] 섹션에서 PrivateKey 찾기
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if line.strip() == '[Interface]':
-                    for j in range(i+1, len(lines)):
-                        if lines[j].startswith('PrivateKey = '):
-                            private_key = lines[j].split('=')[1].strip()
-                            return self._generate_public_key(private_key)
-                        elif lines[j].startswith('['):
-                            break
-            
-            raise Exception("서버 개인키를 찾을 수 없습니다.")
-            
+            return self.server_config.server_public_key
         except Exception as e:
             logging.error(f"서버 공개키 가져오기 실패: {str(e)}")
             return "[서버_공개키_오류]"
     
+    def _get_listen_port(self):
+        """서버 포트 (설정 파일의 ListenPort 우선)"""
+        value = self.server_config.interface_value('ListenPort')
+        return int(value) if value and value.isdigit() else self.listen_port
+    
     def _get_server_public_ip(self):
-        """서버 공인 IP 가져오기"""
-        if self._cached_server_ip:
-            return self._cached_server_ip
-            
-        try:
-            # 여러 방법으로 공인 IP 시도
-            methods = [
-                # AWS EC2 메타데이터
-                ["curl", "-s", "--max-time", "3", "http://169.254.169.254/latest/meta-data/public-ipv4"],
-                # 외부 서비스들
-                ["curl", "-s", "--max-time", "3", "ifconfig.me"],
-                ["curl", "-s", "--max-time", "3", "ipecho.net/plain"],
-                ["curl", "-s", "--max-time", "3", "icanhazip.com"]
-            ]
-            
-            for method in methods:
-                result = self._run_command(method, timeout=5)
-                if result and result.returncode == 0 and result.stdout.strip():
-                    ip = result.stdout.strip()
-                    # IP 주소 형식 검증
-                    if self._is_valid_ip(ip):
-                        self._cached_server_ip = ip
-                        logging.info(f"서버 공인 IP: {ip}")
-                        return ip
-            
-            # 모든 방법 실패 시 기본값
-            logging.warning("서버 공인 IP를 가져올 수 없습니다. 기본값 사용")
-            return "YOUR_SERVER_PUBLIC_IP"
-            
-        except Exception as e:
-            logging.error(f"서버 공인 IP 가져오기 실패: {str(e)}")
-            return "YOUR_SERVER_PUBLIC_IP"
+        """서버 공인 IP 가져오기 (조회 중이면 WG_ENDPOINT_WAIT초까지만 대기)"""
+        ip = self.endpoint_resolver.get(timeout=float(os.environ.get("WG_ENDPOINT_WAIT", "2")))
+        if ip:
+            return ip
+        logging.warning("서버 공인 IP가 아직 확인되지 않았습니다. 기본값 사용")
+        return "YOUR_SERVER_PUBLIC_IP"
     
     def _is_valid_ip(self, ip):
         """IP 주소 형식 검증"""
-        try:
-            parts = ip.split('.')
-            if len(parts) != 4:
-                return False
-            for part in parts:
-                if not 0 <= int(part) <= 255:
-                    return False
-            return True
-        except:
-            return False
+        return is_valid_ip(ip)
     
     def get_vpn_status(self):
-        """WireGuard VPN 상태 확인"""
+        """WireGuard VPN 상태 확인 (텍스트)"""
+        return self.get_vpn_status_details()["status_output"]
+    
+    def get_vpn_status_details(self):
+        """
+        WireGuard VPN 상태 확인 (구조화된 정보 + 텍스트)
+        
+        Returns:
+            available, collected_at, interfaces, peers, status_output 키를 가진 딕셔너리
+        """
         try:
-            # wg show 명령어 실행
-            result = self._run_command(["wg", "show"], timeout=10)
+            # wg show all dump 실행 (TTL 캐시, 동시 요청은 한 번만 실행)
+            status = self.status_collector.collect()
             
-            if result and result.returncode == 0:
-                if result.stdout.strip():
-                    return result.stdout
-                else:
-                    return "WireGuard 인터페이스가 실행되지 않거나 피어가 없습니다."
+            peers = []
+            for peer in status["peers"]:
+                record = self.registry.get_by_public_key(peer["public_key"])
+                peers.append(dict(peer, name=record.name if record else None))
+            
+            if status["available"]:
+                status_output = status["text"] or "WireGuard 인터페이스가 실행되지 않거나 피어가 없습니다."
             else:
                 # 대안: 설정 파일 정보 표시
-                return self._get_config_status()
+                status_output = self._get_config_status()
+            
+            return {
+                "available": status["available"],
+                "collected_at": status["collected_at"],
+                "interfaces": status["interfaces"],
+                "peers": peers,
+                "status_output": status_output
+            }
                 
         except Exception as e:
             logging.error(f"VPN 상태 확인 실패: {str(e)}")
-            return f"상태 확인 오류: {str(e)}"
+            return {
+                "available": False,
+                "collected_at": None,
+                "interfaces": [],
+                "peers": [],
+                "status_output": f"상태 확인 오류: {str(e)}"
+            }
     
     def _get_config_status(self):
         """설정 파일 기반 상태 정보"""
         try:
             status_info = f"설정 파일: {self.config_file}\n"
-            status_info += f"등록된 피어 수: {len(self.peers)}\n"
-            status_info += f"서버 IP 대역: 10.0.0.1/24\n"
+            status_info += f"등록된 피어 수: {len(self.registry)}\n"
+            status_info += f"서버 IP 대역: {self.address_pool.server_address}/{self.address_pool.prefixlen}\n"
             
-            if self.peers:
+            if len(self.registry):
                 status_info += "\n등록된 피어들:\n"
-                for peer in self.peers:
-                    status_info += f"- {peer['name']}: {peer['ip']} ({peer['created_at']})\n"
+                for record in self.registry:
+                    status_info += f"- {record.name}: {record.ip} ({record.created_at})\n"
             
             return status_info
             
@@ -391,7 +1025,150 @@ PersistentKeepalive = 25
     
     def get_peers(self):
         """등록된 피어 목록 반환"""
-        return self.peers
+        return self.registry.to_dicts()
+    
+    def query_peers(self, cursor=None, limit=None, fields=None, name_prefix=None,
+                    created_after=None, created_before=None):
+        """
+        피어 목록 페이지 조회
+        
+        Args:
+            cursor: 이전 페이지의 next_cursor (None이면 처음부터)
+            limit: 페이지 크기 (None이면 전체)
+            fields: 포함할 필드 목록 (None이면 전체, 어느 경우든 이전 키의 개인키/PSK는 제외)
+            name_prefix: 이름 접두사 필터
+            created_after: 이 시각 이후 생성된 피어만 ("%Y-%m-%d %H:%M:%S")
+            created_before: 이 시각 이전 생성된 피어만 ("%Y-%m-%d %H:%M:%S")
+        
+        Returns:
+            (피어 목록, 다음 커서 또는 None)
+        """
+        def matches(record):
+            if name_prefix and not record.name.startswith(name_prefix):
+                return False
+            if created_after and (record.created_at or "") < created_after:
+                return False
+            if created_before and (record.created_at or "") > created_before:
+                return False
+            return True
+        
+        has_filter = name_prefix or created_after or created_before
+        records, next_cursor = self.registry.page(
+            after=cursor,
+            limit=limit,
+            predicate=matches if has_filter else None
+        )
+        return [record.to_view(fields) for record in records], next_cursor
+    
+    def get_client_config(self, name):
+        """기존 피어의 클라이언트 설정 (없으면 None, 개인키가 없는 가져온 피어면 ValueError)"""
+        record = self.registry.get(name)
+        if record is None:
+            return None
+        if not record.private_key:
+            raise ValueError(f"개인키가 없는 피어라 클라이언트 설정을 만들 수 없습니다: {name}")
+        return self._generate_client_config(record.to_dict())
+    
+    def get_previous_client_config(self, name):
+        """
+        키 교체 전 클라이언트 설정 (유예 기간 안에서만)
+        
+        Returns:
+            (설정, 유예 만료 시각) 또는 이전 키가 없거나 유예 기간이 지났으면 None
+        """
+        record = self.registry.get(name)
+        if record is None:
+            return None
+        previous = (record.extra or {}).get("previous_key")
+        if not previous or parse_time(previous["grace_until"]) <= time.time():
+            return None
+        peer_info = dict(record.to_dict(), private_key=previous["private_key"],
+                         preshared_key=previous.get("preshared_key"))
+        return self._generate_client_config(peer_info), previous["grace_until"]
+    
+    def iter_client_configs(self, names=None, name_prefix=None, batch_size=500):
+        """
+        피어 클라이언트 설정을 (파일명, 설정) 튜플로 하나씩 생성
+        
+        레지스트리를 batch_size 단위 페이지로 나눠 읽으므로 잠금을 오래 잡지 않고,
+        설정 문자열은 소비하는 쪽이 요청할 때마다 만들어집니다.
+        
+        Args:
+            names: 내보낼 피어 이름 목록 (None이면 전체, 없는 이름과 개인키가 없는 피어는 건너뜀)
+            name_prefix: 이름 접두사 필터
+        """
+        # 다른 워커의 변경으로 레지스트리가 교체되어도 같은 스냅샷을 끝까지 사용
+        registry = self.registry
+        
+        # 서버 공개키와 공인 IP는 한 번만 조회
+        server_public_key = self._get_server_public_key()
+        server_ip = self._get_server_public_ip()
+        
+        def render(record):
+            if not record.private_key:
+                return None
+            config = self._generate_client_config(
+                record.to_dict(),
+                server_public_key=server_public_key,
+                server_ip=server_ip
+            )
+            return f"{record.name}.conf", config
+        
+        if names is not None:
+            for name in names:
+                record = registry.get(name)
+                if record is not None and (not name_prefix or name.startswith(name_prefix)):
+                    item = render(record)
+                    if item:
+                        yield item
+            return
+        
+        predicate = (lambda record: record.name.startswith(name_prefix)) if name_prefix else None
+        cursor = None
+        while True:
+            records, cursor = registry.page(after=cursor, limit=batch_size, predicate=predicate)
+            for record in records:
+                item = render(record)
+                if item:
+                    yield item
+            if cursor is None:
+                return
+    
+    def get_peers_version(self):
+        """
+        피어 목록 버전 (저장소 버전이므로 모든 워커 프로세스에서 같은 값)
+        
+        레지스트리 반영이 끝난 버전만 반환하므로, 이 버전을 읽은 뒤 만든 목록은 항상 그 버전 이후의 내용입니다.
+        """
+        return self._peers_version
+    
+    def get_config_version(self):
+        """설정 파일 버전 (내용이 바뀌면 달라짐, 파일이 없으면 None)"""
+        return self.server_config.version
+    
+    def get_peer_count(self):
+        """등록된 피어 수 반환"""
+        return len(self.registry)
+    
+    def get_peer(self, name):
+        """이름으로 피어 조회 (없으면 None)"""
+        record = self.registry.get(name)
+        return record.to_view() if record else None
+    
+    def get_peer_by_public_key(self, public_key):
+        """공개키로 피어 조회 (없으면 None)"""
+        record = self.registry.get_by_public_key(public_key)
+        return record.to_view() if record else None
+    
+    def get_peer_name(self, public_key):
+        """공개키로 피어 이름 조회 (없으면 None)"""
+        record = self.registry.get_by_public_key(public_key)
+        return record.name if record else None
+    
+    def get_peer_by_ip(self, ip):
+        """IP로 피어 조회 (없으면 None)"""
+        record = self.registry.get_by_ip(ip)
+        return record.to_view() if record else None
     
     def get_config_file_path(self):
         """설정 파일 경로 반환"""
@@ -400,8 +1177,7 @@ PersistentKeepalive = 25
     def export_config(self):
         """설정 파일 내용 반환"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return f.read()
+            return self.server_config.text()
         except Exception as e:
             logging.error(f"설정 파일 읽기 실패: {str(e)}")
             return f"설정 파일 읽기 실패: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,189 @@
+import time
+import bisect
+import threading
+
+# Prometheus 텍스트 노출 형식
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 기본 지연 시간 버킷(초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+
+class Histogram:
+    """
+    누적 버킷 히스토그램
+
+    관측 시에는 버킷 위치 계산과 정수 증가만 하고,
+    누적 합계는 수집(scrape) 시에만 계산합니다.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                # [버킷별 개수(+Inf 포함), 합계, 개수]
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, *labelvalues):
+        """with 블록 실행 시간 관측"""
+        return _Timer(self, labelvalues)
+
+    def samples(self):
+        with self._lock:
+            values = [(labelvalues, list(entry[0]), entry[1], entry[2]) for labelvalues, entry in self._values.items()]
+        for labelvalues, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(float(bound))}"')
+                yield self.name + "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class CallbackGauge:
+    """수집 시점에만 값을 계산하는 게이지 (callback은 숫자 또는 (레이블 값 튜플, 숫자) 목록 반환)"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._callback = callback
+
+    def samples(self):
+        value = self._callback()
+        if value is None:
+            return
+        if not self.labelnames:
+            yield self.name, "", value
+            return
+        for labelvalues, item in value:
+            yield self.name, _format_labels(self.labelnames, labelvalues), item
+
+
+class CallbackCounter(CallbackGauge):
+    """수집 시점에 다른 객체가 세어 둔 누적 값을 읽는 카운터"""
+
+    kind = "counter"
+
+
+class MetricsRegistry:
+    """메트릭 모음 (Prometheus 텍스트 형식으로 출력)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, callback, labelnames=()):
+        return self.register(CallbackGauge(name, documentation, callback, labelnames))
+
+    def callback_counter(self, name, documentation, callback, labelnames=()):
+        return self.register(CallbackCounter(name, documentation, callback, labelnames))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                lines.append(f"# {metric.name} 수집 실패: {_escape(e)}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# 기본 레지스트리와 공용 메트릭 (프로세스 단위)
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "wg_http_request_duration_seconds",
+    "HTTP 요청 처리 시간(초)",
+    ("method", "route", "status")
+)
+
+COMMAND_SECONDS = REGISTRY.histogram(
+    "wg_command_duration_seconds",
+    "외부 명령어(subprocess) 실행 시간(초)",
+    ("command", "result")
+)
+
+FILE_WRITE_SECONDS = REGISTRY.histogram(
+    "wg_file_write_duration_seconds",
+    "설정 파일, 피어 저장소, 주소 풀 기록 시간(초)",
+    ("target",)
+)
+
+
+def command_label(command):
+    """명령어 메트릭 레이블 (sudo 제외, wg는 하위 명령 포함. 예: "wg syncconf")"""
+    args = command[1:] if command and command[0] == "sudo" else command
+    if not args:
+        return "unknown"
+    program = args[0].rsplit('/', 1)[-1]
+    if program == "wg" and len(args) > 1:
+        return f"wg {args[1]}"
+    return program
@@ -0,0 +1,231 @@
+import os
+import json
+import logging
+import tempfile
+import ipaddress
+import threading
+from .locking import InterProcessLock
+from .metrics import FILE_WRITE_SECONDS
+
+# 전체 터널 기본 정책 (정책을 지정하지 않은 피어에 적용)
+FULL_TUNNEL = "full"
+MODES = ("full", "split")
+DEFAULT_DNS = ["8.8.8.8", "8.8.4.4"]
+
+
+def collapse_networks(networks):
+    """
+    CIDR 목록을 겹치거나 인접한 대역을 합친 최소 목록으로 변환
+
+    IPv4와 IPv6는 각각 합친 뒤 IPv4, IPv6 순서로 반환합니다.
+
+    Raises:
+        ValueError: CIDR 형식이 올바르지 않을 때
+    """
+    by_version = {4: [], 6: []}
+    for network in networks:
+        parsed = ipaddress.ip_network(str(network).strip(), strict=False)
+        by_version[parsed.version].append(parsed)
+    return [
+        network
+        for version in (4, 6)
+        for network in ipaddress.collapse_addresses(by_version[version])
+    ]
+
+
+class RoutingPolicies:
+    """
+    클라이언트 AllowedIPs/DNS 라우팅 정책
+
+    - full: 모든 트래픽을 터널로 (0.0.0.0/0, IPv6 대역이면 ::/0 추가)
+    - split: 지정한 대역과 VPN 대역만 터널로
+
+    정책은 피어(routing_policy 필드) 또는 그룹(group 필드)에 지정하며,
+    피어 정책 -> 그룹 정책 -> full 순으로 적용됩니다.
+
+    정책 파일(JSON)은 여러 워커 프로세스가 공유하며 버전이 바뀔 때만 다시 읽습니다.
+    합친 AllowedIPs는 (정책, 버전, VPN 대역)별로 캐시되므로
+    정책에 대역이 수백 개여도 설정 파일을 만들 때마다 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = InterProcessLock(path + ".lock")
+        self._stamp = None
+        self._data = {"version": 0, "policies": {}, "groups": {}}
+        # (정책 이름, 버전, VPN 대역) -> (AllowedIPs 문자열, DNS 문자열)
+        self._rendered = {}
+
+    @staticmethod
+    def _file_stamp(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _ensure_fresh(self):
+        stamp = self._file_stamp(self.path)
+        if stamp == self._stamp:
+            return
+        data = {"version": 0, "policies": {}, "groups": {}}
+        if stamp is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data.update(json.load(f))
+            except Exception as e:
+                logging.error(f"라우팅 정책 로드 실패: {str(e)}")
+                return
+        if data["version"] != self._data["version"]:
+            self._rendered = {}
+        self._data = data
+        self._stamp = stamp
+
+    def _write(self, data):
+        """정책 파일 원자적 기록 (파일 잠금 안에서 호출)"""
+        data["version"] = data.get("version", 0) + 1
+        with FILE_WRITE_SECONDS.time("routing_policies"):
+            directory = os.path.dirname(self.path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".policies-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        self._rendered = {}
+        self._data = data
+        self._stamp = self._file_stamp(self.path)
+
+    @property
+    def version(self):
+        with self._lock:
+            self._ensure_fresh()
+            return self._data["version"]
+
+    def exists(self, name):
+        with self._lock:
+            self._ensure_fresh()
+            return name == FULL_TUNNEL or name in self._data["policies"]
+
+    def get(self, name):
+        """정책 정의 (없으면 None)"""
+        with self._lock:
+            self._ensure_fresh()
+            if name == FULL_TUNNEL:
+                return {"mode": "full", "networks": [], "dns": DEFAULT_DNS}
+            policy = self._data["policies"].get(name)
+            return dict(policy) if policy else None
+
+    def list(self):
+        """정책 이름 -> 정의, 그룹 이름 -> 정책 이름"""
+        with self._lock:
+            self._ensure_fresh()
+            policies = {FULL_TUNNEL: self.get(FULL_TUNNEL)}
+            policies.update({name: dict(policy) for name, policy in self._data["policies"].items()})
+            return policies, dict(self._data["groups"])
+
+    def put(self, name, mode, networks=(), dns=None):
+        """
+        정책 생성/변경 (대역은 합친 결과로 저장)
+
+        Returns:
+            저장된 정책 정의
+
+        Raises:
+            ValueError: 이름, 모드, 대역 형식이 올바르지 않을 때
+        """
+        if not name or name == FULL_TUNNEL:
+            raise ValueError(f"사용할 수 없는 정책 이름입니다: {name}")
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 정책 모드입니다: {mode}")
+        networks = list(networks or [])
+        if mode == "split" and not networks:
+            raise ValueError("split 정책에는 networks가 필요합니다.")
+        collapsed = [str(network) for network in collapse_networks(networks)]
+        dns = list(dns) if dns is not None else DEFAULT_DNS
+        for server in dns:
+            ipaddress.ip_address(server)
+
+        policy = {"mode": mode, "networks": collapsed, "dns": dns, "input_networks": len(networks)}
+        with self._lock, self._file_lock:
+            self._stamp = None
+            self._ensure_fresh()
+            data = json.loads(json.dumps(self._data))
+            data["policies"][name] = policy
+            self._write(data)
+        logging.info(f"라우팅 정책 저장: {name} ({mode}, 대역 {len(networks)}개 -> {len(collapsed)}개)")
+        return dict(policy)
+
+    def delete(self, name):
+        """정책 삭제 (그룹에 지정된 정책이면 ValueError, 없으면 KeyError)"""
+        with self._lock, self._file_lock:
+            self._stamp = None
+            self._ensure_fresh()
+            if name not in self._data["policies"]:
+                raise KeyError(name)
+            groups = [group for group, policy in self._data["groups"].items() if policy == name]
+            if groups:
+                raise ValueError(f"그룹에 지정된 정책은 삭제할 수 없습니다: {', '.join(groups)}")
+            data = json.loads(json.dumps(self._data))
+            del data["policies"][name]
+            self._write(data)
+
+    def set_group(self, group, name):
+        """그룹 정책 지정 (name이 None이면 해제)"""
+        with self._lock, self._file_lock:
+            self._stamp = None
+            self._ensure_fresh()
+            if name is not None and name != FULL_TUNNEL and name not in self._data["policies"]:
+                raise KeyError(name)
+            data = json.loads(json.dumps(self._data))
+            if name is None:
+                data["groups"].pop(group, None)
+            else:
+                data["groups"][group] = name
+            self._write(data)
+
+    def policy_name(self, peer_info):
+        """피어에 적용되는 정책 이름 (피어 정책 -> 그룹 정책 -> full, 삭제된 정책이면 full)"""
+        with self._lock:
+            self._ensure_fresh()
+            policies = self._data["policies"]
+            name = peer_info.get("routing_policy")
+            if name and (name == FULL_TUNNEL or name in policies):
+                return name
+            name = self._data["groups"].get(peer_info.get("group"))
+            if name and (name == FULL_TUNNEL or name in policies):
+                return name
+            return FULL_TUNNEL
+
+    def resolve(self, peer_info, vpn_network):
+        """
+        피어 클라이언트 설정의 (AllowedIPs, DNS) 문자열
+
+        Args:
+            peer_info: 피어 정보 딕셔너리 (routing_policy, group 필드 사용)
+            vpn_network: 피어 주소 대역 (split 정책에도 항상 포함)
+        """
+        with self._lock:
+            name = self.policy_name(peer_info)
+            key = (name, self._data["version"], str(vpn_network))
+            rendered = self._rendered.get(key)
+            if rendered is None:
+                rendered = self._render(self.get(name), vpn_network)
+                self._rendered[key] = rendered
+            return rendered
+
+    @staticmethod
+    def _render(policy, vpn_network):
+        dns = ", ".join(policy.get("dns") or DEFAULT_DNS)
+        if policy["mode"] == "full":
+            # IPv6 대역이면 IPv6 트래픽도 터널로 라우팅
+            allowed_ips = "0.0.0.0/0, ::/0" if vpn_network.version == 6 else "0.0.0.0/0"
+            return allowed_ips, dns
+        networks = collapse_networks(list(policy["networks"]) + [vpn_network])
+        return ", ".join(str(network) for network in networks), dns
@@ -0,0 +1,192 @@
+import re
+import json
+import logging
+import argparse
+
+# "# peer_5 - 2024-01-01 12:00:00" 형식의 피어 주석
+_PEER_COMMENT = re.compile(r"^#\s*(\S+)\s+-\s+(.+?)\s*$")
+
+
+def iter_config_peers(lines):
+    """
+    설정 파일 줄들을 한 줄씩 읽어 [Peer] 섹션 정보 생성
+
+    Args:
+        lines: 설정 파일 줄 iterable (열린 파일 객체 등)
+
+    Yields:
+        {"public_key", "allowed_ips", "name", "created_at"} 딕셔너리
+        (name/created_at은 관리자가 남긴 주석이 있을 때만)
+    """
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('['):
+            if current and current["public_key"]:
+                yield current
+            current = (
+                {"public_key": None, "allowed_ips": [], "name": None, "created_at": None}
+                if stripped == '[Peer]' else None
+            )
+            continue
+        if current is None or not stripped:
+            continue
+        if stripped.startswith('#'):
+            match = _PEER_COMMENT.match(stripped)
+            if match and current["name"] is None:
+                current["name"], current["created_at"] = match.groups()
+            continue
+        if '=' not in stripped:
+            continue
+        key, value = (part.strip() for part in stripped.split('=', 1))
+        if key == 'PublicKey':
+            current["public_key"] = value
+        elif key == 'AllowedIPs':
+            current["allowed_ips"] = [item.strip() for item in value.split(',') if item.strip()]
+    if current and current["public_key"]:
+        yield current
+
+
+def iter_dump_peers(lines):
+    """
+    `wg show <인터페이스> dump` 출력을 한 줄씩 읽어 (공개키, AllowedIPs 목록) 생성
+
+    첫 줄(인터페이스 정보, 4개 필드)은 건너뜁니다.
+    """
+    for line in lines:
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) != 8:
+            continue
+        public_key, allowed_ips = fields[0], fields[3]
+        yield public_key, [] if allowed_ips == "(none)" else allowed_ips.split(',')
+
+
+class Drift:
+    """저장소, 설정 파일, 인터페이스 사이의 차이"""
+
+    __slots__ = (
+        "store_count", "config_count", "interface_count",
+        "missing_in_config", "missing_on_interface", "allowed_ips_mismatch",
+        "config_only", "interface_only"
+    )
+
+    def __init__(self):
+        self.store_count = 0
+        self.config_count = 0
+        # 인터페이스 상태를 읽지 못했으면 None
+        self.interface_count = None
+        # 저장소에는 있지만 설정 파일/인터페이스에 없는 피어 (PeerRecord)
+        self.missing_in_config = []
+        self.missing_on_interface = []
+        # (PeerRecord, 설정 파일 AllowedIPs)
+        self.allowed_ips_mismatch = []
+        # 저장소에 없는 설정 파일 피어 (iter_config_peers 항목)
+        self.config_only = []
+        # 저장소와 설정 파일 모두에 없는 인터페이스 피어 (공개키)
+        self.interface_only = []
+
+    @property
+    def in_sync(self):
+        return not (self.missing_in_config or self.missing_on_interface or self.allowed_ips_mismatch
+                    or self.config_only or self.interface_only)
+
+    def to_dict(self, sample_limit=None):
+        """
+        보고서 딕셔너리
+
+        Args:
+            sample_limit: 항목별로 포함할 최대 개수 (None이면 전체, 개수는 항상 전체 기준)
+        """
+        def sample(items, render):
+            return [render(item) for item in (items if sample_limit is None else items[:sample_limit])]
+
+        return {
+            "in_sync": self.in_sync,
+            "store_peers": self.store_count,
+            "config_peers": self.config_count,
+            "interface_peers": self.interface_count,
+            "counts": {
+                "missing_in_config": len(self.missing_in_config),
+                "missing_on_interface": len(self.missing_on_interface),
+                "allowed_ips_mismatch": len(self.allowed_ips_mismatch),
+                "config_only": len(self.config_only),
+                "interface_only": len(self.interface_only)
+            },
+            "missing_in_config": sample(self.missing_in_config, lambda record: record.name),
+            "missing_on_interface": sample(self.missing_on_interface, lambda record: record.name),
+            "allowed_ips_mismatch": sample(
+                self.allowed_ips_mismatch,
+                lambda item: {"name": item[0].name, "store": item[0].ip, "config": item[1]}
+            ),
+            "config_only": sample(
+                self.config_only,
+                lambda peer: {"public_key": peer["public_key"], "name": peer["name"], "allowed_ips": peer["allowed_ips"]}
+            ),
+            "interface_only": sample(self.interface_only, lambda public_key: public_key)
+        }
+
+
+def diff_peers(records, config_peers, live_peers, host_prefixlen):
+    """
+    공개키 인덱스로 세 출처의 피어 비교 (각 출처를 한 번씩만 순회)
+
+    Args:
+        records: 저장소(레지스트리) PeerRecord iterable
+        config_peers: iter_config_peers 항목 iterable
+        live_peers: (공개키, AllowedIPs) iterable (인터페이스 상태를 모르면 None)
+        host_prefixlen: 피어 AllowedIPs prefix 길이 (/32 또는 /128)
+
+    Returns:
+        Drift
+    """
+    drift = Drift()
+    store = {}
+    for record in records:
+        store[record.public_key] = record
+    drift.store_count = len(store)
+
+    config_keys = set()
+    for peer in config_peers:
+        public_key = peer["public_key"]
+        config_keys.add(public_key)
+        record = store.get(public_key)
+        if record is None:
+            drift.config_only.append(peer)
+        elif peer["allowed_ips"] != [f"{record.ip}/{host_prefixlen}"]:
+            drift.allowed_ips_mismatch.append((record, peer["allowed_ips"]))
+    drift.config_count = len(config_keys)
+    drift.missing_in_config = [record for key, record in store.items() if key not in config_keys]
+
+    if live_peers is not None:
+        live_keys = set()
+        for public_key, _allowed_ips in live_peers:
+            live_keys.add(public_key)
+            if public_key not in store and public_key not in config_keys:
+                drift.interface_only.append(public_key)
+        drift.interface_count = len(live_keys)
+        drift.missing_on_interface = [record for key, record in store.items() if key not in live_keys]
+    else:
+        logging.info("인터페이스 상태를 읽을 수 없어 설정 파일과 저장소만 비교합니다.")
+
+    return drift
+
+
+def main():
+    """명령줄 실행: python -m wireguard.reconcile [--repair] [--all] [--interface wg1]"""
+    from .manager import WireGuardManager
+
+    parser = argparse.ArgumentParser(description="저장소, 설정 파일, 인터페이스의 피어 차이 확인 및 복구")
+    parser.add_argument("--repair", action="store_true", help="차이 복구")
+    parser.add_argument("--all", action="store_true", help="항목을 모두 출력 (기본은 항목별 100개)")
+    parser.add_argument("--interface", help="대상 인터페이스 (기본 WG_INTERFACE 또는 wg0)")
+    args = parser.parse_args()
+
+    manager = WireGuardManager(interface=args.interface)
+    drift, actions = manager.reconcile(repair=args.repair)
+    report = {"drift": drift.to_dict(sample_limit=None if args.all else 100), "actions": actions}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    manager.kernel_sync.flush()
+
+
+if __name__ == "__main__":
+    main()
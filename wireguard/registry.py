@@ -0,0 +1,222 @@
+import bisect
+import itertools
+import threading
+
+
+def peer_view(data):
+    """피어 딕셔너리에서 이전 키의 개인키/PSK 제거 (PeerRecord.to_view)"""
+    previous = data.get("previous_key")
+    if previous:
+        data = dict(data, previous_key={key: previous.get(key) for key in ("public_key", "grace_until")})
+    return data
+
+
+class PeerRecord:
+    """메모리 내 피어 레코드 (__slots__로 피어당 메모리 최소화)"""
+
+    __slots__ = ("name", "private_key", "public_key", "ip", "created_at", "extra", "seq")
+
+    FIELDS = ("name", "private_key", "public_key", "ip", "created_at")
+
+    # extra에 들어가는 선택 필드 (만료/라우팅 정책, PSK, 키 교체, reconcile로 가져온 피어)
+    EXTRA_FIELDS = ("preshared_key", "expires_at", "idle_timeout", "group", "routing_policy",
+                    "rotated_at", "previous_key", "imported")
+
+    def __init__(self, name, private_key, public_key, ip, created_at, extra=None):
+        self.name = name
+        self.private_key = private_key
+        self.public_key = public_key
+        self.ip = ip
+        self.created_at = created_at
+        # 기본 필드 외 추가 정보 (없으면 None)
+        self.extra = extra or None
+        # 레지스트리 등록 순번 (페이지네이션 커서)
+        self.seq = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(
+            data["name"],
+            data.get("private_key"),
+            data["public_key"],
+            data["ip"],
+            data.get("created_at"),
+            extra
+        )
+
+    def to_dict(self, fields=None):
+        """
+        딕셔너리로 변환
+
+        Args:
+            fields: 포함할 필드 목록 (None이면 전체)
+        """
+        if fields is not None:
+            return {field: self._get_field(field) for field in fields}
+        data = {
+            "name": self.name,
+            "private_key": self.private_key,
+            "public_key": self.public_key,
+            "ip": self.ip,
+            "created_at": self.created_at
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_view(self, fields=None):
+        """
+        API 응답용 딕셔너리
+
+        키 교체 전 키(previous_key)는 공개키와 유예 만료 시각만 포함합니다.
+        이전 개인키/PSK는 이전 클라이언트 설정(config?previous=1)으로만 제공합니다.
+
+        Args:
+            fields: 포함할 필드 목록 (None이면 전체)
+        """
+        return peer_view(self.to_dict(fields))
+
+    def _get_field(self, field):
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return self.extra.get(field) if self.extra else None
+
+
+class PeerRegistry:
+    """
+    이름/공개키/IP 해시 인덱스를 가진 피어 레지스트리
+
+    조회, 추가, 삭제가 모두 O(1)이며 이름 인덱스가 생성 순서를 유지합니다.
+    페이지네이션용 순번 목록은 삭제 시 바로 당기지 않고 삭제된 레코드가
+    절반을 넘을 때 한 번에 정리합니다 (분할 상환 O(1)).
+
+    요청 스레드가 목록을 순회하는 동안 다른 스레드가 추가/삭제할 수 있으므로
+    변경과 순회는 내부 잠금으로 보호합니다. 단건 조회는 dict 조회 한 번이라 잠그지 않습니다.
+    """
+
+    # 정리를 시작할 최소 삭제 레코드 수
+    COMPACT_THRESHOLD = 64
+
+    def __init__(self, records=()):
+        self._by_name = {}
+        self._by_public_key = {}
+        self._by_ip = {}
+        self._lock = threading.RLock()
+        # 순번 오름차순 레코드 목록 (삭제된 레코드 포함)
+        self._order = []
+        self._removed = 0
+        self._next_seq = 1
+        # 변경될 때마다 증가 (ETag 등 캐시 검증용)
+        self.version = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __iter__(self):
+        # 순회 중 변경되어도 안전하도록 스냅샷 순회
+        with self._lock:
+            return iter(list(self._by_name.values()))
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def add(self, record):
+        with self._lock:
+            self._add(record)
+
+    def _add(self, record):
+        if record.name in self._by_name:
+            raise ValueError(f"이미 존재하는 피어 이름입니다: {record.name}")
+        if record.public_key in self._by_public_key:
+            raise ValueError(f"이미 등록된 공개키입니다: {record.public_key}")
+        if record.ip in self._by_ip:
+            raise ValueError(f"이미 할당된 IP입니다: {record.ip}")
+        record.seq = self._next_seq
+        self._next_seq += 1
+        self._by_name[record.name] = record
+        self._by_public_key[record.public_key] = record
+        self._by_ip[record.ip] = record
+        self._order.append(record)
+        self.version += 1
+
+    def remove(self, name):
+        """피어 제거 후 제거된 레코드 반환 (없으면 KeyError)"""
+        with self._lock:
+            record = self._by_name.pop(name)
+            del self._by_public_key[record.public_key]
+            del self._by_ip[record.ip]
+            self._removed += 1
+            if self._removed > max(self.COMPACT_THRESHOLD, len(self._order) // 2):
+                self._compact()
+            self.version += 1
+            return record
+
+    def replace(self, record):
+        """
+        같은 이름의 레코드를 교체 (순번은 유지하므로 페이지 커서가 바뀌지 않음)
+
+        이름은 있어야 하며(없으면 KeyError), 공개키/IP가 다른 피어와 겹치면 ValueError입니다.
+        """
+        with self._lock:
+            old = self._by_name[record.name]
+            owner = self._by_public_key.get(record.public_key)
+            if owner is not None and owner is not old:
+                raise ValueError(f"이미 등록된 공개키입니다: {record.public_key}")
+            owner = self._by_ip.get(record.ip)
+            if owner is not None and owner is not old:
+                raise ValueError(f"이미 할당된 IP입니다: {record.ip}")
+            del self._by_public_key[old.public_key]
+            del self._by_ip[old.ip]
+            record.seq = old.seq
+            self._by_name[record.name] = record
+            self._by_public_key[record.public_key] = record
+            self._by_ip[record.ip] = record
+            index = bisect.bisect_left(self._order, old.seq, key=lambda r: r.seq)
+            self._order[index] = record
+            self.version += 1
+            return old
+
+    def _compact(self):
+        """삭제된 레코드를 순번 목록에서 정리"""
+        self._order = [record for record in self._order if self._by_name.get(record.name) is record]
+        self._removed = 0
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def get_by_public_key(self, public_key):
+        return self._by_public_key.get(public_key)
+
+    def get_by_ip(self, ip):
+        return self._by_ip.get(ip)
+
+    def page(self, after=None, limit=None, predicate=None):
+        """
+        순번 커서 기반 페이지 조회
+
+        Args:
+            after: 이 순번 이후부터 조회 (None이면 처음부터)
+            limit: 최대 개수 (None이면 전체)
+            predicate: 레코드 필터 함수
+
+        Returns:
+            (레코드 목록, 다음 커서 또는 None)
+        """
+        with self._lock:
+            start = 0 if after is None else bisect.bisect_right(self._order, after, key=lambda r: r.seq)
+            records = []
+            for record in itertools.islice(self._order, start, None):
+                if self._by_name.get(record.name) is not record:
+                    continue
+                if predicate is not None and not predicate(record):
+                    continue
+                if limit is not None and len(records) == limit:
+                    return records, records[-1].seq
+                records.append(record)
+            return records, None
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self]
@@ -0,0 +1,175 @@
+import zlib
+import threading
+from collections import OrderedDict
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 빠른 JSON 인코더는 선택 기능
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli 압축은 선택 기능 (없으면 gzip만 사용)
+    brotli = None
+
+# 이보다 작은 응답은 압축하지 않음 (헤더와 압축 비용이 더 큼)
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# 압축할 MIME 타입 (이미지, zip 등 이미 압축된 형식은 제외)
+COMPRESSIBLE_TYPES = frozenset((
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "application/javascript",
+    "image/svg+xml"
+))
+
+
+def available_encodings():
+    """서버가 지원하는 Content-Encoding (선호 순서)"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding):
+    """data를 encoding("gzip" 또는 "br")으로 압축"""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    raise ValueError(f"지원하지 않는 인코딩입니다: {encoding}")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    orjson이 설치되어 있으면 orjson으로 직렬화하는 Flask JSON 제공자
+
+    jsonify 응답은 문자열로 바꾸지 않고 바이트를 그대로 본문으로 사용합니다.
+    orjson이 없거나 orjson이 처리하지 못하는 값(64비트를 넘는 정수 등)은 기본 json 모듈로 직렬화합니다.
+    """
+
+    def dumps_bytes(self, obj):
+        """obj를 JSON 바이트로 직렬화 (키 정렬은 sort_keys 설정을 따름)"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except (TypeError, orjson.JSONEncodeError):
+                pass
+        return super().dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # 디버그 모드의 들여쓰기 출력은 기본 동작 유지
+        if self.compact is None and self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+class CachedBody:
+    """직렬화한 응답 본문과 인코딩별 압축 결과 (한 번 압축한 결과는 재사용)"""
+
+    __slots__ = ("data", "mimetype", "cached", "_encoded")
+
+    def __init__(self, data, mimetype):
+        self.data = data
+        self.mimetype = mimetype
+        # 캐시에 들어 있는 동안 True (압축 결과 크기를 캐시 크기에 반영할지 여부)
+        self.cached = False
+        self._encoded = {}
+
+    @property
+    def size(self):
+        return len(self.data) + sum(len(value) for value in self._encoded.values())
+
+
+class BodyCache:
+    """
+    버전 키별 직렬화 본문 LRU 캐시 (프로세스 단위)
+
+    키에 저장소 버전을 포함하므로 데이터가 바뀌면 자연스럽게 새 항목을 만들고,
+    오래된 항목은 전체 크기가 max_bytes를 넘을 때 가장 오래 쓰지 않은 것부터 버립니다.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key, build):
+        """
+        키의 캐시된 본문 반환 (없으면 build()로 만든 (바이트, MIME 타입)을 저장 후 반환)
+
+        build는 잠금 밖에서 호출되므로 동시에 같은 키를 요청하면 한 번 이상 만들 수 있습니다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        data, mimetype = build()
+        entry = CachedBody(data, mimetype)
+        if self.max_bytes <= 0 or entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                previous.cached = False
+                self._size -= previous.size
+            self._entries[key] = entry
+            entry.cached = True
+            self._size += entry.size
+            self._trim()
+        return entry
+
+    def encoded(self, entry, encoding):
+        """캐시 항목 본문의 압축 결과 (처음 요청한 인코딩만 압축)"""
+        data = entry._encoded.get(encoding)
+        if data is not None:
+            return data
+        data = compress(entry.data, encoding)
+        with self._lock:
+            if encoding not in entry._encoded:
+                entry._encoded[encoding] = data
+                if entry.cached:
+                    self._size += len(data)
+                    self._trim()
+        return data
+
+    def _trim(self):
+        while self._size > self.max_bytes and self._entries:
+            _key, entry = self._entries.popitem(last=False)
+            entry.cached = False
+            self._size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry.cached = False
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,172 @@
+import os
+import json
+import zlib
+import logging
+
+from .manager import WireGuardManager
+
+
+class ShardSet:
+    """
+    여러 WireGuard 인터페이스(샤드)를 하나의 관리 API로 묶는 집합
+
+    샤드마다 설정 파일, 서버 키, 주소 대역, 포트, 엔드포인트가 따로 있으며
+    새 피어는 배치 정책에 따라 샤드에 배정됩니다.
+
+    - least_loaded: 주소 풀 사용률이 가장 낮은 샤드
+    - hash: shard_key의 해시로 고정 샤드 선택 (같은 키는 항상 같은 샤드, 키가 없으면 least_loaded)
+    """
+
+    POLICIES = ("least_loaded", "hash")
+
+    def __init__(self, managers, placement="least_loaded"):
+        """
+        Args:
+            managers: WireGuardManager 목록 (첫 번째가 기본 샤드)
+            placement: 배치 정책
+        """
+        if not managers:
+            raise ValueError("샤드가 하나 이상 필요합니다.")
+        if placement not in self.POLICIES:
+            raise ValueError(f"지원하지 않는 배치 정책입니다: {placement}")
+        self.placement = placement
+        self._managers = {}
+        for manager in managers:
+            if manager.interface in self._managers:
+                raise ValueError(f"중복된 인터페이스입니다: {manager.interface}")
+            self._managers[manager.interface] = manager
+        self.primary = managers[0]
+        # 해시 배치 순서는 인터페이스 이름 기준으로 고정
+        self._hash_order = sorted(self._managers)
+
+        # wg show all dump는 모든 인터페이스를 한 번에 보여주므로 상태 수집기는 하나만 사용
+        # 라우팅 정책도 같은 파일이므로 합친 결과 캐시를 공유
+        for manager in managers[1:]:
+            manager.status_collector = self.primary.status_collector
+            manager.routing_policies = self.primary.routing_policies
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        샤드 설정 파일(JSON)로 생성
+
+        {"placement": "least_loaded",
+         "shards": [{"interface": "wg0", "network": "10.0.0.0/24", "listen_port": 51820, "endpoint": "203.0.113.1"},
+                    {"interface": "wg1", "network": "10.0.1.0/24", "listen_port": 51821}]}
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        managers = []
+        for shard in config.get("shards", []):
+            managers.append(WireGuardManager(
+                interface=shard["interface"],
+                network=shard.get("network"),
+                listen_port=shard.get("listen_port"),
+                endpoint=shard.get("endpoint"),
+                sync_mode=shard.get("sync_mode")
+            ))
+        logging.info(f"샤드 {len(managers)}개를 초기화했습니다: {', '.join(m.interface for m in managers)}")
+        return cls(managers, placement=config.get("placement", "least_loaded"))
+
+    @classmethod
+    def from_environment(cls):
+        """WG_SHARDS(설정 파일 경로)가 있으면 파일로, 없으면 기본 매니저 하나로 생성"""
+        path = os.environ.get("WG_SHARDS") or os.path.expanduser("~/wireguard-manager/shards.json")
+        if os.path.exists(path):
+            return cls.from_file(path)
+        return cls([WireGuardManager()])
+
+    def __len__(self):
+        return len(self._managers)
+
+    def __iter__(self):
+        return iter(self._managers.values())
+
+    def get(self, interface):
+        """인터페이스 이름으로 샤드 조회 (없으면 None)"""
+        return self._managers.get(interface)
+
+    @staticmethod
+    def _usage(manager):
+        pool = manager.address_pool
+        return pool.allocated_count / pool.capacity
+
+    def place(self, count=1, shard_key=None):
+        """
+        새 피어 count개를 배정할 샤드 선택
+
+        Raises:
+            ValueError: 여유 주소가 있는 샤드가 없을 때
+        """
+        if self.placement == "hash" and shard_key:
+            interface = self._hash_order[zlib.crc32(str(shard_key).encode('utf-8')) % len(self._hash_order)]
+            return self._managers[interface]
+
+        candidates = [
+            manager for manager in self._managers.values()
+            if manager.address_pool.capacity - manager.address_pool.allocated_count >= count
+        ]
+        if not candidates:
+            raise ValueError(f"피어 {count}개를 배정할 수 있는 샤드가 없습니다.")
+        return min(candidates, key=self._usage)
+
+    def find(self, name):
+        """피어 이름으로 샤드 조회 (없으면 None)"""
+        for manager in self._managers.values():
+            if manager.get_peer(name) is not None:
+                return manager
+        return None
+
+    def find_by_public_key(self, public_key):
+        for manager in self._managers.values():
+            if manager.get_peer_by_public_key(public_key) is not None:
+                return manager
+        return None
+
+    def get_peer_name(self, public_key):
+        """공개키로 피어 이름 조회 (모든 샤드, 없으면 None)"""
+        for manager in self._managers.values():
+            name = manager.get_peer_name(public_key)
+            if name is not None:
+                return name
+        return None
+
+    def get_peer_count(self):
+        return sum(manager.get_peer_count() for manager in self._managers.values())
+
+    def refresh(self):
+        for manager in self._managers.values():
+            manager.refresh()
+
+    def set_leader(self, leader):
+        """모든 샤드의 백그라운드 작업 담당 여부 설정 (WireGuardManager.set_leader)"""
+        for manager in self._managers.values():
+            manager.set_leader(leader)
+
+    def add_listener(self, callback):
+        """
+        모든 샤드의 피어 이벤트 리스너 등록
+
+        매니저 이벤트의 total_peers는 해당 샤드의 피어 수이므로 전체 샤드 합계로 바꾸고,
+        샤드 피어 수는 interface_peers로 전달합니다.
+        """
+        def with_total(event, data):
+            callback(event, dict(data, interface_peers=data["total_peers"], total_peers=self.get_peer_count()))
+
+        for manager in self._managers.values():
+            manager.add_listener(with_total)
+
+    def summary(self):
+        """샤드별 부하"""
+        return [
+            {
+                "interface": manager.interface,
+                "listen_port": manager._get_listen_port(),
+                "network": str(manager.address_pool.network),
+                "peers": manager.get_peer_count(),
+                "capacity": manager.address_pool.capacity,
+                "usage": round(self._usage(manager), 4),
+                "endpoint": manager.endpoint_resolver.get()
+            }
+            for manager in self._managers.values()
+        ]
@@ -0,0 +1,154 @@
+import time
+import heapq
+import logging
+import threading
+from array import array
+
+
+class TrafficSeries:
+    """피어 하나의 송수신량 변화를 담는 고정 크기 링 버퍼 (array 기반)"""
+
+    __slots__ = ("capacity", "timestamps", "rx", "tx", "_next", "_count", "last_rx", "last_tx")
+
+    def __init__(self, capacity, last_rx=0, last_tx=0):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.rx = array('Q', bytes(8 * capacity))
+        self.tx = array('Q', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+        # 직전 샘플의 누적 카운터
+        self.last_rx = last_rx
+        self.last_tx = last_tx
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, rx_total, tx_total):
+        """누적 카운터를 받아 직전 샘플 대비 증가량 기록 (카운터 초기화 시 현재 값 사용)"""
+        rx_delta = rx_total - self.last_rx if rx_total >= self.last_rx else rx_total
+        tx_delta = tx_total - self.last_tx if tx_total >= self.last_tx else tx_total
+        self.last_rx = rx_total
+        self.last_tx = tx_total
+
+        index = self._next
+        self.timestamps[index] = timestamp
+        self.rx[index] = rx_delta
+        self.tx[index] = tx_delta
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _indices(self):
+        """오래된 샘플부터 순서대로 인덱스 반환"""
+        start = (self._next - self._count) % self.capacity
+        return ((start + i) % self.capacity for i in range(self._count))
+
+    def samples(self):
+        return [
+            {"timestamp": self.timestamps[i], "rx_bytes": self.rx[i], "tx_bytes": self.tx[i]}
+            for i in self._indices()
+        ]
+
+    def totals(self, since=0.0):
+        """since 이후 샘플의 수신/송신 합계"""
+        rx_sum = 0
+        tx_sum = 0
+        for i in self._indices():
+            if self.timestamps[i] >= since:
+                rx_sum += self.rx[i]
+                tx_sum += self.tx[i]
+        return rx_sum, tx_sum
+
+
+class TrafficSampler:
+    """
+    일정 간격으로 인터페이스 상태를 수집해 피어별 송수신 시계열을 쌓는 백그라운드 샘플러
+
+    요청마다 `wg`를 실행하지 않고 샘플러가 쌓아 둔 결과를 조회합니다.
+    """
+
+    def __init__(self, status_collector, interval=10.0, capacity=360, on_sample=None):
+        """
+        Args:
+            status_collector: StatusCollector 인스턴스
+            interval: 수집 간격(초)
+            capacity: 피어당 보관할 샘플 수
+            on_sample: 수집할 때마다 상태를 전달받는 콜백 (이벤트 발행 등)
+        """
+        self.status_collector = status_collector
+        self.on_sample = on_sample
+        self.interval = interval
+        self.capacity = capacity
+        self._series = {}
+        self._lock = threading.Lock()
+        # 마지막으로 반영한 수집 시각 (워커 간 공유 결과가 아직 갱신되지 않았으면 같은 값이 다시 옴)
+        self._last_collected_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="traffic-sampler", daemon=True)
+        self._thread.start()
+        logging.info(f"트래픽 샘플러 시작 (간격: {self.interval}초)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                logging.warning(f"트래픽 샘플 수집 실패: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def sample_once(self):
+        """상태를 한 번 수집해 시계열에 추가"""
+        status = self.status_collector.collect()
+        if not status:
+            return
+        if self.on_sample:
+            self.on_sample(status)
+        if not status["available"]:
+            return
+        timestamp = status["collected_at"]
+        seen = set()
+        with self._lock:
+            if timestamp == self._last_collected_at:
+                return
+            self._last_collected_at = timestamp
+            for peer in status["peers"]:
+                public_key = peer["public_key"]
+                seen.add(public_key)
+                series = self._series.get(public_key)
+                if series is None:
+                    # 첫 샘플은 기준값으로만 사용
+                    self._series[public_key] = TrafficSeries(self.capacity, peer["rx_bytes"], peer["tx_bytes"])
+                    continue
+                series.append(timestamp, peer["rx_bytes"], peer["tx_bytes"])
+            # 인터페이스에서 사라진 피어 정리
+            for public_key in [key for key in self._series if key not in seen]:
+                del self._series[public_key]
+
+    def get_series(self, public_key):
+        """피어의 샘플 목록 (없으면 None)"""
+        with self._lock:
+            series = self._series.get(public_key)
+            return series.samples() if series is not None else None
+
+    def top_talkers(self, count=10, window=300.0):
+        """
+        최근 window초 동안 송수신량이 가장 많은 피어
+
+        Returns:
+            (공개키, 수신 바이트, 송신 바이트) 튜플 목록
+        """
+        since = time.time() - window
+        with self._lock:
+            totals = [(public_key,) + series.totals(since) for public_key, series in self._series.items()]
+        return heapq.nlargest(count, totals, key=lambda item: item[1] + item[2])
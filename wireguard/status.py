@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+
+def _none_if_unset(value):
+    return None if value in ("(none)", "off", "") else value
+
+
+def parse_dump(output):
+    """
+    `wg show all dump` 출력 파싱
+
+    인터페이스 줄: 인터페이스, 개인키, 공개키, 포트, fwmark
+    피어 줄: 인터페이스, 공개키, PSK, 엔드포인트, AllowedIPs, 최근 핸드셰이크, 수신, 송신, keepalive
+
+    개인키와 PSK는 결과에 포함하지 않습니다.
+    """
+    interfaces = {}
+    peers = []
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) == 5:
+            name, _private_key, public_key, listen_port, fwmark = fields
+            interfaces[name] = {
+                "name": name,
+                "public_key": _none_if_unset(public_key),
+                "listen_port": int(listen_port) if listen_port.isdigit() else None,
+                "fwmark": _none_if_unset(fwmark),
+                "peer_count": 0
+            }
+        elif len(fields) == 9:
+            (name, public_key, _preshared_key, endpoint, allowed_ips,
+             latest_handshake, rx_bytes, tx_bytes, keepalive) = fields
+            handshake = int(latest_handshake) if latest_handshake.isdigit() else 0
+            peers.append({
+                "interface": name,
+                "public_key": public_key,
+                "endpoint": _none_if_unset(endpoint),
+                "allowed_ips": [] if allowed_ips == "(none)" else allowed_ips.split(','),
+                "latest_handshake": handshake or None,
+                "rx_bytes": int(rx_bytes) if rx_bytes.isdigit() else 0,
+                "tx_bytes": int(tx_bytes) if tx_bytes.isdigit() else 0,
+                "persistent_keepalive": int(keepalive) if keepalive.isdigit() else None
+            })
+            if name in interfaces:
+                interfaces[name]["peer_count"] += 1
+        elif line.strip():
+            logging.warning(f"알 수 없는 wg dump 줄 무시: {line[:80]}")
+    return {"interfaces": list(interfaces.values()), "peers": peers}
+
+
+def _format_bytes(count):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if count < 1024 or unit == "GiB":
+            return f"{count} {unit}" if unit == "B" else f"{count:.2f} {unit}"
+        count /= 1024
+
+
+def format_status(status):
+    """구조화된 상태를 `wg show`와 비슷한 텍스트로 변환"""
+    lines = []
+    peers_by_interface = {}
+    for peer in status["peers"]:
+        peers_by_interface.setdefault(peer["interface"], []).append(peer)
+
+    for interface in status["interfaces"]:
+        lines.append(f"interface: {interface['name']}")
+        lines.append(f"  public key: {interface['public_key']}")
+        lines.append(f"  listening port: {interface['listen_port']}")
+        for peer in peers_by_interface.get(interface["name"], []):
+            lines.append("")
+            lines.append(f"peer: {peer['public_key']}")
+            if peer["endpoint"]:
+                lines.append(f"  endpoint: {peer['endpoint']}")
+            lines.append(f"  allowed ips: {', '.join(peer['allowed_ips']) or '(none)'}")
+            if peer["latest_handshake"]:
+                handshake = datetime.fromtimestamp(peer["latest_handshake"]).strftime("%Y-%m-%d %H:%M:%S")
+                lines.append(f"  latest handshake: {handshake}")
+            if peer["rx_bytes"] or peer["tx_bytes"]:
+                lines.append(f"  transfer: {_format_bytes(peer['rx_bytes'])} received, "
+                             f"{_format_bytes(peer['tx_bytes'])} sent")
+            if peer["persistent_keepalive"]:
+                lines.append(f"  persistent keepalive: every {peer['persistent_keepalive']} seconds")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class StatusCollector:
+    """
+    `wg show all dump` 결과를 TTL 동안 캐시하는 상태 수집기
+
+    캐시가 만료된 뒤 동시에 들어온 요청들은 하나의 subprocess 결과를 함께 사용합니다.
+
+    shared_path가 있으면 여러 워커 프로세스가 수집 결과를 공유합니다.
+    리더 워커만 `wg`를 실행해 결과를 파일에 기록하고, 나머지 워커는 파일을 읽으며
+    파일이 shared_max_age초보다 오래되면(리더가 없거나 멈춘 경우) 직접 실행합니다.
+    """
+
+    def __init__(self, run_command, ttl=2.0, shared_path=None, shared_max_age=30.0):
+        """
+        Args:
+            run_command: 명령어 실행 함수 (WireGuardManager._run_command)
+            ttl: 캐시 유지 시간(초)
+            shared_path: 워커 간 공유할 수집 결과 파일 경로 (None이면 공유하지 않음)
+            shared_max_age: 공유 결과를 그대로 쓰는 최대 나이(초)
+        """
+        self._run_command = run_command
+        self.ttl = ttl
+        self.shared_path = shared_path
+        self.shared_max_age = shared_max_age
+        # 리더이면 wg를 실행해 공유 파일을 갱신, 아니면 공유 파일을 먼저 읽음
+        self.leader = True
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._collected_at = 0.0
+        self._inflight = None
+        # 캐시 적중/미스 횟수 (다른 요청의 수집 결과를 기다려 받은 경우도 적중)
+        self.hits = 0
+        self.misses = 0
+
+    def collect(self):
+        """
+        최신 상태 반환
+
+        Returns:
+            {"available", "collected_at", "interfaces", "peers", "text"} 딕셔너리
+            (wg 실행에 실패하면 available=False)
+        """
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._collected_at < self.ttl:
+                self.hits += 1
+                return self._snapshot
+            inflight = self._inflight
+            if inflight is None:
+                inflight = self._inflight = threading.Event()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.hits += 1
+
+        if not leader:
+            inflight.wait(timeout=15)
+            return self._snapshot
+
+        snapshot = None
+        try:
+            snapshot = self._collect_now()
+        finally:
+            with self._lock:
+                if snapshot is not None:
+                    self._snapshot = snapshot
+                    self._collected_at = time.monotonic()
+                self._inflight = None
+            inflight.set()
+        return snapshot
+
+    @property
+    def hit_ratio(self):
+        """캐시 적중률 (조회가 없었으면 None)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def invalidate(self):
+        """캐시 무효화 (피어 변경 직후 등)"""
+        with self._lock:
+            self._collected_at = 0.0
+
+    def _collect_now(self):
+        if self.shared_path and not self.leader:
+            snapshot = self._load_shared()
+            if snapshot is not None:
+                return snapshot
+        snapshot = self._run_dump()
+        if self.shared_path and self.leader:
+            self._save_shared(snapshot)
+        return snapshot
+
+    def _load_shared(self):
+        """리더가 기록한 수집 결과 (없거나 오래되면 None)"""
+        try:
+            with open(self.shared_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"공유 상태 파일 읽기 실패: {str(e)}")
+            return None
+        if time.time() - snapshot.get("collected_at", 0) > self.shared_max_age:
+            return None
+        return snapshot
+
+    def _save_shared(self, snapshot):
+        try:
+            directory = os.path.dirname(self.shared_path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".status-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(tmp_path, self.shared_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logging.warning(f"공유 상태 파일 저장 실패: {str(e)}")
+
+    def _run_dump(self):
+        result = self._run_command(["wg", "show", "all", "dump"], timeout=10)
+        snapshot = {"available": False, "collected_at": time.time(), "interfaces": [], "peers": [], "text": ""}
+        if result and result.returncode == 0:
+            snapshot.update(parse_dump(result.stdout))
+            snapshot["available"] = True
+            # 텍스트 출력도 수집 시 한 번만 생성
+            snapshot["text"] = format_status(snapshot) if snapshot["interfaces"] else ""
+        return snapshot
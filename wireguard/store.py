@@ -0,0 +1,325 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+import tempfile
+from .metrics import FILE_WRITE_SECONDS
+
+
+class PeerStore:
+    """피어 저장소 기본 인터페이스"""
+
+    # 저장소 버전 (변경될 때마다 바뀌며 모든 프로세스에서 같은 데이터면 같은 값)
+    version = 0
+
+    def changed_externally(self):
+        """마지막 확인 이후 다른 프로세스가 저장소를 변경했는지 확인"""
+        return False
+
+    def load(self):
+        """저장된 모든 피어를 생성 순서대로 반환"""
+        raise NotImplementedError
+
+    def add_peers(self, peers):
+        """새 피어들을 하나의 트랜잭션으로 추가"""
+        raise NotImplementedError
+
+    def remove_peers(self, names):
+        """이름으로 피어들을 하나의 트랜잭션으로 삭제"""
+        raise NotImplementedError
+
+    def update_peers(self, peers):
+        """이름이 같은 기존 피어 정보를 하나의 트랜잭션으로 교체 (키 교체 등)"""
+        raise NotImplementedError
+
+    def check_writable(self):
+        """쓰기 가능 여부 확인 (데이터는 바꾸지 않으며, 쓸 수 없으면 예외)"""
+        raise NotImplementedError
+
+    def get_by_name(self, name):
+        raise NotImplementedError
+
+    def get_by_public_key(self, public_key):
+        raise NotImplementedError
+
+    def get_by_ip(self, ip):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonPeerStore(PeerStore):
+    """기존 peers.json 형식 저장소 (변경 시 전체 파일을 원자적으로 다시 기록)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._peers = self._read()
+        self.version = self._file_version()
+
+    def _file_version(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def changed_externally(self):
+        with self._lock:
+            version = self._file_version()
+            if version == self.version:
+                return False
+            self._peers = self._read()
+            self.version = version
+            return True
+
+    def _read(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return []
+        except Exception as e:
+            logging.error(f"피어 정보 로드 실패: {str(e)}")
+            return []
+
+    def _write(self):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".peers-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._peers, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.version = self._file_version()
+
+    def load(self):
+        return list(self._peers)
+
+    def add_peers(self, peers):
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            self._peers.extend(peers)
+            self._write()
+
+    def remove_peers(self, names):
+        names = set(names)
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            self._peers = [peer for peer in self._peers if peer.get("name") not in names]
+            self._write()
+
+    def update_peers(self, peers):
+        updated = {peer["name"]: peer for peer in peers}
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            self._peers = [updated.get(peer.get("name"), peer) for peer in self._peers]
+            self._write()
+
+    def check_writable(self):
+        # 같은 디렉토리에 임시 파일을 만들 수 있어야 원자적 기록 가능
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".peers-check-", suffix=".tmp")
+        os.close(fd)
+        os.unlink(tmp_path)
+        if os.path.exists(self.path) and not os.access(self.path, os.W_OK):
+            raise PermissionError(f"피어 파일에 쓸 수 없습니다: {self.path}")
+
+    def _find(self, field, value):
+        for peer in self._peers:
+            if peer.get(field) == value:
+                return peer
+        return None
+
+    def get_by_name(self, name):
+        return self._find("name", name)
+
+    def get_by_public_key(self, public_key):
+        return self._find("public_key", public_key)
+
+    def get_by_ip(self, ip):
+        return self._find("ip", ip)
+
+
+class SQLitePeerStore(PeerStore):
+    """
+    SQLite(WAL) 기반 피어 저장소
+
+    피어 추가는 전체 파일을 다시 쓰지 않고 행 단위로 append되며,
+    커밋마다 fsync됩니다. 이름/공개키/IP에는 인덱스가 있습니다.
+    """
+
+    SCHEMA = """
+CREATE TABLE IF NOT EXISTS peers (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    public_key TEXT NOT NULL UNIQUE,
+    ip TEXT NOT NULL UNIQUE,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+    def __init__(self, path, legacy_json_path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 모드에서 커밋마다 fsync
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(self.SCHEMA)
+
+        if legacy_json_path:
+            self._migrate_from_json(legacy_json_path)
+
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self.version = self._read_version()
+
+    def _read_version(self):
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _bump_version(self):
+        """트랜잭션 안에서 저장소 버전 증가"""
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return self._read_version()
+
+    def changed_externally(self):
+        # data_version은 다른 연결(프로세스)이 커밋했을 때만 바뀜
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return False
+            self._data_version = data_version
+            self.version = self._read_version()
+            return True
+
+    def _migrate_from_json(self, json_path):
+        """기존 peers.json을 한 번만 가져오고 .migrated로 이름 변경"""
+        if not os.path.exists(json_path):
+            return
+        try:
+            count = self._conn.execute("SELECT COUNT(*) FROM peers").fetchone()[0]
+            if count:
+                logging.warning(f"피어 DB가 비어 있지 않아 {json_path} 마이그레이션을 건너뜁니다.")
+                return
+            with open(json_path, 'r', encoding='utf-8') as f:
+                peers = json.load(f)
+            self.add_peers(peers)
+            os.replace(json_path, json_path + ".migrated")
+            logging.info(f"{json_path}에서 피어 {len(peers)}개를 마이그레이션했습니다.")
+        except Exception as e:
+            logging.error(f"peers.json 마이그레이션 실패: {str(e)}")
+            raise
+
+    @staticmethod
+    def _row_to_peer(row):
+        return json.loads(row[0]) if row else None
+
+    def load(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM peers ORDER BY seq").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def add_peers(self, peers):
+        rows = [
+            (peer['name'], peer['public_key'], peer['ip'], peer.get('created_at'),
+             json.dumps(peer, ensure_ascii=False))
+            for peer in peers
+        ]
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO peers (name, public_key, ip, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                version = self._bump_version()
+                self._conn.execute("COMMIT")
+                self.version = version
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def remove_peers(self, names):
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("DELETE FROM peers WHERE name = ?", [(name,) for name in names])
+                version = self._bump_version()
+                self._conn.execute("COMMIT")
+                self.version = version
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def update_peers(self, peers):
+        rows = [
+            (peer['public_key'], peer['ip'], json.dumps(peer, ensure_ascii=False), peer['name'])
+            for peer in peers
+        ]
+        with self._lock, FILE_WRITE_SECONDS.time("peer_store"):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("UPDATE peers SET public_key = ?, ip = ?, data = ? WHERE name = ?", rows)
+                version = self._bump_version()
+                self._conn.execute("COMMIT")
+                self.version = version
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def check_writable(self):
+        # 쓰기 잠금을 잡고 변경 없는 UPDATE를 실행한 뒤 되돌림 (읽기 전용 파일, 잠금 문제 확인)
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("UPDATE meta SET value = value WHERE key = 'version'")
+            finally:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def _get(self, column, value):
+        with self._lock:
+            row = self._conn.execute(f"SELECT data FROM peers WHERE {column} = ?", (value,)).fetchone()
+        return self._row_to_peer(row)
+
+    def get_by_name(self, name):
+        return self._get("name", name)
+
+    def get_by_public_key(self, public_key):
+        return self._get("public_key", public_key)
+
+    def get_by_ip(self, ip):
+        return self._get("ip", ip)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_peer_store(kind, app_dir, peers_file="peers.json"):
+    """
+    피어 저장소 생성
+
+    Args:
+        kind: "sqlite" (기본값) 또는 "json"
+        app_dir: 저장소 파일을 둘 디렉토리
+        peers_file: 기존 JSON 피어 파일 이름 (sqlite는 최초 1회 마이그레이션)
+    """
+    json_path = os.path.join(app_dir, peers_file)
+    if kind == "json":
+        return JsonPeerStore(json_path)
+    if kind == "sqlite":
+        return SQLitePeerStore(os.path.join(app_dir, "peers.db"), legacy_json_path=json_path)
+    raise ValueError(f"지원하지 않는 피어 저장소입니다: {kind}")
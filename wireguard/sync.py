@@ -0,0 +1,104 @@
+import atexit
+import logging
+import threading
+
+
+class KernelSync:
+    """
+    WireGuard 인터페이스 동기화
+
+    - syncconf: 변경마다 `wg syncconf`로 설정 파일 전체를 반영 (기존 방식)
+    - incremental: 피어 단위 변경분만 `wg set`으로 반영하며,
+      debounce 시간 동안 모인 변경을 한 번의 명령으로 적용
+    """
+
+    MODES = ("syncconf", "incremental")
+
+    # 한 번의 wg set 호출에 포함할 최대 피어 수 (인자 길이 제한 대비)
+    MAX_PEERS_PER_COMMAND = 500
+
+    def __init__(self, run_command, full_sync, interface="wg0", mode="syncconf", debounce=0.2):
+        """
+        Args:
+            run_command: 명령어 실행 함수 (WireGuardManager._run_command)
+            full_sync: 전체 동기화 함수 (syncconf 모드 및 실패 시 대안)
+            interface: WireGuard 인터페이스 이름
+            mode: "syncconf" 또는 "incremental"
+            debounce: incremental 모드에서 변경을 모으는 시간(초), 0이면 즉시 적용
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"지원하지 않는 동기화 모드입니다: {mode}")
+        self._run_command = run_command
+        self._full_sync = full_sync
+        self.interface = interface
+        self.mode = mode
+        self.debounce = debounce
+
+        self._lock = threading.Lock()
+        # 공개키 -> AllowedIPs (None이면 제거)
+        self._pending = {}
+        self._timer = None
+
+        if self.mode == "incremental":
+            atexit.register(self.flush)
+
+    def apply(self, added=(), removed=(), full=False):
+        """
+        피어 변경 반영
+
+        Args:
+            added: (공개키, AllowedIPs) 튜플 목록
+            removed: 제거할 공개키 목록
+            full: True면 모드와 관계없이 전체 동기화 (wg set으로 줄 수 없는 PresharedKey 등)
+        """
+        if self.mode == "syncconf" or full:
+            if full and self.mode == "incremental":
+                # 전체 동기화가 모든 변경을 반영하므로 대기 중인 같은 피어 변경은 버림
+                with self._lock:
+                    for public_key, _allowed_ips in added:
+                        self._pending.pop(public_key, None)
+                    for public_key in removed:
+                        self._pending.pop(public_key, None)
+            self._full_sync()
+            return
+
+        with self._lock:
+            for public_key, allowed_ips in added:
+                self._pending[public_key] = allowed_ips
+            for public_key in removed:
+                self._pending[public_key] = None
+
+            if self.debounce > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.debounce, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+
+        self.flush()
+
+    def flush(self):
+        """모인 변경분을 wg set으로 일괄 적용"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+
+        if not pending:
+            return
+
+        items = list(pending.items())
+        for start in range(0, len(items), self.MAX_PEERS_PER_COMMAND):
+            command = ["sudo", "wg", "set", self.interface]
+            for public_key, allowed_ips in items[start:start + self.MAX_PEERS_PER_COMMAND]:
+                if allowed_ips is None:
+                    command += ["peer", public_key, "remove"]
+                else:
+                    command += ["peer", public_key, "allowed-ips", allowed_ips]
+
+            result = self._run_command(command, timeout=10)
+            if not result or result.returncode != 0:
+                logging.warning("WireGuard 피어 변경분 적용 실패, 전체 동기화 시도")
+                self._full_sync()
+                return
+
+        logging.info(f"WireGuard 피어 변경분 {len(items)}개가 적용되었습니다.")
@@ -0,0 +1,9 @@
+"""
+프로덕션 WSGI 엔트리 포인트
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from application import app, init_services
+
+# 워커마다 임포트 시 초기화 (SQLite 연결과 백그라운드 스레드는 fork 이후에 생성)
+init_services()